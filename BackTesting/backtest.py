@@ -1,66 +1,113 @@
 import backtrader as bt
-import backtrader.analyzers as btanalyzers
 import sys
 import os
+import numpy as np
 import pandas as pd
-import MetaTrader5 as mt5
 from typing import Type  # Import for type hinting
 import multiprocessing
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from Data import dataLoader as dl
-
+from Data import timeframes as tf
+from BackTesting.optimizer import runSharedOptimization, expandGrid
+from BackTesting.gridEval import runGrid
+from BackTesting.paramSearch import runSearch
+from BackTesting.walkForward import runWalkForward
+from BackTesting.portfolio import runPortfolio
+from BackTesting.storeFeed import StoreData
+from BackTesting.profiling import RunProfile, phase
+
+from Strategies.namiStrategy import NamiStrategy, addTimeframeFeeds
 from Strategies.MaCrossOver import MaCrossOverBt 
 from Strategies.MeanReversion import MeanReversionStrategy 
 from Strategies.SupplyAndDemand import TrendFollowingStrategy
 from Strategies.CrashAndBoom import CrashBoomStrategy
 from Strategies.SwingFailure import SFPStrategy
 
+# Strategy class name (as in result and ranking tables) -> class
+STRATEGIES = {cls.__name__: cls for cls in (SFPStrategy, TrendFollowingStrategy, CrashBoomStrategy, MaCrossOverBt, MeanReversionStrategy)}
+# Account and position size of runBackTestForStrategy
+STARTING_BALANCE = 100000
+STAKE = 10000
+# Symbols every strategy is tested on
+SYMBOLS = ['AUDCAD', 'EURUSD', 'GBPJPY', 'USDCHF', 'AUDNZD', 'USDJPY', 'GBPUSD']
+
 class Backtester:
 
     @staticmethod
-    def runBackTestForStrategy(strategy: Type[bt.Strategy], plot: bool = False, fxdata: dl.Data = dl.Data(symbol='AUDCAD')):
+    def runBackTestForStrategy(strategy: Type[bt.Strategy], plot: bool = False, fxdata: dl.Data = None, keepTrades: bool = False,
+                               profile: RunProfile = None):
         """
         Runs a backtest using the provided strategy.
 
         :param strategy: The strategy class to be used for backtesting (must be a subclass of bt.Strategy).
         :param plot: Boolean to determine whether to plot the results. Will only run 1 instance of the strategy
+        :param fxdata: Lazy Data handle to test on (default: AUDCAD M15). Bars are loaded on first use.
+        :param keepTrades: Add 'Trade PnL' and 'Trade Entry' columns with the lists of closed trade PnLs and entry
+                           times in epoch seconds (NamiStrategy only), for Ranking.robustness and BackTesting.regimes.
+        :param profile: Optional BackTesting.profiling.RunProfile, filled with the run's phase timings,
+                        next() rate, indicator times and peak RSS.
         """
-        cerebro = bt.Cerebro()
+        if fxdata is None:
+            fxdata = dl.Data(symbol='AUDCAD')
+
+        # Observers are only needed for the plot
+        cerebro = bt.Cerebro(stdstats=plot)
 
-        # Feed data into Backtrader
-        btData = bt.feeds.PandasData(dataname=fxdata.full_data)
-        cerebro.adddata(btData)
+        # Feed data into Backtrader, straight from the compact bar arrays
+        with phase(profile, 'data'):
+            bars = fxdata.bar_store()
+        with phase(profile, 'feeds'):
+            btData = StoreData(store=bars)
+            cerebro.adddata(btData)
+            # Higher-timeframe feeds the strategy asks for, resampled from the same bars
+            addTimeframeFeeds(cerebro, strategy, bars, timeframe=fxdata.timeframe)
 
         # Add a FixedSize sizer according to the stake
-        cerebro.addsizer(bt.sizers.FixedSize, stake=10000)
+        cerebro.addsizer(bt.sizers.FixedSize, stake=STAKE)
         
         cerebro.addstrategy(strategy)
-        
-        # Add analyzers for performance metrics
-        cerebro.addanalyzer(bt.analyzers.SharpeRatio, _name="sharpe")
-        cerebro.addanalyzer(bt.analyzers.DrawDown, _name="drawdown")
-        cerebro.addanalyzer(bt.analyzers.TradeAnalyzer, _name="trades")
-        cerebro.addanalyzer(bt.analyzers.SQN, _name="sqn")
+
+        # NamiStrategy computes its metrics from its own trade journal; other strategies need the analyzers
+        journaled = issubclass(strategy, NamiStrategy)
+        if not journaled:
+            cerebro.addanalyzer(bt.analyzers.SharpeRatio, _name="sharpe")
+            cerebro.addanalyzer(bt.analyzers.DrawDown, _name="drawdown")
+            cerebro.addanalyzer(bt.analyzers.TradeAnalyzer, _name="trades")
+            cerebro.addanalyzer(bt.analyzers.SQN, _name="sqn")
 
         # Set initial cash
-        starting_balance = 100000  # Define starting balance
+        starting_balance = STARTING_BALANCE  # Define starting balance
         cerebro.broker.setcash(starting_balance)
 
         # Run backtest
-        result = cerebro.run()
+        if profile is not None:
+            profile.info.update(strategy=strategy.__name__, symbol=fxdata.symbol,
+                                timeframe=tf.NAMES.get(fxdata.timeframe, fxdata.timeframe))
+            profile.attach(cerebro)
+            with profile.running():
+                result = cerebro.run()
+        else:
+            result = cerebro.run()
         final_balance = cerebro.broker.getvalue()  # Get final balance after the test
 
         results_data = []
 
         for run in result:
-            sharpe = run.analyzers.sharpe.get_analysis().get("sharperatio")
-            drawdown = run.analyzers.drawdown.get_analysis().get("drawdown")
-            sqn = run.analyzers.sqn.get_analysis().get("sqn")
-            trade_analysis = run.analyzers.trades.get_analysis()
-            total_trades = trade_analysis.total.get("total", 0) if "total" in trade_analysis.total else 0
-            won_trades = trade_analysis.won.get("total", 0) if "won" in trade_analysis else 0
-            win_rate = (won_trades / total_trades * 100) if total_trades > 0 else 0
+            if journaled:
+                summary = run.result
+                sharpe, drawdown, sqn = summary['Sharpe Ratio'], summary['Max Drawdown'], summary['SQN']
+                total_trades, win_rate = summary['Trades Taken'], summary['Win rate']
+                closed_trades = summary['Closed Trades']
+            else:
+                sharpe = run.analyzers.sharpe.get_analysis().get("sharperatio")
+                drawdown = run.analyzers.drawdown.get_analysis().get("drawdown")
+                sqn = run.analyzers.sqn.get_analysis().get("sqn")
+                trade_analysis = run.analyzers.trades.get_analysis()
+                total_trades = trade_analysis.total.get("total", 0) if "total" in trade_analysis.total else 0
+                closed_trades = trade_analysis.total.get("closed", 0)
+                won_trades = trade_analysis.won.get("total", 0) if "won" in trade_analysis else 0
+                win_rate = (won_trades / total_trades * 100) if total_trades > 0 else 0
             
             # Collect the data for each strategy run
             results_data.append({
@@ -72,74 +119,126 @@ class Backtester:
                 'Max Drawdown': drawdown,
                 'SQN': sqn,
                 'Trades Taken': total_trades,
+                'Closed Trades': closed_trades,
                 'Win rate': win_rate,
             })
+            if keepTrades and journaled:
+                results_data[-1]['Trade PnL'] = run.journal['pnlcomm'].tolist()
+                results_data[-1]['Trade Entry'] = run.journal['entry_time'].astype(np.int64).tolist()
 
         df = pd.DataFrame(results_data)
 
         # Plot results if needed
         if plot:
             print(df)
-            cerebro.plot(style='bar')
+            with phase(profile, 'plot'):
+                cerebro.plot(style='bar')
 
         return df  # Return DataFrame for further use
 
 
 
-    def runOptBacktest(strategy: Type[bt.Strategy], maxcpus: int = 12, fxdata: dl.Data = dl.Data(timeframe=mt5.TIMEFRAME_M1, symbol='EURUSD').get_last_month_data(), params = None):
-        cerebro = bt.Cerebro(optreturn=False)  # Create a new Cerebro instance
-
+    def runOptBacktest(strategy: Type[bt.Strategy], maxcpus: int = 12, fxdata = None, params = None, engine: str = 'backtrader',
+                       search: str = 'grid', budget: int = 50, patience: int = None, objective: str = 'SQN'):
+        """
+        Runs a parameter sweep of the strategy.
+
+        :param fxdata: A Data handle (its full data is used), a DataFrame of bars,
+                       or None for the last month of EURUSD M1 bars.
+        :param params: Dictionary of parameter name to the values to sweep.
+        :param engine: 'backtrader' runs one Cerebro per combination. 'vectorized' uses the NumPy engine
+                       and computes each distinct indicator series once for the whole grid
+                       (bracket-order strategies only, see BackTesting.vectorized.SIGNALS).
+        :param search: 'grid' evaluates every combination. 'random', 'halving' (successive halving on growing
+                       data slices) and 'tpe' (Bayesian TPE) evaluate at most `budget` combinations.
+        :param budget: Maximum number of backtests for the non-grid searches.
+        :param patience: Stop a non-grid search after this many evaluations without improving `objective`.
+        :param objective: Metric the non-grid searches maximise.
+        :return: DataFrame with the parameters, Sharpe Ratio, Max Drawdown, SQN, Trades Taken (opened) and
+                 Closed Trades of each combination.
+        """
         if params is None:
             params = {}  # Default to an empty dictionary if no params are provided
 
-        cerebro.optstrategy(strategy, **params)  # Unpack params dictionary into optstrategy
+        if search != 'grid':
+            df = runSearch(strategy, Backtester.resolveFrame(fxdata), params, search=search, budget=budget,
+                           engine=engine, objective=objective, patience=patience)
+        elif engine == 'vectorized':
+            df = runGrid(strategy, Backtester.resolveFrame(fxdata), expandGrid(params),
+                         workers=maxcpus, starting_balance=10000, stake=1000)
+        elif engine == 'backtrader':
+            # Bars go into shared memory once; each worker attaches to them and returns only metric records
+            df = runSharedOptimization(strategy, Backtester.resolveFrame(fxdata), expandGrid(params),
+                                       workers=maxcpus, cash=10000, stake=1000)
+        else:
+            raise ValueError(f"Unknown engine '{engine}', expected 'backtrader' or 'vectorized'")
 
-        # Set initial cash
-        cerebro.broker.setcash(10000)
-        btData15m = bt.feeds.PandasData(dataname=fxdata)
-        cerebro.adddata(btData15m)
-        # Add a FixedSize sizer according to the stake
-        cerebro.addsizer(bt.sizers.FixedSize, stake=1000)
+        # Print or return the DataFrame
+        print(df)
+        return df
 
-        # Add analyzers for performance metrics
-        cerebro.addanalyzer(btanalyzers.SharpeRatio, _name="sharpe")
-        cerebro.addanalyzer(bt.analyzers.DrawDown, _name="drawdown")
-        cerebro.addanalyzer(bt.analyzers.SQN, _name="sqn")
+    def runWalkForward(strategy: Type[bt.Strategy], fxdata = None, params = None, train: int = 5760, test: int = 1920,
+                       step: int = None, anchored: bool = False, maxcpus: int = 12, objective: str = 'SQN'):
+        """
+        Walk-forward test: optimise on rolling in-sample windows and evaluate each on the window that follows.
+
+        :param fxdata: A Data handle, a DataFrame of bars, or None for the last month of EURUSD M1 bars.
+        :param params: Dictionary of parameter name to the values searched on each in-sample window.
+        :param train: In-sample bars per window (default: 60 days of M15).
+        :param test: Out-of-sample bars per window (default: 20 days of M15).
+        :param step: Bars between windows (default: `test`).
+        :param anchored: Grow the in-sample window from the first bar instead of rolling it.
+        :return: DataFrame with the chosen parameters and out-of-sample metrics of each window.
+        """
+        df = runWalkForward(strategy, Backtester.resolveFrame(fxdata), expandGrid(params or {}), train, test,
+                            step=step, anchored=anchored, workers=maxcpus, objective=objective)
+        print(df)
+        return df
 
-        result = cerebro.run(maxcpus=maxcpus)  # Run backtest with specified CPU cores
-        
-        # Collecting results into a list of dictionaries
-        results_data = []
+    def runPortfolioBacktest(ranked=None, top: int = 10, timeframe: int = tf.TIMEFRAME_M15, source=None,
+                             starting_balance: float = 100000, stake: int = 10000, **dataKwargs):
+        """
+        Backtests the top ranked (strategy, symbol) pairs together in one Cerebro run with shared cash.
 
-        for run in result:
-            for strategy in run:
-                sharpe = strategy.analyzers.sharpe.get_analysis().get("sharperatio")
-                drawdown = strategy.analyzers.drawdown.get_analysis().get("drawdown")
-                sqn = strategy.analyzers.sqn.get_analysis().get("sqn")
-                tradesTaken = strategy.analyzers.sqn.get_analysis().get("trades")
-                params = strategy.params  # You can expand this if you want specific param info
-                
-                # Collect the data for each strategy run
-                results_data.append({
-                    'Sharpe Ratio': sharpe,
-                    'Max Drawdown': drawdown,
-                    'SQN': sqn,
-                    'Trades Taken': tradesTaken,
-                })
-
-        # Create DataFrame from collected results
-        df = pd.DataFrame(results_data)
+        :param ranked: DataFrame with Strategy and Symbol columns, best first (default: the ranking of backtest_results.csv).
+        :param top: Number of pairs to trade.
+        :param source: Data source backend passed to Data (see Data.dataSources.get_source).
+        :param dataKwargs: Extra arguments for Data, e.g. numOfCandles or offline.
+        :return: (one-row portfolio DataFrame with its Sharpe Ratio and drawdowns, DataFrame with one row per pair)
+        """
+        if ranked is None:
+            from Ranking.ranking import readCsvToDf, rankStrategies
+            ranked = rankStrategies(readCsvToDf())
+        pairs = [(STRATEGIES[name], symbol) for name, symbol in zip(ranked['Strategy'], ranked['Symbol'])
+                 if name in STRATEGIES][:top]
+
+        # Each symbol's bars are loaded once, however many strategies trade it
+        frames = {symbol: dl.Data(symbol=symbol, timeframe=timeframe, source=source, **dataKwargs).full_data
+                  for symbol in dict.fromkeys(symbol for _, symbol in pairs)}
+        portfolio, per_pair = runPortfolio(pairs, frames, starting_balance, stake)
+        print(portfolio)
+        print(per_pair)
+        return portfolio, per_pair
 
-        # Print or return the DataFrame
-        print(df)
-        return df
+    @staticmethod
+    def resolveFrame(fxdata):
+        """
+        Return the bars DataFrame for a Data handle, a DataFrame, or None (last month of EURUSD M1).
+        """
+        if fxdata is None:
+            return dl.Data(timeframe=tf.TIMEFRAME_M1, symbol='EURUSD').get_last_month_data()
+        if isinstance(fxdata, dl.Data):
+            return fxdata.full_data
+        return fxdata
 
-    #Scrap this for now, will come back to brute forcing params at a later date
     def runAllOptBacktest():
-        cerebro = bt.Cerebro()
-        # Feed data into Backtrader
-        btData15m = bt.feeds.PandasData(dataname=dl.Data(symbol='EURUSD').full_data)
-        cerebro.adddata(btData15m)
+        """
+        Runs a parameter sweep of every strategy on EURUSD M15 and prints the results.
+        """
+        # Lazy handle, bars are only fetched when the first sweep runs
+        btData15m = dl.Data(symbol='EURUSD')
+
+        # The bracket-order strategies use the vectorized engine, which shares indicators across the grid
 
         trendParams = {
             'ema_period': range(100, 201, 20),  # 20 to 200, step 10
@@ -147,7 +246,7 @@ class Backtester:
             'atr_mult_tp': [2, 2.5, 3],         # 2x to 3x for TP (for a 1:2 to 1:3 risk-reward ratio)
         }
 
-        crashStrategy = Backtester.runOptBacktest(TrendFollowingStrategy, maxcpus=12, fxdata = btData15m, params=trendParams)
+        trendStrategy = Backtester.runOptBacktest(TrendFollowingStrategy, maxcpus=12, fxdata = btData15m, params=trendParams, engine='vectorized')
 
 
         crashBoomParams = {
@@ -155,7 +254,7 @@ class Backtester:
             "ema_trend_period": range(50, 100, 10),
             "ema_signal_period": range(10, 21, 5), 
         }
-        crashStrategy = Backtester.runOptBacktest(CrashBoomStrategy, maxcpus=12, fxdata = btData15m, params=crashBoomParams)
+        crashStrategy = Backtester.runOptBacktest(CrashBoomStrategy, maxcpus=12, fxdata = btData15m, params=crashBoomParams, engine='vectorized')
 
 
         maCrossOverParams = {
@@ -167,40 +266,63 @@ class Backtester:
         meanReversionParams = {
             "bollinger_period": range(10, 13),
         }
-        meanReversionStrat = Backtester.runOptBacktest(MeanReversionStrategy, maxcpus=12, fxdata = btData15m, params=meanReversionParams)
+        meanReversionStrat = Backtester.runOptBacktest(MeanReversionStrategy, maxcpus=12, fxdata = btData15m, params=meanReversionParams, engine='vectorized')
 
-        print(f"Crash: \n{crashStrategy} \nCross:\n{maCrossStrategy}\nMean Reversion:\n{meanReversionStrat}")
+        print(f"Trend: \n{trendStrategy} \nCrash: \n{crashStrategy} \nCross:\n{maCrossStrategy}\nMean Reversion:\n{meanReversionStrat}")
 
 
 
-    def runAllBackTests():
+    def runAllBackTests(source=None, workers=None, progress=True, useStore=True):
+        """
+        Runs every strategy against every symbol in parallel.
+
+        :param source: Data source backend passed to Data (see Data.dataSources.get_source).
+        :param workers: Number of worker processes (default: all cores).
+        :param progress: Print a line as each backtest finishes.
+        :param useStore: Load unchanged runs from the result store (backtest_results.sqlite) instead of re-running them.
+        """
+        from BackTesting.sweep import runSweep
+        from BackTesting.resultStore import ResultStore
+
         # Define multiple symbols to test
-        symbols = ['AUDCAD', 'EURUSD', 'GBPJPY', 'USDCHF', 'AUDNZD', 'USDJPY', 'GBPUSD']
+        symbols = SYMBOLS
 
         # Define strategies to test
         strategies = [SFPStrategy, TrendFollowingStrategy, CrashBoomStrategy, MaCrossOverBt, MeanReversionStrategy]
 
-        # Store all results in a list
-        all_results = []
-
-        # Loop through each symbol
-        for symbol in symbols:
-            # Load data for the symbol
-            btData = dl.Data(timeframe=mt5.TIMEFRAME_M15, symbol=symbol)
-
-            # Run backtests for all strategies
-            for strategy in strategies:
-                result_df = Backtester.runBackTestForStrategy(strategy, fxdata=btData)
-                all_results.append(result_df)  # Collect results
-
-        # Combine all results into a single DataFrame
-        final_results = pd.concat(all_results, ignore_index=True)
+        # Each symbol's bars are loaded once per worker and results are collected as jobs finish
+        final_results = runSweep(symbols, strategies, timeframes=[tf.TIMEFRAME_M15],
+                                 workers=workers, progress=progress, source=source,
+                                 store=ResultStore() if useStore else None)
 
         # Print final results
         print(final_results)
 
         return final_results  # Return DataFrame
 
+    def runRegimeAnalysis(source=None, workers=None, timeframe: int = tf.TIMEFRAME_M15, buckets: int = 3,
+                          serverOffset: int = 0, **dataKwargs):
+        """
+        Backtests every strategy against every symbol once and splits each run's trades by market regime.
+
+        :param source: Data source backend passed to Data (see Data.dataSources.get_source).
+        :param workers: Number of worker processes (default: all cores).
+        :param buckets: Number of ATR volatility buckets (see BackTesting.regimes.tagBars).
+        :param serverOffset: Hours the bar timestamps are ahead of UTC, for the session tags.
+        :param dataKwargs: Extra arguments for Data, e.g. numOfCandles or offline.
+        :return: Strategy x symbol x session x volatility DataFrame (see BackTesting.regimes.regimeCube).
+        """
+        from BackTesting.sweep import runSweep
+        from BackTesting.regimes import regimeCube
+
+        results = runSweep(SYMBOLS, list(STRATEGIES.values()), timeframes=[timeframe], workers=workers,
+                           progress=False, keepTrades=True, source=source, **dataKwargs)
+        # The same bars the runs were on, tagged once per symbol
+        bars = {symbol: dl.Data(symbol=symbol, timeframe=timeframe, source=source, **dataKwargs) for symbol in SYMBOLS}
+        cube = regimeCube(results, bars, buckets=buckets, server_offset=serverOffset)
+        print(cube)
+        return cube
+
 
 if __name__ == '__main__':
     # Required for Windows to properly handle multiprocessing
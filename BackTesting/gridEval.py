@@ -0,0 +1,86 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from BackTesting import vectorized as vec
+from BackTesting.sharedBars import SharedBars
+
+# Per-worker state set up once by _initWorker
+_worker = {}
+
+
+def evaluateGrid(strategy, bars, paramGrid, indicators=None, starting_balance=10000, stake=1000):
+    """
+    Evaluate every parameter combination with the vectorized engine, sharing indicator series.
+
+    Each distinct indicator series (e.g. one EMA per ema_period) is computed once
+    and reused by every combination that asks for it; only the signal and bracket
+    logic runs per combination.
+
+    :param bars: Bar arrays as returned by vectorized.barArrays.
+    :param paramGrid: List of parameter dicts.
+    :param indicators: IndicatorSet to reuse across calls (default: a new one for `bars`).
+    :return: List of metric records, one per combination.
+    """
+    indicators = indicators or vec.IndicatorSet(bars)
+    signalFunction = vec.SIGNALS[strategy.__name__]
+    records = []
+    for params in paramGrid:
+        signals = signalFunction(bars, indicators, vec.strategyParams(strategy, params))
+        trades = vec.simulateBrackets(bars, signals, starting_balance, stake)
+        row = vec.summarize(strategy.__name__, None, bars, trades, starting_balance, stake)
+        records.append({
+            **params,
+            'Sharpe Ratio': row['Sharpe Ratio'],
+            'Max Drawdown': row['Max Drawdown'],
+            'SQN': row['SQN'],
+            'Trades Taken': row['Trades Taken'],
+            'Closed Trades': row['Closed Trades'],
+            'Final Balance': row['Final Balance'],
+            'Win rate': row['Win rate'],
+        })
+    return records
+
+
+def _initWorker(spec, strategy, starting_balance, stake):
+    shared = SharedBars.attach(spec)
+    bars = vec.barArrays(shared.frame())
+    _worker.update(shared=shared, bars=bars, indicators=vec.IndicatorSet(bars),
+                   strategy=strategy, starting_balance=starting_balance, stake=stake)
+
+
+def _evaluateChunk(chunk):
+    return evaluateGrid(_worker['strategy'], _worker['bars'], chunk, _worker['indicators'],
+                        _worker['starting_balance'], _worker['stake'])
+
+
+def runGrid(strategy, frame, paramGrid, workers=1, starting_balance=10000, stake=1000):
+    """
+    Evaluate a parameter grid with the vectorized engine.
+
+    With several workers the grid is cut into contiguous chunks, so combinations
+    that share their leading parameters (and therefore most indicator series) land
+    on the same worker and reuse that worker's indicator cache.
+
+    :param frame: DataFrame of bars.
+    :param paramGrid: List of parameter dicts (see optimizer.expandGrid).
+    :param workers: Number of worker processes; 1 evaluates in this process.
+    :return: A DataFrame with one row per combination, in grid order.
+    """
+    if strategy.__name__ not in vec.SIGNALS:
+        raise ValueError(f"{strategy.__name__} has no vectorized implementation, expected one of {sorted(vec.SIGNALS)}")
+
+    workers = min(workers or os.cpu_count() or 1, max(len(paramGrid), 1))
+    if workers == 1:
+        return pd.DataFrame(evaluateGrid(strategy, vec.barArrays(frame), paramGrid,
+                                         starting_balance=starting_balance, stake=stake))
+
+    chunks = [list(chunk) for chunk in np.array_split(np.array(paramGrid, dtype=object), workers) if len(chunk)]
+    with SharedBars.create(frame) as shared:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_initWorker,
+                                 initargs=(shared.spec, strategy, starting_balance, stake)) as pool:
+            records = [record for chunk in pool.map(_evaluateChunk, chunks) for record in chunk]
+    return pd.DataFrame(records)
@@ -0,0 +1,74 @@
+import numpy as np
+
+
+def yearEnds(times):
+    """
+    Index of the last bar of each calendar year in a sorted datetime64 array.
+    """
+    years = np.asarray(times).astype('datetime64[Y]')
+    return np.flatnonzero(np.append(years[1:] != years[:-1], True))
+
+
+def sharpeRatio(times, equity, starting_balance, riskfreerate=0.01, ends=None):
+    """
+    Sharpe ratio of yearly returns, computed the way Backtrader's default SharpeRatio analyzer does.
+
+    :param times: datetime64 timestamps of the equity curve.
+    :param equity: Account value at each timestamp.
+    :param starting_balance: Account value before the first bar.
+    :param ends: Precomputed yearEnds(times), when evaluating many curves over the same bars.
+    :return: The ratio, or None when fewer than two years are covered (zero deviation).
+    """
+    if len(equity) == 0:
+        return None
+    if ends is None:
+        ends = yearEnds(times)
+    values = np.asarray(equity, dtype=np.float64)[ends]
+    starts = np.concatenate([[starting_balance], values[:-1]])
+    excess = values / starts - 1.0 - riskfreerate
+    deviation = excess.std()
+    if deviation == 0 or not np.isfinite(deviation):
+        return None
+    return float(excess.mean() / deviation)
+
+
+def drawdown(equity):
+    """
+    Drawdown at the last bar, in percent of the running peak (Backtrader's DrawDown 'drawdown').
+    """
+    if len(equity) == 0:
+        return 0.0
+    peak = np.max(equity)
+    return float(100.0 * (peak - equity[-1]) / peak)
+
+
+def maxDrawdown(equity):
+    """
+    Largest drawdown over the whole equity curve, in percent.
+    """
+    if len(equity) == 0:
+        return 0.0
+    peaks = np.maximum.accumulate(equity)
+    return float(np.max(100.0 * (peaks - equity) / peaks))
+
+
+def sqn(pnl):
+    """
+    System Quality Number of closed trade PnLs (Backtrader's SQN analyzer).
+    """
+    pnl = np.asarray(pnl, dtype=np.float64)
+    if len(pnl) < 2:
+        return 0.0
+    deviation = pnl.std()
+    if deviation == 0:
+        return 0.0
+    return float(np.sqrt(len(pnl)) * pnl.mean() / deviation)
+
+
+def winRate(pnl, total_trades):
+    """
+    Percentage of trades that closed at break-even or better, out of all trades taken (including an open one).
+    """
+    if total_trades == 0:
+        return 0
+    return float(np.count_nonzero(np.asarray(pnl) >= 0.0)) / total_trades * 100
@@ -0,0 +1,104 @@
+import os
+import sys
+import itertools
+import backtrader as bt
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from BackTesting.sharedBars import SharedBars
+from BackTesting.storeFeed import storeFeed
+from Data.barStore import BarStore
+from Strategies.namiStrategy import NamiStrategy, addTimeframeFeeds, runLogging
+
+# Per-worker state set up once by _initWorker
+_worker = {}
+
+
+def expandGrid(params):
+    """
+    Expand {name: values} into a list of parameter dicts (the Cartesian product).
+    """
+    if not params:
+        return [{}]
+    names = list(params)
+    values = [v if isinstance(v, (list, tuple, range)) else [v] for v in params.values()]
+    return [dict(zip(names, combo)) for combo in itertools.product(*values)]
+
+
+def _initWorker(spec, strategy, cash, stake):
+    bars = SharedBars.attach(spec)
+    _worker.update(bars=bars, frame=BarStore.from_frame(bars.frame()), strategy=strategy, cash=cash, stake=stake)
+
+
+def evaluate(strategy, frame, params, cash=10000, stake=1000, loglevel='silent'):
+    """
+    Run one backtest of `strategy` with `params` and return a compact metric record.
+
+    :param frame: DataFrame of bars or a BarStore.
+    :param loglevel: Log level of the strategy during the run (silent by default, see Strategies.namiStrategy).
+
+    :return: dict of the parameters plus Sharpe Ratio, Max Drawdown, SQN, Trades Taken (every trade opened,
+             one still open at the end included) and Closed Trades.
+    """
+    cerebro = bt.Cerebro(stdstats=False)
+    cerebro.addstrategy(strategy, **params)
+    cerebro.broker.setcash(cash)
+    cerebro.adddata(storeFeed(frame))
+    addTimeframeFeeds(cerebro, strategy, frame, params)
+    cerebro.addsizer(bt.sizers.FixedSize, stake=stake)
+
+    journaled = issubclass(strategy, NamiStrategy)
+    if not journaled:
+        cerebro.addanalyzer(bt.analyzers.SharpeRatio, _name="sharpe")
+        cerebro.addanalyzer(bt.analyzers.DrawDown, _name="drawdown")
+        cerebro.addanalyzer(bt.analyzers.SQN, _name="sqn")
+        cerebro.addanalyzer(bt.analyzers.TradeAnalyzer, _name="trades")
+
+    with runLogging(loglevel):
+        run = cerebro.run()[0]
+    if journaled:
+        # Computed from the strategy's trade journal, no analyzer objects to build
+        summary = run.result
+        return {
+            **params,
+            'Sharpe Ratio': summary['Sharpe Ratio'],
+            'Max Drawdown': summary['Max Drawdown'],
+            'SQN': summary['SQN'],
+            'Trades Taken': summary['Trades Taken'],
+            'Closed Trades': summary['Closed Trades'],
+        }
+    sqn = run.analyzers.sqn.get_analysis()
+    total = run.analyzers.trades.get_analysis().get('total', {})
+    return {
+        **params,
+        'Sharpe Ratio': run.analyzers.sharpe.get_analysis().get("sharperatio"),
+        'Max Drawdown': run.analyzers.drawdown.get_analysis().get("drawdown"),
+        'SQN': sqn.get("sqn"),
+        'Trades Taken': total.get('total', 0),
+        'Closed Trades': total.get('closed', 0),
+    }
+
+
+def _evaluateShared(params):
+    return evaluate(_worker['strategy'], _worker['frame'], params, _worker['cash'], _worker['stake'])
+
+
+def runSharedOptimization(strategy, frame, paramGrid, workers=None, cash=10000, stake=1000):
+    """
+    Evaluate every parameter combination of `strategy` on `frame` across a process pool.
+
+    The bars are copied once into shared memory; workers attach to them at start-up
+    instead of receiving a pickled data feed, and send back only metric records.
+
+    :param paramGrid: List of parameter dicts to evaluate (see expandGrid).
+    :param workers: Number of worker processes (default: all cores).
+    :return: A DataFrame with one row per parameter combination, in grid order.
+    """
+    workers = min(workers or os.cpu_count() or 1, max(len(paramGrid), 1))
+    with SharedBars.create(frame) as bars:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_initWorker,
+                                 initargs=(bars.spec, strategy, cash, stake)) as pool:
+            chunksize = max(1, len(paramGrid) // (workers * 4))
+            records = list(pool.map(_evaluateShared, paramGrid, chunksize=chunksize))
+    return pd.DataFrame(records)
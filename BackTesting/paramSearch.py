@@ -0,0 +1,281 @@
+"""
+Parameter search strategies for runOptBacktest.
+
+A search space is the same {name: candidate values} dict runOptBacktest takes
+for its grid. Every search gets a fixed evaluation budget and stops early when
+the objective has not improved for `patience` evaluations.
+"""
+import os
+import sys
+import math
+import random
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from BackTesting import vectorized as vec
+from BackTesting import optimizer
+
+
+def makeEvaluator(strategy, frame, engine='vectorized', starting_balance=10000, stake=1000):
+    """
+    Return evaluate(params, fraction=1.0) -> metric record, backtesting on the last `fraction` of the bars.
+
+    The vectorized engine keeps one IndicatorSet per data slice, so indicator
+    series are shared by every candidate evaluated on that slice.
+    """
+    slices = {}
+
+    def bars(fraction):
+        if fraction not in slices:
+            part = frame.iloc[-max(1, int(len(frame) * fraction)):]
+            barSet = vec.barArrays(part)
+            slices[fraction] = (part, barSet, vec.IndicatorSet(barSet))
+        return slices[fraction]
+
+    def evaluate(params, fraction=1.0):
+        part, barSet, indicators = bars(fraction)
+        if engine == 'vectorized':
+            signals = vec.SIGNALS[strategy.__name__](barSet, indicators, vec.strategyParams(strategy, params))
+            trades = vec.simulateBrackets(barSet, signals, starting_balance, stake)
+            row = vec.summarize(strategy.__name__, None, barSet, trades, starting_balance, stake)
+            return {**params, **{k: row[k] for k in ('Sharpe Ratio', 'Max Drawdown', 'SQN', 'Trades Taken', 'Closed Trades', 'Final Balance')}}
+        return optimizer.evaluate(strategy, part, params, starting_balance, stake)
+
+    return evaluate
+
+
+def _score(record, objective):
+    value = record.get(objective)
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return -math.inf
+    return value
+
+
+class ParamSearch:
+    """
+    Base class for the search strategies.
+
+    :param budget: Maximum number of backtests to run.
+    :param objective: Metric to maximise (a column of the result records).
+    :param patience: Stop after this many evaluations without improvement (None to use the whole budget).
+    :param seed: Random seed, for reproducible searches.
+    """
+
+    name = 'base'
+
+    def __init__(self, budget=50, objective='SQN', patience=None, seed=0):
+        self.budget = budget
+        self.objective = objective
+        self.patience = patience
+        self.rng = random.Random(seed)
+        self.records = []
+        self._best = -math.inf
+        self._sinceBest = 0
+
+    def run(self, space, evaluate):
+        """
+        Search the space and return every evaluated record, best first.
+        """
+        raise NotImplementedError
+
+    def _evaluate(self, evaluate, params, fraction=1.0):
+        record = evaluate(params, fraction)
+        record['Fraction'] = fraction
+        self.records.append(record)
+        if fraction == 1.0:
+            score = _score(record, self.objective)
+            if score > self._best:
+                self._best, self._sinceBest = score, 0
+            else:
+                self._sinceBest += 1
+        return record
+
+    def _exhausted(self):
+        if len(self.records) >= self.budget:
+            return True
+        return self.patience is not None and self._sinceBest >= self.patience
+
+    def _sample(self, space):
+        return {name: self.rng.choice(list(values)) for name, values in space.items()}
+
+    def _uniqueSample(self, space, n):
+        # Up to n distinct random combinations
+        size = math.prod(len(list(values)) for values in space.values())
+        seen, out = set(), []
+        while len(out) < min(n, size):
+            params = self._sample(space)
+            key = tuple(params.items())
+            if key not in seen:
+                seen.add(key)
+                out.append(params)
+        return out
+
+    def _result(self):
+        df = pd.DataFrame(self.records)
+        if df.empty:
+            return df
+        order = df[self.objective].astype(float).fillna(-np.inf)
+        return df.assign(_order=order).sort_values(['Fraction', '_order'], ascending=False).drop(columns='_order').reset_index(drop=True)
+
+
+class RandomSearch(ParamSearch):
+    """
+    Evaluates distinct combinations drawn uniformly at random.
+    """
+
+    name = 'random'
+
+    def run(self, space, evaluate):
+        size = math.prod(len(list(values)) for values in space.values())
+        seen = set()
+        while not self._exhausted() and len(seen) < size:
+            params = self._sample(space)
+            key = tuple(params.items())
+            if key in seen:
+                continue
+            seen.add(key)
+            self._evaluate(evaluate, params)
+        return self._result()
+
+
+class SuccessiveHalving(ParamSearch):
+    """
+    Scores many random candidates on a short slice of the data, then promotes the
+    best 1/eta of them to a slice eta times longer, until the survivors run on the full history.
+
+    :param eta: Reduction factor between rungs.
+    :param min_fraction: Fraction of the data used by the first rung.
+    """
+
+    name = 'halving'
+
+    def __init__(self, budget=50, objective='SQN', patience=None, seed=0, eta=3, min_fraction=1 / 9):
+        super().__init__(budget, objective, patience, seed)
+        self.eta = eta
+        self.min_fraction = min_fraction
+
+    def _plan(self, n, rungs):
+        # Candidates evaluated on each rung, at least one on every rung so a survivor always reaches the full history
+        return [max(1, n // self.eta ** k) for k in range(rungs)]
+
+    def run(self, space, evaluate):
+        rungs = max(1, int(round(math.log(1 / self.min_fraction, self.eta))) + 1)
+        fractions = [self.min_fraction * self.eta ** k for k in range(rungs - 1)] + [1.0]
+        # With fewer evaluations than rungs, the shortest slices are skipped
+        fractions = fractions[-max(1, min(rungs, self.budget)):]
+        rungs = len(fractions)
+        # Candidates such that n + n/eta + n/eta^2 + ... fits in the budget
+        n = max(1, int(self.budget / sum(self.eta ** -k for k in range(rungs))))
+        while n > 1 and sum(self._plan(n, rungs)) > self.budget:
+            n -= 1
+        candidates = self._uniqueSample(space, n)
+        plan = self._plan(len(candidates), rungs)
+
+        for rung, fraction in enumerate(fractions):
+            final = rung == rungs - 1
+            # Evaluations kept back for the later rungs, so the search always ends on full-history scores
+            reserved = sum(plan[rung + 1:])
+            scored = []
+            for params in candidates:
+                if self._exhausted() or (not final and len(self.records) >= self.budget - reserved):
+                    break
+                scored.append((_score(self._evaluate(evaluate, params, fraction), self.objective), params))
+            if final:
+                break
+            scored.sort(key=lambda item: item[0], reverse=True)
+            candidates = [params for _, params in scored[:plan[rung + 1]]]
+        return self._result()
+
+
+class TPESearch(ParamSearch):
+    """
+    A simple Tree-structured Parzen Estimator over discrete parameter values.
+
+    After `startup` random evaluations the results are split into the best `gamma`
+    share and the rest. For each parameter value a smoothed frequency is kept in
+    both groups, and the next candidate is the one of `candidates` draws from the
+    good distribution with the highest good/bad likelihood ratio.
+    """
+
+    name = 'tpe'
+
+    def __init__(self, budget=50, objective='SQN', patience=None, seed=0, startup=10, gamma=0.25, candidates=24):
+        super().__init__(budget, objective, patience, seed)
+        self.startup = startup
+        self.gamma = gamma
+        self.candidates = candidates
+
+    def run(self, space, evaluate):
+        values = {name: list(v) for name, v in space.items()}
+        size = math.prod(len(v) for v in values.values())
+        seen = set()
+
+        for params in self._uniqueSample(space, min(self.startup, self.budget)):
+            if self._exhausted():
+                break
+            seen.add(tuple(params.items()))
+            self._evaluate(evaluate, params)
+
+        while not self._exhausted() and len(seen) < size:
+            params = self._suggest(values, seen)
+            seen.add(tuple(params.items()))
+            self._evaluate(evaluate, params)
+        return self._result()
+
+    def _suggest(self, values, seen):
+        ranked = sorted(self.records, key=lambda r: _score(r, self.objective), reverse=True)
+        split = max(1, int(math.ceil(self.gamma * len(ranked))))
+        good, bad = ranked[:split], ranked[split:]
+
+        density = {}
+        for name, options in values.items():
+            good_counts = np.array([sum(r[name] == v for r in good) for v in options], dtype=float) + 1.0
+            bad_counts = np.array([sum(r[name] == v for r in bad) for v in options], dtype=float) + 1.0
+            density[name] = (good_counts / good_counts.sum(), bad_counts / bad_counts.sum())
+
+        best, best_ratio = None, -math.inf
+        for _ in range(self.candidates):
+            params, ratio = {}, 0.0
+            for name, options in values.items():
+                l, g = density[name]
+                i = self.rng.choices(range(len(options)), weights=l)[0]
+                params[name] = options[i]
+                ratio += math.log(l[i] / g[i])
+            if tuple(params.items()) not in seen and ratio > best_ratio:
+                best, best_ratio = params, ratio
+        # Every draw was already evaluated; fall back to any unseen combination
+        while best is None:
+            params = self._sample(values)
+            if tuple(params.items()) not in seen:
+                best = params
+        return best
+
+
+SEARCHES = {
+    RandomSearch.name: RandomSearch,
+    SuccessiveHalving.name: SuccessiveHalving,
+    TPESearch.name: TPESearch,
+}
+
+
+def runSearch(strategy, frame, space, search='random', budget=50, engine='vectorized', objective='SQN',
+              patience=None, seed=0, starting_balance=10000, stake=1000, **options):
+    """
+    Search a strategy's parameter space.
+
+    :param search: 'random', 'halving' or 'tpe'.
+    :param budget: Maximum number of backtests.
+    :param engine: 'vectorized' (bracket-order strategies) or 'backtrader'.
+    :param objective: Metric to maximise.
+    :param patience: Stop early after this many full-data evaluations without improvement.
+    :param options: Extra arguments of the search class (e.g. eta, min_fraction, startup, gamma).
+    :return: DataFrame of every evaluated combination, full-data results first and best first.
+    """
+    if search not in SEARCHES:
+        raise ValueError(f"Unknown search '{search}', expected one of {sorted(SEARCHES)}")
+    if engine == 'vectorized' and strategy.__name__ not in vec.SIGNALS:
+        engine = 'backtrader'
+    evaluate = makeEvaluator(strategy, frame, engine, starting_balance, stake)
+    searcher = SEARCHES[search](budget=budget, objective=objective, patience=patience, seed=seed, **options)
+    return searcher.run(space, evaluate)
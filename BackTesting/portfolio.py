@@ -0,0 +1,147 @@
+"""
+Portfolio backtests: several (strategy, symbol) pairs in one Cerebro run with shared cash.
+
+The symbols' bars are put on one shared timeline in a single vectorized merge.
+Every pair gets its own strategy instance bound to its own feed of its
+symbol's bars, and all of them trade through one broker. Because
+the account is shared, the equity curve shows the drawdowns the pairs cause
+together, not just each pair's own.
+"""
+import os
+import sys
+
+import backtrader as bt
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from BackTesting import metrics
+from BackTesting.storeFeed import storeFeed
+from Strategies.namiStrategy import NamiStrategy, numToDatetime64, runLogging
+
+# Columns zeroed on the flat bars filled in for a symbol's missing timestamps
+_ACTIVITY_COLUMNS = ('volume', 'tick_volume', 'real_volume')
+
+
+def alignFrames(frames):
+    """
+    Put the bar DataFrames of several symbols on one timeline.
+
+    The timeline is the union of all bar times within the range every symbol
+    covers, built with one sort-merge of the time arrays. A symbol without a bar
+    at a timeline time gets a flat bar at its previous close with no volume.
+    Each frame is re-indexed with a single vectorized gather, not bar by bar.
+
+    :param frames: Dict of symbol -> DataFrame of bars (time index, open/high/low/close columns).
+    :return: (dict of symbol -> aligned DataFrame, dict of symbol -> number of filled bars)
+    """
+    times = {symbol: df.index.to_numpy(dtype='datetime64[ns]') for symbol, df in frames.items() if not df.empty}
+    if not times:
+        return {}, {}
+    start = max(t[0] for t in times.values())
+    end = min(t[-1] for t in times.values())
+    timeline = np.unique(np.concatenate([t[(t >= start) & (t <= end)] for t in times.values()]))
+
+    aligned, filled_counts = {}, {}
+    for symbol, t in times.items():
+        # Latest bar at or before each timeline time
+        pos = np.searchsorted(t, timeline, side='right') - 1
+        filled = t[pos] != timeline
+        df = frames[symbol].iloc[pos].copy()
+        df.index = pd.DatetimeIndex(timeline, name=frames[symbol].index.name)
+        if filled.any():
+            close = df['close'].to_numpy()
+            for col in ('open', 'high', 'low'):
+                df[col] = np.where(filled, close, df[col].to_numpy())
+            for col in _ACTIVITY_COLUMNS:
+                if col in df.columns:
+                    df.loc[filled, col] = 0
+        aligned[symbol] = df
+        filled_counts[symbol] = int(filled.sum())
+    return aligned, filled_counts
+
+
+def boundTo(strategy, index):
+    """
+    Subclass of a strategy that trades the Cerebro data at `index` instead of the first one.
+
+    Cerebro hands every strategy all of its datas; the subclass moves its own to
+    the front before the strategy's __init__ builds indicators on self.data.
+    """
+    def __init__(self, *args, **kwargs):
+        self.datas.insert(0, self.datas.pop(index))
+        self.data = self.data0 = self._clock = self.datas[0]
+        strategy.__init__(self, *args, **kwargs)
+
+    return type(strategy.__name__, (strategy,), {'__init__': __init__, '__module__': strategy.__module__})
+
+
+def runPortfolio(pairs, frames, starting_balance=100000, stake=10000, loglevel='silent'):
+    """
+    Backtest several (strategy, symbol) pairs together with one account.
+
+    :param pairs: (strategy class, symbol) or (strategy class, symbol, params) tuples; strategies must be NamiStrategy subclasses.
+    :param frames: Dict of symbol -> DataFrame of bars, for every symbol in `pairs`.
+    :param starting_balance: Cash shared by all pairs.
+    :param stake: Units per order for every pair.
+    :param loglevel: Strategy log level during the run (see Strategies.namiStrategy).
+    :return: (one-row portfolio DataFrame, DataFrame with one row per pair)
+    """
+    pairs = [(pair[0], pair[1], pair[2] if len(pair) > 2 else {}) for pair in pairs]
+    for strategy, _, _ in pairs:
+        if not issubclass(strategy, NamiStrategy):
+            raise ValueError(f"{strategy.__name__} is not a NamiStrategy, portfolio runs need its trade journal")
+
+    symbols = list(dict.fromkeys(symbol for _, symbol, _ in pairs))
+    aligned, filled = alignFrames({symbol: frames[symbol] for symbol in symbols})
+    missing = [symbol for symbol in symbols if symbol not in aligned]
+    if missing:
+        raise ValueError(f"No bars for {', '.join(missing)}")
+
+    cerebro = bt.Cerebro(stdstats=False)
+    # One feed per pair: the broker keeps one position per feed, so two strategies
+    # on the same symbol would otherwise trade each other's position
+    for index, (strategy, symbol, params) in enumerate(pairs):
+        cerebro.adddata(storeFeed(aligned[symbol]), name=f'{strategy.__name__}@{symbol}')
+        cerebro.addstrategy(boundTo(strategy, index), **params)
+    cerebro.addsizer(bt.sizers.FixedSize, stake=stake)
+    cerebro.broker.setcash(starting_balance)
+
+    with runLogging(loglevel):
+        runs = cerebro.run()
+
+    rows = []
+    for run, (strategy, symbol, _) in zip(runs, pairs):
+        pnl = run.journal['pnlcomm']
+        opened = run.result['Trades Taken']
+        rows.append({
+            'Strategy': strategy.__name__,
+            'Symbol': symbol,
+            'PnL': float(pnl.sum()),
+            'SQN': metrics.sqn(pnl),
+            'Trades Taken': opened,
+            'Closed Trades': len(pnl),
+            'Win rate': metrics.winRate(pnl, opened),
+            'Filled Bars': filled[symbol],
+        })
+    per_pair = pd.DataFrame(rows)
+
+    # Every strategy records the shared account's value, so any one of them holds the portfolio curve
+    equity = runs[0].equity
+    times = numToDatetime64(np.frombuffer(runs[0].data.datetime.array, dtype=np.float64, count=len(equity)))
+    all_pnl = np.concatenate([run.journal['pnlcomm'] for run in runs])
+    total_trades = int(per_pair['Trades Taken'].sum())
+    portfolio = pd.DataFrame([{
+        'Pairs': len(pairs),
+        'Symbols': len(symbols),
+        'Bars': len(equity),
+        'Starting Balance': starting_balance,
+        'Final Balance': cerebro.broker.getvalue(),
+        'Sharpe Ratio': metrics.sharpeRatio(times, equity, starting_balance),
+        'Max Drawdown': metrics.drawdown(equity),
+        'Worst Drawdown': metrics.maxDrawdown(equity),
+        'SQN': metrics.sqn(all_pnl),
+        'Trades Taken': total_trades,
+        'Win rate': metrics.winRate(all_pnl, total_trades),
+    }])
+    return portfolio, per_pair
@@ -0,0 +1,329 @@
+"""
+Opt-in instrumentation of backtest runs.
+
+A RunProfile passed to Backtester.runBackTestForStrategy records where the
+run's time goes: wall time per phase, how often and how fast the strategy's
+next() is called, the time of each of its indicators and the peak RSS of the
+process. Inside cerebro.run the phases are split by a ProfileAnalyzer that
+wraps the strategy's next(), its indicators and the other analyzers when the
+run starts, so nothing is added to runs that are not profiled.
+
+Phases:
+    data        loading the bars
+    feeds       building the Backtrader feeds
+    setup       preloading the feeds and building the strategy and its indicators
+    indicators  computing the indicators (precomputed in runonce mode, per bar otherwise)
+    next        the strategy's next() callbacks
+    analyzers   the analyzers' per-bar updates
+    engine      the rest of the bar loop: broker, order matching and notifications
+    results     the strategy's summary and the end of the run
+    plot        plotting
+
+One run can also be captured with cProfile or pyinstrument for a full call
+profile. Records are plain dicts, written as JSON or CSV by writeReport and
+summed across a sweep by aggregateProfiles.
+"""
+import cProfile
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+
+import backtrader as bt
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+try:
+    import pyinstrument
+except ImportError:
+    pyinstrument = None
+
+PHASES = ('data', 'feeds', 'setup', 'indicators', 'next', 'analyzers', 'engine', 'results', 'plot')
+CAPTURES = ('cprofile', 'pyinstrument')
+
+
+def peakRss():
+    """
+    Peak resident set size of this process so far in bytes, or None where it cannot be read.
+    """
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024  # kilobytes on Linux
+    if psutil is not None:
+        info = psutil.Process().memory_info()
+        return getattr(info, 'peak_wset', info.rss)
+    return None
+
+
+def phase(profile, name):
+    """
+    Context manager timing a phase of `profile`, or doing nothing when there is no profile.
+    """
+    return profile.phase(name) if profile is not None else nullcontext()
+
+
+def indicatorName(indicator):
+    """
+    Indicator class with its parameter values, e.g. BollingerBands(20, 2).
+    """
+    values = ', '.join(str(value) for value in indicator.params._getvalues())
+    return f'{type(indicator).__name__}({values})'
+
+
+class RunProfile:
+    """
+    Timings of one backtest run.
+
+    :param name: Name of the run in reports, e.g. SFPStrategy_EURUSD_M15.
+    :param capture: 'cprofile' or 'pyinstrument' to also record a call profile of the run.
+    :param outdir: Directory for the call profile (default: the working directory).
+    """
+
+    def __init__(self, name='run', capture=None, outdir=None):
+        if capture is not None and capture not in CAPTURES:
+            raise ValueError(f"Unknown capture '{capture}', expected one of {CAPTURES}")
+        if capture == 'pyinstrument' and pyinstrument is None:
+            raise ImportError("capture='pyinstrument' needs the pyinstrument package")
+        self.name = name
+        self.capture = capture
+        self.outdir = outdir
+        self.captureFile = None
+        self.info = {}
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.indicators = {}
+        self.nextCalls = 0
+        self.bars = 0
+        self._runStart = self._loopStart = self._loopEnd = None
+        self._stopSeconds = 0.0
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Add the wall time of the block to phase `name`.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] += time.perf_counter() - start
+
+    @contextmanager
+    def running(self):
+        """
+        Time cerebro.run() inside the block, split into phases by the ProfileAnalyzer.
+        """
+        with self._capturing():
+            self._runStart = time.perf_counter()
+            yield
+            runEnd = time.perf_counter()
+        if self._loopStart is None:  # no ProfileAnalyzer ran, the whole run counts as engine time
+            self.phases['engine'] += runEnd - self._runStart
+            return
+        loop = self._loopEnd - self._loopStart
+        inner = self.phases['indicators'] + self.phases['next'] + self.phases['analyzers']
+        self.phases['setup'] += self._loopStart - self._runStart
+        self.phases['engine'] += max(loop - inner, 0.0)
+        self.phases['results'] += runEnd - self._loopEnd
+
+    @contextmanager
+    def _capturing(self):
+        if self.capture is None:
+            yield
+            return
+        os.makedirs(self.outdir or '.', exist_ok=True)
+        if self.capture == 'cprofile':
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                yield
+            finally:
+                profiler.disable()
+                self.captureFile = os.path.join(self.outdir or '.', f'{self.name}.prof')
+                profiler.dump_stats(self.captureFile)  # read with pstats or snakeviz
+        else:
+            profiler = pyinstrument.Profiler()
+            profiler.start()
+            try:
+                yield
+            finally:
+                profiler.stop()
+                self.captureFile = os.path.join(self.outdir or '.', f'{self.name}.html')
+                with open(self.captureFile, 'w') as out:
+                    out.write(profiler.output_html())
+
+    def attach(self, cerebro):
+        """
+        Add the ProfileAnalyzer that splits the run into phases to `cerebro`.
+        """
+        cerebro.addanalyzer(ProfileAnalyzer, profile=self)
+
+    def record(self):
+        """
+        The profile as a JSON-serialisable dict.
+        """
+        total = sum(self.phases.values())
+        loop = self.phases['next'] + self.phases['indicators'] + self.phases['analyzers'] + self.phases['engine']
+        return {
+            'run': self.name,
+            **self.info,
+            'bars': self.bars,
+            'total_seconds': total,
+            'phases': dict(self.phases),
+            'next_calls': self.nextCalls,
+            # Strategy bars per second of the bar loop, the throughput of next() with everything it waits on
+            'next_per_second': self.nextCalls / loop if loop > 0 else 0.0,
+            'next_call_us': 1e6 * self.phases['next'] / self.nextCalls if self.nextCalls else 0.0,
+            'peak_rss_bytes': peakRss(),
+            'indicators': dict(sorted(self.indicators.items(), key=lambda item: -item[1])),
+            'capture': self.captureFile,
+        }
+
+
+def _timed(obj, method, add):
+    # Replace a bound method of one instance by a wrapper that passes its wall time to `add`
+    inner = getattr(obj, method)
+    clock = time.perf_counter
+
+    def wrapper(*args, **kwargs):
+        start = clock()
+        try:
+            return inner(*args, **kwargs)
+        finally:
+            add(clock() - start)
+
+    setattr(obj, method, wrapper)
+
+
+class ProfileAnalyzer(bt.Analyzer):
+    """
+    Wraps the strategy's next(), its top-level indicators and the other analyzers with timers when the run starts.
+    Nested indicators count towards the indicator that built them.
+    """
+    params = (
+        ('profile', None),
+    )
+
+    def start(self):
+        profile = self.p.profile
+        phases = profile.phases
+        strategy = self.strategy
+
+        def addNext(seconds):
+            profile.nextCalls += 1
+            phases['next'] += seconds
+
+        def addPhase(name):
+            def add(seconds):
+                phases[name] += seconds
+            return add
+
+        def addIndicator(name):
+            def add(seconds):
+                profile.indicators[name] = profile.indicators.get(name, 0.0) + seconds
+                phases['indicators'] += seconds
+            return add
+
+        _timed(strategy, 'next', addNext)
+
+        def addStop(seconds):
+            profile._stopSeconds += seconds
+
+        _timed(strategy, 'stop', addStop)
+        for indicator in strategy._lineiterators[bt.LineIterator.IndType]:
+            add = addIndicator(indicatorName(indicator))
+            _timed(indicator, '_once', add)
+            _timed(indicator, '_next', add)
+        for analyzer in strategy.analyzers:
+            if analyzer is not self:
+                for method in ('_prenext', '_nextstart', '_next'):
+                    _timed(analyzer, method, addPhase('analyzers'))
+        profile.bars = strategy.data.buflen()
+        profile._loopStart = time.perf_counter()
+
+    def stop(self):
+        profile = self.p.profile
+        # The strategy's own stop() ran just before; the loop ended when it started
+        profile._loopEnd = time.perf_counter() - profile._stopSeconds
+
+    def get_analysis(self):
+        return self.p.profile.record()
+
+
+def writeReport(records, path):
+    """
+    Write profile records to `path`: a JSON list, or a CSV with one row per run
+    and the phases and indicators flattened into columns (phases.next, indicators.ATR(14), ...).
+    """
+    records = [records] if isinstance(records, dict) else list(records)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    if path.endswith('.json'):
+        with open(path, 'w') as out:
+            json.dump(records, out, indent=2)
+    else:
+        pd.json_normalize(records).to_csv(path, index=False)
+
+
+def readReports(directory):
+    """
+    All profile records in the JSON files of `directory`.
+    """
+    records = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith('.json'):
+            with open(os.path.join(directory, name)) as source:
+                loaded = json.load(source)
+            records.extend(loaded if isinstance(loaded, list) else [loaded])
+    return records
+
+
+def summarizeProfiles(directory, runs):
+    """
+    Write profiles.csv (one row per run) and summary.csv (per strategy) for the given runs of `directory`.
+
+    :param runs: Names of the runs whose JSON reports to include, e.g. the jobs a sweep executed.
+    :return: The per-strategy summary (see aggregateProfiles).
+    """
+    records = []
+    for run in runs:
+        path = os.path.join(directory, f'{run}.json')
+        if os.path.exists(path):
+            with open(path) as source:
+                records.extend(json.load(source))
+    if not records:
+        return pd.DataFrame()
+    writeReport(records, os.path.join(directory, 'profiles.csv'))
+    summary = aggregateProfiles(records)
+    summary.to_csv(os.path.join(directory, 'summary.csv'))
+    return summary
+
+
+def aggregateProfiles(records, by='strategy'):
+    """
+    Sum profile records across a sweep.
+
+    :param by: Column to group by, e.g. 'strategy' or 'symbol'.
+    :return: DataFrame with the runs, bars, seconds per phase, next() calls per second over all the
+             runs' bar loops, the highest peak RSS and the seconds of each indicator, slowest group first.
+    """
+    flat = pd.json_normalize(list(records))
+    if flat.empty:
+        return flat
+    summed = [col for col in flat.columns if col.startswith(('phases.', 'indicators.'))]
+    summed += ['bars', 'total_seconds', 'next_calls']
+    grouped = flat.groupby(by)
+    out = grouped[summed].sum(min_count=1)
+    out.insert(0, 'runs', grouped.size())
+    loop = out[[f'phases.{name}' for name in ('next', 'indicators', 'analyzers', 'engine')]].sum(axis=1)
+    out['next_per_second'] = out['next_calls'] / loop.where(loop > 0)
+    out['peak_rss_bytes'] = grouped['peak_rss_bytes'].max()
+    return out.sort_values('total_seconds', ascending=False)
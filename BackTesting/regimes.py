@@ -0,0 +1,137 @@
+"""
+Regime tags of bars and a strategy x symbol x regime performance cube.
+
+Every bar is tagged with the trading session it opens in and with the
+volatility bucket of its ATR (as a fraction of the close), split at the
+quantiles of the whole series. Trades are joined to the tags of their entry
+bar, so one full-length backtest per strategy and symbol shows how it does in
+each regime, instead of re-running it on hand-picked windows.
+
+The quantile edges are computed over the whole series, so the buckets are for
+analysing finished runs, not for trading decisions.
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from Data import dataLoader as dl
+from Data.barStore import BarStore
+from Indicators import arrayIndicators as ai
+
+# Session of each UTC hour: Asia 22:00-07:00, London 07:00-13:00, NY 13:00-22:00
+SESSIONS = ('Asia', 'London', 'NY')
+_SESSION_OF_HOUR = np.array([0] * 7 + [1] * 6 + [2] * 9 + [0] * 2, dtype=np.int8)
+WARMUP = 'Warm-up'  # volatility bucket of the bars before the ATR is defined
+
+
+def volatilityLabels(buckets):
+    """
+    Names of the volatility buckets, calmest first.
+    """
+    if buckets == 3:
+        return ['Low', 'Mid', 'High']
+    return [f'Q{i + 1}' for i in range(buckets)]
+
+
+def _bars(bars):
+    if isinstance(bars, dl.Data):
+        return bars.bar_store()
+    if isinstance(bars, BarStore):
+        return bars
+    return BarStore.from_frame(bars)
+
+
+def tagBars(bars, buckets=3, atr_period=14, server_offset=0):
+    """
+    Session and volatility bucket of every bar.
+
+    :param bars: Data handle, DataFrame of bars (as Data.full_data) or BarStore.
+    :param buckets: Number of ATR quantile buckets.
+    :param server_offset: Hours the bar timestamps are ahead of UTC (MT5 server time is often UTC+2 or +3).
+    :return: DataFrame indexed by bar time with categorical Session and Volatility columns and the ATR %.
+    """
+    store = _bars(bars)
+    hours = ((store.time // 3600 + server_offset) % 24).astype(np.intp)
+    session = _SESSION_OF_HOUR[hours]
+
+    close = np.asarray(store.close, dtype=np.float64)
+    relative = ai.atr(np.asarray(store.high, dtype=np.float64), np.asarray(store.low, dtype=np.float64),
+                      close, atr_period) / close
+    defined = ~np.isnan(relative)
+    volatility = np.zeros(len(store), dtype=np.int8)  # 0 is the warm-up bucket
+    if defined.any():
+        edges = np.quantile(relative[defined], np.linspace(0.0, 1.0, buckets + 1)[1:-1])
+        volatility[defined] = 1 + np.searchsorted(edges, relative[defined], side='right')
+
+    return pd.DataFrame({
+        'Session': pd.Categorical.from_codes(session, SESSIONS),
+        'Volatility': pd.Categorical.from_codes(volatility, [WARMUP] + volatilityLabels(buckets)),
+        'ATR %': 100.0 * relative,
+    }, index=pd.DatetimeIndex(store.times(), name='time'))
+
+
+def regimeCube(results, bars, buckets=3, atr_period=14, server_offset=0):
+    """
+    Performance of every run split by the regime its trades entered in.
+
+    :param results: Results with Strategy, Symbol, 'Trade Entry' and 'Trade PnL' columns,
+                    e.g. of runSweep(..., keepTrades=True), all on one timeframe.
+    :param bars: Dict of symbol -> the bars the runs were on (Data handle, DataFrame or BarStore).
+    :param buckets: Number of ATR quantile buckets (see tagBars).
+    :param server_offset: Hours the bar timestamps are ahead of UTC.
+    :return: DataFrame indexed by Strategy, Symbol, Session and Volatility with Trades, Net PnL,
+             Avg PnL, Win rate, SQN and Bar Share (the share of the symbol's bars in that regime).
+    """
+    has_trades = [isinstance(pnl, (list, tuple, np.ndarray)) for pnl in results['Trade PnL']]
+    results = results[has_trades]
+    counts = np.array([len(pnl) for pnl in results['Trade PnL']], dtype=np.int64)
+    run = np.repeat(np.arange(len(results)), counts)
+    entry = np.concatenate([np.asarray(times, dtype=np.int64) for times in results['Trade Entry']] + [np.zeros(0, np.int64)])
+    pnl = np.concatenate([np.asarray(p, dtype=np.float64) for p in results['Trade PnL']] + [np.zeros(0)])
+    symbols = results['Symbol'].to_numpy()[run]
+
+    session = np.zeros(len(pnl), dtype=np.int8)
+    volatility = np.zeros(len(pnl), dtype=np.int8)
+    exposure = []
+    for symbol in pd.unique(results['Symbol']):
+        tags = tagBars(bars[symbol], buckets, atr_period, server_offset)
+        exposure.append(tags.groupby(['Session', 'Volatility'], observed=True).size().rename('Bars')
+                        .to_frame().assign(Symbol=symbol).reset_index())
+        # Tags of the last bar opened at or before each entry
+        times = tags.index.to_numpy(dtype='datetime64[s]').astype(np.int64)
+        mine = symbols == symbol
+        bar = np.clip(np.searchsorted(times, entry[mine], side='right') - 1, 0, len(times) - 1)
+        session[mine] = tags['Session'].cat.codes.to_numpy()[bar]
+        volatility[mine] = tags['Volatility'].cat.codes.to_numpy()[bar]
+
+    trades = pd.DataFrame({
+        'Strategy': results['Strategy'].to_numpy()[run],
+        'Symbol': symbols,
+        'Session': pd.Categorical.from_codes(session, SESSIONS),
+        'Volatility': pd.Categorical.from_codes(volatility, [WARMUP] + volatilityLabels(buckets)),
+        'PnL': pnl,
+        'PnL2': pnl * pnl,
+        'Win': pnl >= 0.0,
+    })
+    cube = trades.groupby(['Strategy', 'Symbol', 'Session', 'Volatility'], observed=True).agg(
+        Trades=('PnL', 'size'), NetPnL=('PnL', 'sum'), Squares=('PnL2', 'sum'), Wins=('Win', 'sum'))
+    mean = cube['NetPnL'] / cube['Trades']
+    deviation = np.sqrt(np.maximum(cube['Squares'] / cube['Trades'] - mean * mean, 0.0))
+    cube = pd.DataFrame({
+        'Trades': cube['Trades'],
+        'Net PnL': cube['NetPnL'],
+        'Avg PnL': mean,
+        'Win rate': 100.0 * cube['Wins'] / cube['Trades'],
+        # As metrics.sqn: 0 with fewer than two trades or no spread
+        'SQN': np.where((cube['Trades'] >= 2) & (deviation > 0), np.sqrt(cube['Trades']) * mean / deviation, 0.0),
+    })
+
+    if exposure:
+        bars_in = pd.concat(exposure, ignore_index=True)
+        bars_in['Bar Share'] = 100.0 * bars_in['Bars'] / bars_in.groupby('Symbol')['Bars'].transform('sum')
+        cube = cube.join(bars_in.set_index(['Symbol', 'Session', 'Volatility'])['Bar Share'],
+                         on=['Symbol', 'Session', 'Volatility'])
+    return cube
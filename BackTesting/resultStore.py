@@ -0,0 +1,109 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import inspect
+import sqlite3
+import pandas as pd
+
+
+class ResultStore:
+    """
+    A local SQLite store of backtest results, memoised by the content of their inputs.
+
+    Every run is keyed by a hash of the source code it ran (the strategy, its project
+    base classes, the indicator, metric and feed modules, the backtest runner that builds
+    the stored row and the resampler of higher-timeframe feeds), its parameters and run
+    settings, the symbol and timeframe, and a fingerprint of the bars it ran on. A run
+    whose key is already stored can be loaded instead of executed again.
+    """
+
+    DEFAULT_PATH = 'backtest_results.sqlite'
+    # Modules every strategy's results depend on, besides the modules of its class hierarchy
+    ENGINE_MODULES = ('Indicators.fastIndicators', 'Indicators.arrayIndicators', 'Indicators.indicatorCache',
+                      'BackTesting.metrics', 'BackTesting.storeFeed', 'BackTesting.backtest', 'Data.resample')
+    ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+    def __init__(self, path=None):
+        self.path = path or os.environ.get('NAMI_RESULT_STORE', os.path.join(os.getcwd(), self.DEFAULT_PATH))
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS runs ("
+            " key TEXT PRIMARY KEY, strategy TEXT, symbol TEXT, timeframe TEXT,"
+            " params TEXT, fingerprint TEXT, created REAL, result TEXT)"
+        )
+        self.conn.commit()
+
+    @staticmethod
+    def strategySource(strategy):
+        """
+        Source code of every project module a strategy's results depend on: the modules of the classes in
+        its MRO (so NamiStrategy's order and journal logic and helper indicators in the same file count too)
+        and ENGINE_MODULES. Modules outside the project, e.g. backtrader, are left out.
+        """
+        names = [cls.__module__ for cls in strategy.__mro__] + list(ResultStore.ENGINE_MODULES)
+        sources = {}
+        for name in dict.fromkeys(names):
+            module = sys.modules.get(name)
+            path = getattr(module, '__file__', None)
+            if path is None or not os.path.abspath(path).startswith(ResultStore.ROOT + os.sep):
+                continue
+            try:
+                sources[name] = inspect.getsource(module)
+            except (OSError, TypeError):
+                sources[name] = name
+        return sources or strategy.__qualname__
+
+    @staticmethod
+    def runKey(strategy, params, symbol, timeframe, fingerprint, cash=None, stake=None):
+        """
+        Content hash identifying one backtest run.
+
+        :param cash: Starting balance of the run.
+        :param stake: Position size of the run's sizer.
+        """
+        payload = json.dumps({
+            'source': ResultStore.strategySource(strategy),
+            'strategy': strategy.__qualname__,
+            'params': params or {},
+            'cash': cash,
+            'stake': stake,
+            'symbol': symbol,
+            'timeframe': timeframe,
+            'fingerprint': fingerprint,
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key):
+        """
+        Return the stored result DataFrame for a run key, or None.
+        """
+        row = self.conn.execute("SELECT result FROM runs WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        return pd.DataFrame(json.loads(row[0]))
+
+    def put(self, key, strategy, symbol, timeframe, params, fingerprint, df):
+        """
+        Store the result DataFrame of a run, replacing any previous result with the same key.
+
+        Values go through json.dumps, whose floats round-trip exactly, so a cache hit returns the numbers of a fresh run.
+        """
+        self.conn.execute(
+            "INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (key, strategy.__name__, symbol, str(timeframe), json.dumps(params or {}, sort_keys=True, default=str),
+             fingerprint, time.time(), json.dumps(df.to_dict('records'), default=str)),
+        )
+        self.conn.commit()
+
+    def all(self):
+        """
+        Return every stored result as one DataFrame.
+        """
+        rows = self.conn.execute("SELECT result FROM runs ORDER BY created").fetchall()
+        frames = [pd.DataFrame(json.loads(result)) for (result,) in rows]
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+from multiprocessing import shared_memory
+
+
+class SharedBars:
+    """
+    OHLCV bars placed once in a shared memory block so worker processes can attach
+    to them without the bars being pickled to each worker.
+
+    Layout of the block: `length` int64 epoch-nanosecond timestamps followed by
+    `length` float64 values for each of COLUMNS.
+    """
+
+    COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+    def __init__(self, shm, length, owner):
+        self.shm = shm
+        self.length = length
+        self.owner = owner
+        self.time = np.ndarray((length,), dtype=np.int64, buffer=shm.buf)
+        self.values = np.ndarray((len(self.COLUMNS), length), dtype=np.float64, buffer=shm.buf, offset=length * 8)
+
+    @classmethod
+    def create(cls, df):
+        """
+        Copy a time-indexed bars DataFrame into a new shared memory block.
+        """
+        length = len(df)
+        size = max(length * 8 * (1 + len(cls.COLUMNS)), 1)
+        bars = cls(shared_memory.SharedMemory(create=True, size=size), length, owner=True)
+        bars.time[:] = df.index.to_numpy(dtype='datetime64[ns]').astype(np.int64)
+        for row, col in enumerate(cls.COLUMNS):
+            bars.values[row] = df[col].to_numpy(dtype=np.float64) if col in df.columns else 0.0
+        return bars
+
+    @property
+    def spec(self):
+        """
+        A small picklable description that another process passes to attach().
+        """
+        return self.shm.name, self.length
+
+    @classmethod
+    def attach(cls, spec):
+        """
+        Attach to a block created by another process.
+        """
+        name, length = spec
+        try:
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # Python < 3.13 has no track flag; pool workers share the creator's resource tracker,
+            # which drops the block once the creator unlinks it
+            shm = shared_memory.SharedMemory(name=name)
+        return cls(shm, length, owner=False)
+
+    def frame(self):
+        """
+        Return a DataFrame whose columns are views onto the shared block.
+        """
+        index = pd.DatetimeIndex(self.time.view('datetime64[ns]'), name='time')
+        return pd.DataFrame({col: self.values[row] for row, col in enumerate(self.COLUMNS)}, index=index, copy=False)
+
+    def close(self):
+        """
+        Detach from the block, and free it if this process created it.
+        """
+        self.time = self.values = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,117 @@
+"""
+Backtrader data feed reading a Data.barStore.BarStore.
+
+bt.feeds.PandasData loads a DataFrame one row at a time through .iloc, a few
+hundred microseconds per bar. StoreData preloads all bars at once: every line
+buffer is filled straight from the store's contiguous arrays, and the
+datetime line is computed for all bars in a few NumPy passes.
+"""
+import os
+import sys
+from array import array
+
+import backtrader as bt
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from Data.barStore import BarStore
+
+# Backtrader stores datetimes as proleptic Gregorian ordinals; this is 1970-01-01
+_EPOCH_ORDINAL = 719163
+
+
+def dateNumbers(time):
+    """
+    Convert epoch seconds to Backtrader date numbers, bit for bit as bt.date2num does.
+
+    date2num adds the ordinal day and the hour, minute and second fractions with
+    math.fsum; the same sum is built here with compensated (two-sum) additions.
+    """
+    days, seconds = np.divmod(np.asarray(time, dtype=np.int64), 86400)
+    hours, rest = np.divmod(seconds, 3600)
+    minutes, seconds = np.divmod(rest, 60)
+    total = (days + _EPOCH_ORDINAL).astype(np.float64)
+    error = np.zeros_like(total)
+    for part in (hours / 24.0, minutes / 1440.0, seconds / 86400.0):
+        added = total + part
+        rounded = added - total
+        error += (total - (added - rounded)) + (part - rounded)
+        total = added
+    return total + error
+
+
+def _lineArray(values):
+    line = array('d')
+    line.frombytes(np.ascontiguousarray(values, dtype=np.float64).tobytes())
+    return line
+
+
+class StoreData(bt.feed.DataBase):
+    """
+    Data feed of the bars in a BarStore.
+
+    Use as StoreData(store=BarStore.from_frame(df)) wherever bt.feeds.PandasData(dataname=df) was used;
+    the feed delivers the same values.
+    """
+    params = (
+        ('store', None),
+    )
+
+    def start(self):
+        super().start()
+        self._idx = -1
+        self._dates = dateNumbers(self.p.store.time)
+
+    def preload(self):
+        # Bar by bar loading is only needed for what the bulk path does not model
+        unbounded = self.lines.datetime.mode == bt.LineBuffer.UnBounded
+        if self._filters or self._ffilters or self._tzinput or not unbounded or len(self.lines.datetime.array):
+            return super().preload()
+
+        store = self.p.store
+        keep = (self._dates >= self.fromdate) & (self._dates <= self.todate)
+        count = int(keep.sum())
+        columns = {
+            'datetime': self._dates[keep],
+            'open': store.open[keep],
+            'high': store.high[keep],
+            'low': store.low[keep],
+            'close': store.close[keep],
+            'volume': store.volume[keep],
+            'openinterest': np.full(count, np.nan),
+        }
+        for alias in self.getlinealiases():
+            line = getattr(self.lines, alias)
+            line.array = _lineArray(columns[alias])
+            # Where `count` forward() calls would have left the buffer
+            line.idx = count - 1
+            line.lencount = count
+        # Every bar is loaded; a later _load() must not start over
+        self._idx = len(store) - 1
+
+        self._last()
+        self.home()
+
+    def _load(self):
+        self._idx += 1
+        store = self.p.store
+        if self._idx >= len(store):
+            return False
+
+        i = self._idx
+        self.lines.datetime[0] = self._dates[i]
+        self.lines.open[0] = float(store.open[i])
+        self.lines.high[0] = float(store.high[i])
+        self.lines.low[0] = float(store.low[i])
+        self.lines.close[0] = float(store.close[i])
+        self.lines.volume[0] = float(store.volume[i])
+        return True
+
+
+def storeFeed(bars, **kwargs):
+    """
+    StoreData of a BarStore, or of a DataFrame of bars (as Data.full_data).
+    """
+    if not isinstance(bars, BarStore):
+        bars = BarStore.from_frame(bars)
+    return StoreData(store=bars, **kwargs)
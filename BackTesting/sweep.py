@@ -0,0 +1,176 @@
+import os
+import sys
+import time
+import itertools
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from Data import dataLoader as dl
+from Data import timeframes as tf
+from BackTesting.backtest import Backtester, STARTING_BALANCE, STAKE
+from BackTesting.profiling import RunProfile, phase, writeReport, summarizeProfiles
+from Strategies.namiStrategy import runLogging
+
+# Data handles loaded by this (worker) process, keyed by (symbol, timeframe, Data arguments)
+_workerData = {}
+
+
+def _loadData(symbol, timeframe, dataKwargs):
+    """
+    Return the Data handle for a symbol, timeframe and Data arguments, loading its bars at most once per process.
+    """
+    # numOfCandles, source, offline etc. change the bars, so they are part of the key
+    key = (symbol, timeframe, tuple(sorted(dataKwargs.items())))
+    if key not in _workerData:
+        data = dl.Data(symbol=symbol, timeframe=timeframe, **dataKwargs)
+        data.bar_store()  # materialise once, every strategy on this worker reuses it
+        _workerData[key] = data
+    return _workerData[key]
+
+
+def jobName(symbol, timeframe, strategy):
+    """
+    Name of a sweep job in profile reports, e.g. SFPStrategy_EURUSD_M15.
+    """
+    return f'{strategy.__name__}_{symbol}_{tf.NAMES.get(timeframe, timeframe)}'
+
+
+def _runJob(index, symbol, timeframe, strategy, dataKwargs, logging=('silent', None), keepTrades=False,
+            profiling=(None, None, 'cprofile')):
+    start = time.perf_counter()
+    profiledir, profileJob, profiler = profiling
+    profile = None
+    if profiledir:
+        name = jobName(symbol, timeframe, strategy)
+        profile = RunProfile(name, profiler if name == profileJob else None, profiledir)
+    with phase(profile, 'data'):
+        data = _loadData(symbol, timeframe, dataKwargs)
+    with runLogging(*logging):
+        df = Backtester.runBackTestForStrategy(strategy, fxdata=data, keepTrades=keepTrades, profile=profile)
+    df.insert(2, 'Timeframe', tf.NAMES.get(timeframe, timeframe))
+    if profile is not None:
+        writeReport(profile.record(), os.path.join(profiledir, f'{profile.name}.json'))
+    return index, df, time.perf_counter() - start
+
+
+def buildGrid(symbols, timeframes, strategies):
+    """
+    Return the (symbol, timeframe, strategy) jobs of a sweep.
+
+    Jobs are ordered so all strategies of one bar set are adjacent, which keeps
+    a worker on the same data for consecutive jobs.
+    """
+    return list(itertools.product(symbols, timeframes, strategies))
+
+
+def iterSweep(symbols, strategies, timeframes=(tf.TIMEFRAME_M15,), workers=None, store=None,
+              loglevel='silent', logdir=None, keepTrades=False, profiledir=None, profileJob=None, profiler='cprofile',
+              **dataKwargs):
+    """
+    Run a sweep and yield (job index, result DataFrame, seconds) for each job as it finishes.
+
+    :param workers: Number of worker processes (default: all cores). 1 runs in this process.
+    :param store: Optional ResultStore. Jobs whose inputs are unchanged are loaded from it
+                  (yielded first, with 0 seconds) and new results are saved to it.
+    :param loglevel: Strategy log level inside the jobs (see Strategies.namiStrategy).
+    :param logdir: Directory for one buffered log file per job, instead of stdout.
+    :param keepTrades: Keep each run's closed trades in 'Trade PnL' and 'Trade Entry' columns (see Ranking.robustness).
+    :param profiledir: Directory for one JSON profile report per executed job (see BackTesting.profiling).
+    :param profileJob: Name of one job (see jobName) to also capture a call profile of, in profiledir.
+    :param profiler: Call profiler of profileJob, 'cprofile' or 'pyinstrument'.
+    :param dataKwargs: Extra arguments for Data, e.g. numOfCandles, source or offline.
+    """
+    if profileJob is not None and not profiledir:
+        raise ValueError("profileJob needs a profiledir for its call profile")
+    grid = buildGrid(symbols, timeframes, strategies)
+    profiling = (profiledir, profileJob, profiler)
+    workers = workers or os.cpu_count() or 1
+
+    keys = {}
+    # One fingerprint per bar set, hashed from its BarStore, for both the lookups and the stores
+    fingerprints = {}
+    pending = []
+    for index, (symbol, timeframe, strategy) in enumerate(grid):
+        if store is not None:
+            if (symbol, timeframe) not in fingerprints:
+                fingerprints[(symbol, timeframe)] = _loadData(symbol, timeframe, dataKwargs).fingerprint()
+            keys[index] = store.runKey(strategy, None, symbol, timeframe, fingerprints[(symbol, timeframe)],
+                                       STARTING_BALANCE, STAKE)
+            cached = store.get(keys[index])
+            # Results stored without their trades have to be re-run when the trades are wanted
+            if cached is not None and (not keepTrades or 'Trade PnL' in cached.columns):
+                yield index, cached, 0.0
+                continue
+        pending.append((index, symbol, timeframe, strategy))
+
+    def finished(index, df, seconds):
+        if store is not None:
+            symbol, timeframe, strategy = grid[index]
+            store.put(keys[index], strategy, symbol, timeframe, None, fingerprints[(symbol, timeframe)], df)
+        return index, df, seconds
+
+    if workers == 1 or len(pending) <= 1:
+        for index, symbol, timeframe, strategy in pending:
+            yield finished(*_runJob(index, symbol, timeframe, strategy, dataKwargs, (loglevel, logdir), keepTrades, profiling))
+        return
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(pending))) as pool:
+        futures = [pool.submit(_runJob, index, symbol, timeframe, strategy, dataKwargs, (loglevel, logdir), keepTrades,
+                               profiling)
+                   for index, symbol, timeframe, strategy in pending]
+        for future in as_completed(futures):
+            yield finished(*future.result())
+
+
+def runSweep(symbols, strategies, timeframes=(tf.TIMEFRAME_M15,), workers=None, progress=True, store=None,
+             loglevel='silent', logdir=None, ranking=None, keepTrades=False, profiledir=None, profileJob=None,
+             profiler='cprofile', **dataKwargs):
+    """
+    Backtests every strategy on every symbol and timeframe using a process pool.
+
+    :param symbols: Symbols to test.
+    :param strategies: Strategy classes to test.
+    :param timeframes: Timeframes to test (default: M15).
+    :param workers: Number of worker processes (default: all cores). 1 runs in this process.
+    :param progress: True to print a line per finished job, or a callable(done, total, result_df, seconds).
+    :param store: Optional ResultStore; only jobs whose inputs changed are executed.
+    :param loglevel: Strategy log level inside the jobs (default: silent).
+    :param logdir: Directory for one buffered log file per job, instead of stdout.
+    :param ranking: Optional Ranking.ranking.StreamingRanking, updated with each result as it comes in,
+                    so its leaderboard is current while the sweep runs.
+    :param keepTrades: Keep each run's closed trades in 'Trade PnL' and 'Trade Entry' columns, for
+                       Ranking.robustness.addRobustness and BackTesting.regimes.regimeCube.
+    :param profiledir: Profile every executed job into this directory: one JSON report per job, and
+                       profiles.csv and summary.csv (per strategy) over the sweep (see BackTesting.profiling).
+    :param profileJob: Name of one job, e.g. 'SFPStrategy_EURUSD_M15', to also capture a call profile of.
+    :param profiler: Call profiler of profileJob, 'cprofile' (a .prof file) or 'pyinstrument' (an .html file).
+    :param dataKwargs: Extra arguments for Data, e.g. numOfCandles, source or offline.
+    :return: A DataFrame with one row per job, in grid order.
+    """
+    total = len(symbols) * len(timeframes) * len(strategies)
+    results = {}
+    executed = []
+    start = time.perf_counter()
+    grid = buildGrid(symbols, timeframes, strategies)
+
+    for done, (index, df, seconds) in enumerate(iterSweep(symbols, strategies, timeframes, workers, store, loglevel, logdir, keepTrades,
+                                                          profiledir, profileJob, profiler, **dataKwargs), 1):
+        results[index] = df
+        if seconds > 0:  # cached results were not run
+            executed.append(jobName(*grid[index]))
+        if ranking is not None:
+            ranking.update(df)
+        if callable(progress):
+            progress(done, total, df, seconds)
+        elif progress:
+            row = df.iloc[0] if not df.empty else {}
+            print(f"[{done}/{total}] {row.get('Strategy')} {row.get('Symbol')} {row.get('Timeframe')} "
+                  f"in {seconds:.1f}s (elapsed {time.perf_counter() - start:.1f}s)")
+
+    if profiledir:
+        summarizeProfiles(profiledir, executed)
+
+    if not results:
+        return pd.DataFrame()
+    return pd.concat([results[i] for i in sorted(results)], ignore_index=True)
@@ -0,0 +1,425 @@
+"""
+Vectorized NumPy backtest engine for the bracket-order strategies.
+
+MeanReversionStrategy, TrendFollowingStrategy, CrashBoomStrategy and SFPStrategy
+all enter with a bracket order (a limit entry at the signal bar's close plus an
+ATR-based stop-loss and take-profit) and hold one position at a time. Here the
+signals are computed as whole arrays and each bracket is resolved by scanning
+the price arrays for the first fill, so a run costs a few NumPy passes instead
+of a Python call per bar.
+
+The fills follow Backtrader's broker: the entry limit is tried from the bar after
+the signal, the stop-loss and take-profit become active on the bar after the
+entry fill, and the stop wins when both are hit on the same bar. Strategies that
+let several unfilled entries stack up (TrendFollowingStrategy, SFPStrategy) are
+modelled with one pending entry at a time; use parity mode to see where that
+makes a difference.
+"""
+import os
+import sys
+import backtrader as bt
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from Data import dataLoader as dl
+from Data.barStore import BarStore
+from Indicators import arrayIndicators as ai
+from Indicators import indicatorCache
+from BackTesting import metrics
+from BackTesting.storeFeed import storeFeed
+from Strategies.namiStrategy import runLogging
+
+TRADE_DTYPE = np.dtype([
+    ('entry_idx', np.int64),
+    ('exit_idx', np.int64),    # -1 while the trade is still open
+    ('side', np.int8),         # 1 long, -1 short
+    ('entry_price', np.float64),
+    ('exit_price', np.float64),
+    ('pnl', np.float64),
+])
+
+
+def barArrays(df):
+    """
+    Return the bars of a DataFrame or BarStore as a dict of contiguous NumPy arrays.
+
+    A float64 BarStore's arrays are used as they are, without a copy; float32 values are widened.
+    """
+    if isinstance(df, BarStore):
+        time = df.times()
+        columns = {col: np.asarray(getattr(df, col), dtype=np.float64) for col in ('open', 'high', 'low', 'close')}
+    else:
+        time = df.index.to_numpy(dtype='datetime64[ns]')
+        columns = {col: df[col].to_numpy(dtype=np.float64) for col in ('open', 'high', 'low', 'close')}
+    return {'time': time, **columns, 'year_ends': metrics.yearEnds(time)}
+
+
+def sliceBars(bars, start, end):
+    """
+    Return views of bars[start:end] as a bar-arrays dict.
+    """
+    time = bars['time'][start:end]
+    sliced = {key: bars[key][start:end] for key in ('time', 'open', 'high', 'low', 'close')}
+    sliced['year_ends'] = metrics.yearEnds(time)
+    return sliced
+
+
+class IndicatorSet:
+    """
+    Indicator series of one bar set, each computed once and then reused.
+
+    Series also go through an IndicatorCache (the shared one by default), so they
+    are reused across IndicatorSets, optimizer runs and Backtrader strategies on the same bars.
+    """
+
+    def __init__(self, bars, cache=None):
+        self.bars = bars
+        self.cache = cache if cache is not None else indicatorCache.shared()
+        self._memo = {}
+        self._fingerprint = None
+
+    def get(self, name, *args):
+        key = (name,) + args
+        if key not in self._memo:
+            compute = getattr(self, '_' + name)
+            if self.cache is None:
+                self._memo[key] = compute(*args)
+            else:
+                if self._fingerprint is None:
+                    self._fingerprint = indicatorCache.fingerprint(*(self.bars[k] for k in ('open', 'high', 'low', 'close')))
+                self._memo[key] = self.cache.get(self._fingerprint, name, args, lambda: compute(*args))
+        return self._memo[key]
+
+    def _ema(self, period):
+        return ai.ema(self.bars['close'], period)
+
+    def _atr(self, period):
+        return ai.atr(self.bars['high'], self.bars['low'], self.bars['close'], period)
+
+    def _bollinger(self, period, devfactor):
+        return ai.bollinger(self.bars['close'], period, devfactor)
+
+    def _stochastic(self, period, period_dfast, period_dslow):
+        return ai.stochastic(self.bars['high'], self.bars['low'], self.bars['close'], period, period_dfast, period_dslow)
+
+    def _sfp(self, lookback):
+        return ai.swingFailure(self.bars['high'], self.bars['low'], self.bars['close'], lookback)
+
+
+class IndicatorWindow:
+    """
+    A window onto an IndicatorSet computed over a longer series.
+
+    Series are computed once over the full data and sliced, so a window starts
+    with fully warmed-up indicators instead of recomputing its own prefix.
+    """
+
+    def __init__(self, indicators, start, end):
+        self.indicators = indicators
+        self.start = start
+        self.end = end
+
+    def get(self, name, *args):
+        series = self.indicators.get(name, *args)
+        if isinstance(series, tuple):
+            return tuple(line[self.start:self.end] for line in series)
+        return series[self.start:self.end]
+
+
+def _previous(x):
+    return np.concatenate([[np.nan], x[:-1]])
+
+
+def meanReversionSignals(bars, ind, p):
+    close = bars['close']
+    mid, top, bot = ind.get('bollinger', p['bollinger_period'], p['devfactor'])
+    atr = ind.get('atr', p['atr_period'])
+    ready = ~np.isnan(atr)
+    return {
+        'long': ready & (close < bot),
+        'short': ready & (close > top),
+        'long_sl': close - p['atr_mult'] * atr,
+        'long_tp': close + p['profit_mult'] * atr,
+        'short_sl': close + p['atr_mult'] * atr,
+        'short_tp': close - p['profit_mult'] * atr,
+    }
+
+
+def trendFollowingSignals(bars, ind, p):
+    close = bars['close']
+    ema = ind.get('ema', p['ema_period'])
+    percK, _ = ind.get('stochastic', p['stoch_k'], p['stoch_d'], p['stoch_smooth'])
+    atr = ind.get('atr', p['atr_period'])
+    prevK = _previous(percK)
+    ready = ~np.isnan(atr)
+    return {
+        'long': ready & (close > ema) & (percK < 20) & (prevK < percK),
+        'short': ready & (close < ema) & (percK > 80) & (prevK > percK),
+        'long_sl': close - p['atr_mult_sl'] * atr,
+        'long_tp': close + p['atr_mult_tp'] * atr,
+        'short_sl': close + p['atr_mult_sl'] * atr,
+        'short_tp': close - p['atr_mult_tp'] * atr,
+    }
+
+
+def crashBoomSignals(bars, ind, p):
+    close = bars['close']
+    ema_trend = ind.get('ema', p['ema_trend_period'])
+    mid, top, bot = ind.get('bollinger', p['bollinger_period'], p['devfactor'])
+    ema_signal = ind.get('ema', p['ema_signal_period'])
+    atr = ind.get('atr', p['atr_period'])
+    prev_signal = _previous(ema_signal)
+    ready = ~np.isnan(atr) & ~np.isnan(ema_trend)
+
+    up_trend = (close > ema_trend) & (close < top)
+    down_trend = (close < ema_trend) & (close > bot)
+    long_sl = bot - p['atr_mult'] * atr
+    short_sl = top + p['atr_mult'] * atr
+    return {
+        'long': ready & up_trend & (prev_signal < mid) & (ema_signal > mid),
+        'short': ready & down_trend & (prev_signal > mid) & (ema_signal < mid),
+        'long_sl': long_sl,
+        'long_tp': close + p['profit_mult'] * (close - long_sl),
+        'short_sl': short_sl,
+        'short_tp': close - p['profit_mult'] * (short_sl - close),
+    }
+
+
+def sfpSignals(bars, ind, p):
+    close = bars['close']
+    signal, _, _ = ind.get('sfp', p.get('lookback', 10))
+    ema = ind.get('ema', 200)
+    atr = ind.get('atr', 14)
+    ready = ~np.isnan(atr) & ~np.isnan(ema)
+    return {
+        'long': ready & (signal == -1) & (close > ema),
+        'short': ready & (signal == 1) & (close < ema),
+        'long_sl': close - 1.5 * atr,
+        'long_tp': close + 2 * atr,
+        'short_sl': close + 1.5 * atr,
+        'short_tp': close - 2 * atr,
+    }
+
+
+# Strategy class name -> signal function
+SIGNALS = {
+    'MeanReversionStrategy': meanReversionSignals,
+    'TrendFollowingStrategy': trendFollowingSignals,
+    'CrashBoomStrategy': crashBoomSignals,
+    'SFPStrategy': sfpSignals,
+}
+
+
+def strategyParams(strategy, params=None):
+    """
+    Return the strategy's default parameters updated with `params`.
+    """
+    merged = dict(strategy.params._getitems()) if hasattr(strategy.params, '_getitems') else {}
+    merged.update(params or {})
+    higher = [name for name, value in merged.items() if name.endswith('_timeframe') and value is not None]
+    if higher:
+        raise ValueError(f"{', '.join(higher)} need higher-timeframe feeds, which only the Backtrader engine provides")
+    return merged
+
+
+def _firstHit(hit, start, n, step=64):
+    # Index of the first bar >= start where hit(a, b) is True, scanning in growing windows
+    while start < n:
+        end = min(n, start + step)
+        found = np.flatnonzero(hit(start, end))
+        if len(found):
+            return start + found[0]
+        start, step = end, step * 2
+    return None
+
+
+def simulateBrackets(bars, signals, starting_balance=100000, stake=10000):
+    """
+    Resolve the bracket orders produced by a signal function.
+
+    :return: A TRADE_DTYPE array of the trades taken, oldest first.
+    """
+    o, h, l, c = bars['open'], bars['high'], bars['low'], bars['close']
+    n = len(c)
+    long_sig, short_sig = signals['long'], signals['short']
+    candidates = np.flatnonzero(long_sig | short_sig)
+
+    trades = []
+    cash = starting_balance
+    i = 0
+    while True:
+        k = np.searchsorted(candidates, i)
+        if k == len(candidates):
+            break
+        s = candidates[k]
+        side = 1 if long_sig[s] else -1
+        limit = c[s]
+        if stake * limit > cash:
+            # Rejected for margin by the broker on the next bar, the strategy may signal again there
+            i = s + 1
+            continue
+        sl = signals['long_sl'][s] if side == 1 else signals['short_sl'][s]
+        tp = signals['long_tp'][s] if side == 1 else signals['short_tp'][s]
+
+        if side == 1:
+            f = _firstHit(lambda a, b: l[a:b] <= limit, s + 1, n)
+        else:
+            f = _firstHit(lambda a, b: h[a:b] >= limit, s + 1, n)
+        if f is None:
+            break  # entry never filled
+        fill_at_open = o[f] <= limit if side == 1 else o[f] >= limit
+        entry = o[f] if fill_at_open else limit
+
+        if side == 1:
+            x = _firstHit(lambda a, b: (l[a:b] <= sl) | (h[a:b] >= tp), f + 1, n)
+        else:
+            x = _firstHit(lambda a, b: (h[a:b] >= sl) | (l[a:b] <= tp), f + 1, n)
+        if x is None:
+            trades.append((f, -1, side, entry, np.nan, np.nan))
+            break
+
+        if side == 1:
+            if l[x] <= sl:
+                exit_price = o[x] if o[x] <= sl else sl
+            else:
+                exit_price = o[x] if o[x] >= tp else tp
+        else:
+            if h[x] >= sl:
+                exit_price = o[x] if o[x] >= sl else sl
+            else:
+                exit_price = o[x] if o[x] <= tp else tp
+
+        pnl = side * stake * (exit_price - entry)
+        cash += pnl
+        trades.append((f, x, side, entry, exit_price, pnl))
+        # The position is flat again on the exit bar, so a signal there is acted on
+        i = x
+
+    return np.array(trades, dtype=TRADE_DTYPE)
+
+
+def equityCurve(bars, trades, starting_balance=100000, stake=10000):
+    """
+    Account value at every bar: starting balance, plus realised PnL, plus the open position marked to the close.
+    """
+    c = bars['close']
+    n = len(c)
+    realised = np.zeros(n)
+    closed = trades[trades['exit_idx'] >= 0]
+    np.add.at(realised, closed['exit_idx'], closed['pnl'])
+
+    size = np.zeros(n)
+    entry = np.zeros(n)
+    for t in trades:
+        end = t['exit_idx'] if t['exit_idx'] >= 0 else n
+        size[t['entry_idx']:end] = int(t['side']) * stake
+        entry[t['entry_idx']:end] = t['entry_price']
+    return starting_balance + np.cumsum(realised) + size * (c - entry)
+
+
+def summarize(strategy_name, symbol, bars, trades, starting_balance=100000, stake=10000):
+    """
+    Return the metrics row runBackTestForStrategy reports, computed from a trade list.
+    """
+    equity = equityCurve(bars, trades, starting_balance, stake)
+    closed_pnl = trades['pnl'][trades['exit_idx'] >= 0]
+    total_trades = len(trades)
+    return {
+        'Strategy': strategy_name,
+        'Symbol': symbol,
+        'Starting Balance': starting_balance,
+        'Final Balance': float(equity[-1]) if len(equity) else starting_balance,
+        'Sharpe Ratio': metrics.sharpeRatio(bars['time'], equity, starting_balance, ends=bars.get('year_ends')),
+        'Max Drawdown': metrics.drawdown(equity),
+        'SQN': metrics.sqn(closed_pnl),
+        'Trades Taken': total_trades,
+        'Closed Trades': len(closed_pnl),
+        'Win rate': metrics.winRate(closed_pnl, total_trades),
+    }
+
+
+def runVectorized(strategy, fxdata=None, params=None, starting_balance=100000, stake=10000, parity=False):
+    """
+    Backtest a bracket-order strategy with the vectorized engine.
+
+    :param strategy: One of the strategy classes in SIGNALS.
+    :param fxdata: Data handle, DataFrame of bars or BarStore (default: AUDCAD M15).
+    :param params: Strategy parameters overriding the class defaults.
+    :param parity: Also run the strategy in Backtrader and add how many trades agree.
+    :return: A one-row DataFrame with the same columns as runBackTestForStrategy.
+    """
+    if strategy.__name__ not in SIGNALS:
+        raise ValueError(f"{strategy.__name__} has no vectorized implementation, expected one of {sorted(SIGNALS)}")
+    if fxdata is None:
+        fxdata = dl.Data(symbol='AUDCAD')
+    df = fxdata.bar_store() if isinstance(fxdata, dl.Data) else fxdata
+    symbol = getattr(fxdata, 'symbol', None)
+
+    bars = barArrays(df)
+    signals = SIGNALS[strategy.__name__](bars, IndicatorSet(bars), strategyParams(strategy, params))
+    trades = simulateBrackets(bars, signals, starting_balance, stake)
+    row = summarize(strategy.__name__, symbol, bars, trades, starting_balance, stake)
+
+    if parity:
+        report = parityReport(strategy, df, bars, trades, params, starting_balance, stake)
+        row['Parity Matched'] = int(report['Match'].sum())
+        row['Parity Backtrader Trades'] = int(report['Backtrader Entry'].notna().sum())
+    return pd.DataFrame([row])
+
+
+class _TradeList(bt.Analyzer):
+    """
+    Collects every trade of a Backtrader run as (entry time, side, entry price, exit time, exit price).
+    """
+
+    def start(self):
+        self.trades = []
+
+    def notify_trade(self, trade):
+        if trade.justopened:
+            self.trades.append([bt.num2date(trade.dtopen), 1 if trade.size > 0 else -1, trade.price, None, None])
+        elif trade.isclosed:
+            opened = self.trades[-1]
+            opened[3] = bt.num2date(trade.dtclose)
+            opened[4] = trade.history[-1].event.price if trade.history else None
+
+    def get_analysis(self):
+        return self.trades
+
+
+def parityReport(strategy, df, bars, trades, params=None, starting_balance=100000, stake=10000):
+    """
+    Run the strategy in Backtrader and line its trades up against the vectorized trade list.
+
+    :return: DataFrame with one row per entry time and side found by either engine, and a Match column.
+    """
+    cerebro = bt.Cerebro(stdstats=False)
+    cerebro.adddata(storeFeed(df))
+    cerebro.addsizer(bt.sizers.FixedSize, stake=stake)
+    cerebro.addstrategy(strategy, **(params or {}))
+    cerebro.addanalyzer(_TradeList, _name='tradelist')
+    cerebro.broker.setcash(starting_balance)
+    with runLogging():
+        reference = cerebro.run()[0].analyzers.tradelist.get_analysis()
+
+    bt_rows = pd.DataFrame(reference, columns=['Entry Time', 'Side', 'Backtrader Entry', 'Backtrader Exit Time', 'Backtrader Exit'])
+    # Explicit dtypes, so a run without trades (e.g. every order rejected for margin) still merges
+    bt_rows = bt_rows.astype({'Side': int, 'Backtrader Entry': float, 'Backtrader Exit': float})
+    bt_rows['Entry Time'] = pd.to_datetime(bt_rows['Entry Time']).astype('datetime64[ns]')
+    bt_rows['Backtrader Exit Time'] = pd.to_datetime(bt_rows['Backtrader Exit Time']).astype('datetime64[ns]')
+    vec_rows = pd.DataFrame({
+        'Entry Time': pd.to_datetime(bars['time'][trades['entry_idx']]).astype('datetime64[ns]'),
+        'Side': trades['side'].astype(int),
+        'Vectorized Entry': trades['entry_price'],
+        'Vectorized Exit Time': pd.to_datetime(np.where(trades['exit_idx'] >= 0, bars['time'][trades['exit_idx']], np.datetime64('NaT'))).astype('datetime64[ns]'),
+        'Vectorized Exit': trades['exit_price'],
+    })
+    report = pd.merge(bt_rows, vec_rows, on=['Entry Time', 'Side'], how='outer')
+    bt_exit = report['Backtrader Exit Time']
+    vec_exit = report['Vectorized Exit Time']
+    report['Match'] = (
+        np.isclose(report['Backtrader Entry'].astype(float), report['Vectorized Entry'].astype(float))
+        & ((bt_exit == vec_exit) | (bt_exit.isna() & vec_exit.isna()))
+    )
+    return report
@@ -0,0 +1,112 @@
+import os
+import sys
+import math
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from BackTesting import vectorized as vec
+from BackTesting.gridEval import evaluateGrid
+from BackTesting.sharedBars import SharedBars
+
+# Per-worker state set up once by _initWorker
+_worker = {}
+
+
+def walkForwardWindows(length, train, test, step=None, anchored=False):
+    """
+    Split `length` bars into rolling in-sample / out-of-sample windows.
+
+    :param train: In-sample bars per window.
+    :param test: Out-of-sample bars per window, directly after the in-sample window.
+    :param step: Bars between window starts (default: `test`, so out-of-sample windows tile the data).
+    :param anchored: Keep every in-sample window starting at bar 0 (expanding window).
+    :return: List of (train_start, train_end, test_start, test_end) bar indices, ends exclusive.
+    """
+    step = step or test
+    windows = []
+    start = 0
+    while start + train + test <= length:
+        train_start = 0 if anchored else start
+        windows.append((train_start, start + train, start + train, start + train + test))
+        start += step
+    return windows
+
+
+def _score(record, objective):
+    value = record.get(objective)
+    return -math.inf if value is None or value != value else value
+
+
+def runWindow(strategy, bars, indicators, window, paramGrid, objective='SQN', starting_balance=10000, stake=1000):
+    """
+    Optimise on one in-sample window and evaluate the best parameters on the following out-of-sample window.
+
+    :param indicators: IndicatorSet over the full `bars`; windows slice it rather than recomputing warm-up.
+    :return: A record with the window dates, the chosen parameters, the in-sample objective and out-of-sample metrics.
+    """
+    train_start, train_end, test_start, test_end = window
+    train_bars = vec.sliceBars(bars, train_start, train_end)
+    insample = evaluateGrid(strategy, train_bars, paramGrid, vec.IndicatorWindow(indicators, train_start, train_end),
+                            starting_balance, stake)
+    best = max(range(len(paramGrid)), key=lambda i: _score(insample[i], objective))
+    params = paramGrid[best]
+
+    test_bars = vec.sliceBars(bars, test_start, test_end)
+    outsample = evaluateGrid(strategy, test_bars, [params], vec.IndicatorWindow(indicators, test_start, test_end),
+                             starting_balance, stake)[0]
+    return {
+        'Train Start': pd.Timestamp(bars['time'][train_start]),
+        'Test Start': pd.Timestamp(bars['time'][test_start]),
+        'Test End': pd.Timestamp(bars['time'][test_end - 1]),
+        **params,
+        f'In-Sample {objective}': insample[best].get(objective),
+        **{f'OOS {key}': outsample[key] for key in ('Sharpe Ratio', 'Max Drawdown', 'SQN', 'Trades Taken', 'Closed Trades', 'Final Balance', 'Win rate')},
+    }
+
+
+def _initWorker(spec, strategy, paramGrid, objective, starting_balance, stake):
+    shared = SharedBars.attach(spec)
+    bars = vec.barArrays(shared.frame())
+    _worker.update(shared=shared, bars=bars, indicators=vec.IndicatorSet(bars), strategy=strategy,
+                   paramGrid=paramGrid, objective=objective, starting_balance=starting_balance, stake=stake)
+
+
+def _runWindow(window):
+    w = _worker
+    return runWindow(w['strategy'], w['bars'], w['indicators'], window, w['paramGrid'], w['objective'],
+                     w['starting_balance'], w['stake'])
+
+
+def runWalkForward(strategy, frame, paramGrid, train, test, step=None, anchored=False, workers=None,
+                   objective='SQN', starting_balance=10000, stake=1000):
+    """
+    Walk-forward optimisation of a bracket-order strategy with the vectorized engine.
+
+    Windows run in parallel on a process pool over shared-memory bars. Each worker
+    computes an indicator series once over the whole history and every window it
+    handles slices that array, so warm-up bars come from the precomputed prefix.
+
+    :param frame: DataFrame of bars.
+    :param paramGrid: List of parameter dicts searched on each in-sample window.
+    :param workers: Number of worker processes (default: all cores); 1 runs in this process.
+    :return: DataFrame with one row per window.
+    """
+    if strategy.__name__ not in vec.SIGNALS:
+        raise ValueError(f"{strategy.__name__} has no vectorized implementation, expected one of {sorted(vec.SIGNALS)}")
+    windows = walkForwardWindows(len(frame), train, test, step, anchored)
+    if not windows:
+        return pd.DataFrame()
+
+    workers = min(workers or os.cpu_count() or 1, len(windows))
+    if workers == 1:
+        bars = vec.barArrays(frame)
+        indicators = vec.IndicatorSet(bars)
+        records = [runWindow(strategy, bars, indicators, window, paramGrid, objective, starting_balance, stake)
+                   for window in windows]
+    else:
+        with SharedBars.create(frame) as shared:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_initWorker,
+                                     initargs=(shared.spec, strategy, paramGrid, objective, starting_balance, stake)) as pool:
+                records = list(pool.map(_runWindow, windows))
+    return pd.DataFrame(records)
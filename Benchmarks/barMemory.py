@@ -0,0 +1,101 @@
+"""
+Bar memory benchmark: bytes per bar of Data.full_data against a BarStore.
+
+Synthetic M1 bars are loaded once as the DataFrame backtests used to hold
+(every MT5 field) and once as a BarStore in float64 and float32. For
+each the resident size of the bars and the peak traced allocation while
+loading them are reported per bar. The Backtrader side is measured too: the
+line buffers a preloaded feed holds, and how long a strategy that does nothing
+takes to run on the same bars fed through PandasData and through StoreData.
+
+Usage: python Benchmarks/barMemory.py [--bars 500000] [--feed-bars 20000]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import backtrader as bt
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+from Data import dataLoader as dl
+from Data import timeframes as tf
+from Data.dataSources import SyntheticSource
+from BackTesting.storeFeed import StoreData
+
+
+def _data(bars, price_dtype=np.float64):
+    return dl.Data(symbol='EURUSD', timeframe=tf.TIMEFRAME_M1, numOfCandles=bars,
+                   source=SyntheticSource(), use_cache=False, price_dtype=price_dtype)
+
+
+def _traced(load):
+    tracemalloc.start()
+    try:
+        result = load()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return result, peak
+
+
+def measureMemory(bars):
+    """
+    Return one record per representation with its resident and peak loading bytes per bar.
+    """
+    frame, frame_peak = _traced(lambda: _data(bars).full_data)
+    records = [{
+        'representation': 'DataFrame (full_data)',
+        'bytes_per_bar': frame.memory_usage(index=True, deep=True).sum() / len(frame),
+        'peak_bytes_per_bar': frame_peak / len(frame),
+    }]
+    for dtype in (np.float64, np.float32):
+        store, peak = _traced(lambda: _data(bars, dtype).bar_store())
+        records.append({
+            'representation': f'BarStore ({np.dtype(dtype).name})',
+            'bytes_per_bar': store.bytes_per_bar(),
+            'peak_bytes_per_bar': peak / len(store),
+        })
+    return records
+
+
+def measureFeeds(bars):
+    """
+    Return one record per Backtrader feed with the time of an empty strategy's run on it
+    and the line buffer bytes per bar the feed holds.
+    """
+    data = _data(bars)
+    feeds = {
+        'PandasData': lambda: bt.feeds.PandasData(dataname=data.full_data),
+        'StoreData': lambda: StoreData(store=data.bar_store()),
+    }
+    records = []
+    for name, build in feeds.items():
+        cerebro = bt.Cerebro(stdstats=False)
+        cerebro.adddata(build())
+        cerebro.addstrategy(bt.Strategy)
+        start = time.perf_counter()
+        feed = cerebro.run()[0].data
+        seconds = time.perf_counter() - start
+        lines = sum(len(getattr(feed.lines, alias).array) * 8 for alias in feed.getlinealiases())
+        records.append({'feed': name, 'run_seconds': seconds, 'line_bytes_per_bar': lines / feed.buflen()})
+    return records
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--bars', type=int, default=500000)
+    parser.add_argument('--feed-bars', type=int, default=20000, help='bars fed to the empty Backtrader strategy')
+    args = parser.parse_args()
+
+    print(f"{args.bars} M1 bars")
+    for record in measureMemory(args.bars):
+        print(f"  {record['representation']:<22} {record['bytes_per_bar']:6.1f} bytes/bar  "
+              f"peak while loading {record['peak_bytes_per_bar']:6.1f} bytes/bar")
+    print(f"{args.feed_bars} bars run through Backtrader with an empty strategy")
+    for record in measureFeeds(args.feed_bars):
+        print(f"  {record['feed']:<10} {record['run_seconds'] * 1000:9.1f} ms  "
+              f"{record['line_bytes_per_bar']:.0f} bytes/bar in line buffers")
@@ -0,0 +1,76 @@
+"""
+Startup-time benchmark for the backtesting package.
+
+Measures the cold import of BackTesting.backtest in fresh interpreters and checks
+that importing it neither connects to a data source nor loads any bars. The time
+spent importing third-party libraries (backtrader, pandas) is measured separately
+and subtracted, so the budget only covers the project's own import cost.
+
+Usage: python Benchmarks/importTime.py [--runs 5] [--budget-ms 100]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+PROBE = """
+import sys, time, json
+sys.path.insert(0, {root!r})
+t = time.perf_counter()
+{stmt}
+elapsed = time.perf_counter() - t
+shared = getattr(sys.modules.get('Data.dataSources'), '_shared', {{}})
+print(json.dumps({{'seconds': elapsed, 'sources': sorted(shared)}}))
+"""
+
+
+def timeImport(stmt, runs):
+    """
+    Import `stmt` in `runs` fresh interpreters and return the best time in seconds and the sources that were created.
+    """
+    best, sources = None, []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, '-c', PROBE.format(root=ROOT, stmt=stmt)],
+                             capture_output=True, text=True, check=True, cwd=ROOT)
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        best = result['seconds'] if best is None else min(best, result['seconds'])
+        sources = result['sources']
+    return best, sources
+
+
+def measure(runs=5):
+    """
+    Return a dict with the cold import time of BackTesting.backtest and of its third-party dependencies.
+    """
+    total, sources = timeImport('from BackTesting import backtest', runs)
+    deps, _ = timeImport('import backtrader, backtrader.analyzers, pandas, numpy', runs)
+    return {
+        'import_seconds': total,
+        'dependency_seconds': deps,
+        'project_seconds': max(total - deps, 0.0),
+        'sources_created': sources,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=100.0, help='Max project-only import time in milliseconds')
+    args = parser.parse_args()
+
+    result = measure(args.runs)
+    print(f"Cold import of BackTesting.backtest: {result['import_seconds'] * 1000:.1f} ms "
+          f"(dependencies {result['dependency_seconds'] * 1000:.1f} ms, "
+          f"project {result['project_seconds'] * 1000:.1f} ms)")
+
+    failed = False
+    if result['sources_created']:
+        print(f"FAIL: importing created data sources {result['sources_created']}")
+        failed = True
+    if result['project_seconds'] * 1000 > args.budget_ms:
+        print(f"FAIL: project import time exceeds the {args.budget_ms:.0f} ms budget")
+        failed = True
+    sys.exit(1 if failed else 0)
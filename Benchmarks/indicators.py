@@ -0,0 +1,119 @@
+"""
+Indicator benchmark: Backtrader built-ins against Indicators.fastIndicators.
+
+Both sets of indicators run side by side in one runonce Cerebro over synthetic
+M1 bars. The time each top-level indicator spends computing its series
+(including its sub-indicators) is measured, and the two versions are checked
+to produce the same values.
+
+Usage: python Benchmarks/indicators.py [--bars 28800 500000] [--runs 1]
+"""
+import argparse
+import os
+import sys
+import time
+
+import backtrader as bt
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+from Data import dataLoader as dl
+from Data import timeframes as tf
+from Data.dataSources import SyntheticSource
+from Indicators import fastIndicators as fi
+
+# name -> (built-in factory, fast factory); each factory builds indicators on a strategy's data
+CASES = {
+    'EMA(200)': (lambda: bt.indicators.EMA(period=200), lambda: fi.EMA(period=200)),
+    'ATR(14)': (lambda: bt.indicators.ATR(period=14), lambda: fi.ATR(period=14)),
+    'BollingerBands(20, 2)': (lambda: bt.indicators.BollingerBands(period=20, devfactor=2),
+                              lambda: fi.BollingerBands(period=20, devfactor=2)),
+    'Stochastic(14, 3, 3)': (lambda: bt.indicators.Stochastic(period=14), lambda: fi.Stochastic(period=14)),
+    'RSI(14)': (lambda: bt.indicators.RSI(period=14), lambda: fi.RSI(period=14)),
+    'CrashBoomStrategy set': (
+        lambda: [bt.indicators.EMA(period=100), bt.indicators.BollingerBands(period=20, devfactor=2),
+                 bt.indicators.EMA(period=20), bt.indicators.ATR(period=7)],
+        lambda: [fi.EMA(period=100), fi.BollingerBands(period=20, devfactor=2),
+                 fi.EMA(period=20), fi.ATR(period=7)]),
+}
+
+
+def _timed(indicator, key, timings):
+    # Wrap an indicator's runonce entry point to accumulate its compute time
+    once = indicator._once
+
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        once(*args, **kwargs)
+        timings[key] += time.perf_counter() - start
+
+    indicator._once = wrapper
+
+
+class _Bench(bt.Strategy):
+
+    def __init__(self):
+        self.timings = {}
+        self.built = {}
+        for name, factories in CASES.items():
+            for kind, factory in zip(('builtin', 'fast'), factories):
+                built = factory()
+                built = built if isinstance(built, list) else [built]
+                self.built[(name, kind)] = built
+                self.timings[(name, kind)] = 0.0
+                for indicator in built:
+                    _timed(indicator, (name, kind), self.timings)
+
+
+def maxDifference(builtin, fast):
+    """
+    Largest absolute difference between the lines of two lists of equivalent indicators.
+    """
+    worst = 0.0
+    for a, b in zip(builtin, fast):
+        for la, lb in zip(a.lines, b.lines):
+            x, y = np.array(la.array), np.array(lb.array)
+            valid = ~np.isnan(x) & ~np.isnan(y)
+            if valid.any():
+                worst = max(worst, float(np.max(np.abs(x[valid] - y[valid]))))
+    return worst
+
+
+def measure(bars, runs=1):
+    """
+    Return one record per case with the built-in and fast indicator times in seconds (best of `runs`) on `bars` M1 bars.
+    """
+    frame = dl.Data(symbol='EURUSD', timeframe=tf.TIMEFRAME_M1, numOfCandles=bars,
+                    source=SyntheticSource(), use_cache=False).full_data
+    best = {}
+    for _ in range(runs):
+        cerebro = bt.Cerebro(stdstats=False, runonce=True)
+        cerebro.adddata(bt.feeds.PandasData(dataname=frame))
+        cerebro.addstrategy(_Bench)
+        strategy = cerebro.run()[0]
+        for key, seconds in strategy.timings.items():
+            best[key] = min(best.get(key, seconds), seconds)
+
+    return [{
+        'bars': bars,
+        'indicator': name,
+        'builtin_seconds': best[(name, 'builtin')],
+        'fast_seconds': best[(name, 'fast')],
+        'max_difference': maxDifference(strategy.built[(name, 'builtin')], strategy.built[(name, 'fast')]),
+    } for name in CASES]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--bars', type=int, nargs='+', default=[28800, 500000])
+    parser.add_argument('--runs', type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"Fast indicators use {'TA-Lib' if fi.USE_TALIB else 'NumPy'}")
+    for bars in args.bars:
+        for record in measure(bars, args.runs):
+            builtin, fast = record['builtin_seconds'], record['fast_seconds']
+            speedup = builtin / fast if fast > 0 else float('inf')
+            print(f"{bars:>8} bars  {record['indicator']:<24} built-in {builtin * 1000:9.1f} ms  "
+                  f"fast {fast * 1000:8.1f} ms  x{speedup:6.1f}  max diff {record['max_difference']:.1e}")
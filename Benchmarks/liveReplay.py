@@ -0,0 +1,79 @@
+"""
+Live engine load test: synthetic M1 bars of many symbols replayed through LiveEngine.
+
+Every symbol trades all the strategies with a live implementation on a
+SimulatedBroker. Bars are replayed with ReplayFeed at full speed or at N x real
+time, or with --polled through PollingFeed reading Data.get_live_data from a
+ReplaySource, the path live trading uses. The bar-to-decision latency
+histograms show whether the engine keeps up: at N x speed a new M1 bar closes
+every 60 / N seconds.
+
+Usage: python Benchmarks/liveReplay.py [--symbols 32] [--bars 5000] [--speed 600] [--polled] [--seconds 30]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+from Data import dataLoader as dl
+from Data import timeframes as tf
+from Data.dataSources import SyntheticSource, ReplaySource
+from LiveTrading import liveTrading as lt
+from LiveTrading.liveSignals import LIVE_SIGNALS
+
+
+def syntheticBars(symbols, bars):
+    source = SyntheticSource()
+    return {symbol: dl.Data(symbol=symbol, timeframe=tf.TIMEFRAME_M1, numOfCandles=bars,
+                            source=source, use_cache=False).full_data for symbol in symbols}
+
+
+def measure(n_symbols=32, bars=5000, speed=None, polled=False, seconds=None, poll=0.005):
+    """
+    Replay `bars` M1 bars of `n_symbols` symbols and return (engine, wall seconds).
+    """
+    symbols = [f'SYN{i:02d}' for i in range(n_symbols)]
+    frames = syntheticBars(symbols, bars)
+    if polled:
+        feed = lt.PollingFeed(tf.TIMEFRAME_M1, source=ReplaySource(frames, speed or 60.0), poll=poll)
+    else:
+        feed = lt.ReplayFeed(frames, speed, tf.TIMEFRAME_M1)
+    engine = lt.LiveEngine(feed, lt.SimulatedBroker(), loglevel='silent')
+    for symbol in symbols:
+        for name in LIVE_SIGNALS:
+            engine.add(name, symbol)
+
+    async def run():
+        try:
+            await asyncio.wait_for(engine.run(warmup=500 if polled else 0), seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    start = time.perf_counter()
+    asyncio.run(run())
+    return engine, time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--symbols', type=int, default=32)
+    parser.add_argument('--bars', type=int, default=5000)
+    parser.add_argument('--speed', type=float, default=None, help='replay speed, 1 = real time (default: full speed)')
+    parser.add_argument('--polled', action='store_true', help='read bars through PollingFeed and a ReplaySource')
+    parser.add_argument('--seconds', type=float, default=None, help='stop after this many wall-clock seconds')
+    args = parser.parse_args()
+    if args.polled and args.seconds is None:
+        parser.error('--polled runs until stopped, give --seconds')
+
+    engine, wall = measure(args.symbols, args.bars, args.speed, args.polled, args.seconds)
+    print(f"{engine.bars} bars of {args.symbols} symbols, {len(engine.tags)} strategies, "
+          f"in {wall:.2f} s ({engine.bars / wall:,.0f} bars/s)")
+    print(engine.latencyReport().round(1).to_string())
+    if args.speed:
+        interval = 60.0 / args.speed
+        p99 = engine.totalLatency().percentile(99)
+        print(f"New M1 bars every {interval * 1000:.1f} ms; p99 latency {p99 * 1000:.2f} ms: "
+              f"{'keeps up' if p99 < interval else 'falls behind'}")
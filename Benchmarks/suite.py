@@ -0,0 +1,278 @@
+"""
+Benchmark suite: backtest throughput, indicator throughput, optimizer scaling,
+worker memory and import time, on synthetic bars, compared against a baseline.
+
+Every measurement becomes a record (benchmark, case, metric, value) written to
+JSON and CSV. With a baseline file, each metric is compared against its stored
+value and the run fails when one is worse by more than the tolerance, so
+regressions show up before a deploy. Baselines are machine specific: save one
+with --save-baseline on the machine that runs the comparison.
+
+Benchmarks:
+    strategies  bars per second of a full backtest of every strategy in BackTesting.backtest.STRATEGIES
+    indicators  bars per second of each fast indicator against its Backtrader built-in (Benchmarks/indicators.py)
+    scaling     runOptBacktest wall time and scaling efficiency from 1 to N worker processes
+    memory      peak RSS of each optimizer worker process
+    import      cold import time of BackTesting.backtest (Benchmarks/importTime.py)
+
+Usage: python Benchmarks/suite.py [--only strategies scaling] [--bars 10000 100000 1000000] [--cpus 8]
+                                  [--baseline Benchmarks/baseline.json] [--save-baseline] [--tolerance 0.15]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+from Data import dataLoader as dl
+from Data import timeframes as tf
+from Data.dataSources import SyntheticSource
+from BackTesting.backtest import Backtester, STRATEGIES
+from BackTesting import optimizer
+from BackTesting.optimizer import expandGrid
+from BackTesting.profiling import RunProfile, peakRss
+from BackTesting.sharedBars import SharedBars
+from Benchmarks import importTime
+from Benchmarks import indicators as indicatorBench
+from Strategies.namiStrategy import runLogging
+
+BENCHMARKS = ('strategies', 'indicators', 'scaling', 'memory', 'import')
+# Metrics where a lower value is better; all others are throughputs or efficiencies
+LOWER_IS_BETTER = ('seconds', 'bytes')
+# Grid of the scaling and memory benchmarks: 24 MeanReversionStrategy combinations
+SCALING_GRID = {'bollinger_period': [10, 15, 20, 25, 30, 40], 'devfactor': [1.5, 2.0], 'atr_mult': [1.0, 1.5]}
+
+
+def _bars(bars, timeframe=tf.TIMEFRAME_M15):
+    return dl.Data(symbol='EURUSD', timeframe=timeframe, numOfCandles=bars, source=SyntheticSource(), use_cache=False)
+
+
+def _record(benchmark, case, metric, value):
+    return {'benchmark': benchmark, 'case': case, 'metric': metric, 'value': value}
+
+
+def lowerIsBetter(metric):
+    return metric.endswith(LOWER_IS_BETTER)
+
+
+def strategyThroughput(sizes):
+    """
+    Backtest every strategy on synthetic M15 bars of each size and return bars per second of the whole run
+    and next() calls per second of its bar loop (see BackTesting.profiling).
+    """
+    records = []
+    for bars in sizes:
+        data = _bars(bars)
+        data.bar_store()  # generated before the clock starts
+        for name, strategy in STRATEGIES.items():
+            profile = RunProfile(name)
+            start = time.perf_counter()
+            with runLogging('silent'):
+                Backtester.runBackTestForStrategy(strategy, fxdata=data, profile=profile)
+            seconds = time.perf_counter() - start
+            case = f'{name}@{bars}'
+            records += [_record('strategies', case, 'bars_per_second', bars / seconds),
+                        _record('strategies', case, 'next_per_second', profile.record()['next_per_second'])]
+    return records
+
+
+def indicatorThroughput(sizes):
+    """
+    Bars per second of every case of Benchmarks/indicators.py, fast and built-in.
+    """
+    records = []
+    for bars in sizes:
+        for result in indicatorBench.measure(bars):
+            case = f"{result['indicator']}@{bars}"
+            records += [_record('indicators', case, 'fast_bars_per_second', bars / result['fast_seconds']),
+                        _record('indicators', case, 'builtin_bars_per_second', bars / result['builtin_seconds'])]
+    return records
+
+
+def workerCounts(cpus):
+    """
+    1, 2, 4, ... up to `cpus`, always ending with `cpus`.
+    """
+    counts, n = [], 1
+    while n < cpus:
+        counts.append(n)
+        n *= 2
+    return counts + [cpus]
+
+
+def optimizerScaling(cpus, bars):
+    """
+    Time runOptBacktest on the SCALING_GRID with 1 to `cpus` workers.
+    Efficiency is the single-worker time over `workers` times the time with that many workers.
+    """
+    frame = _bars(bars).full_data
+    strategy = STRATEGIES['MeanReversionStrategy']
+    records, single = [], None
+    for workers in workerCounts(cpus):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):  # runOptBacktest prints its table
+            Backtester.runOptBacktest(strategy, maxcpus=workers, fxdata=frame, params=SCALING_GRID)
+        seconds = time.perf_counter() - start
+        single = single or seconds
+        case = f'{workers} workers@{bars}'
+        records += [_record('scaling', case, 'seconds', seconds),
+                    _record('scaling', case, 'efficiency', single / (workers * seconds))]
+    return records
+
+
+def _evaluatePeak(params):
+    # One optimizer evaluation in a worker, returning the worker's pid and peak RSS after it
+    optimizer._evaluateShared(params)
+    return os.getpid(), peakRss()
+
+
+def workerMemory(cpus, bars):
+    """
+    Peak RSS of each worker of a shared-memory optimization on `bars` bars, as runOptBacktest runs it.
+    """
+    frame = _bars(bars).full_data
+    strategy = STRATEGIES['MeanReversionStrategy']
+    grid = expandGrid(SCALING_GRID)
+    peaks = {}
+    with SharedBars.create(frame) as shared:
+        with ProcessPoolExecutor(max_workers=cpus, initializer=optimizer._initWorker,
+                                 initargs=(shared.spec, strategy, 10000, 1000)) as pool:
+            for pid, peak in pool.map(_evaluatePeak, grid):
+                peaks[pid] = max(peaks.get(pid, 0), peak or 0)
+    if not any(peaks.values()):
+        return []  # peak RSS cannot be read on this platform
+    values = list(peaks.values())
+    case = f'{cpus} workers@{bars}'
+    return [_record('memory', case, 'worker_peak_rss_bytes', max(values)),
+            _record('memory', case, 'mean_worker_peak_rss_bytes', sum(values) / len(values))]
+
+
+def importTimes(runs):
+    """
+    Cold import time of BackTesting.backtest, in total and without its third-party dependencies.
+    """
+    result = importTime.measure(runs)
+    return [_record('import', 'BackTesting.backtest', 'import_seconds', result['import_seconds']),
+            _record('import', 'BackTesting.backtest', 'project_seconds', result['project_seconds'])]
+
+
+def environment():
+    """
+    The machine and code a result set was measured on.
+    """
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=ROOT, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def compare(records, baseline, tolerance=0.15):
+    """
+    Compare records against baseline records of the same benchmark, case and metric.
+
+    :param tolerance: Relative change in the worse direction that counts as a regression.
+    :return: DataFrame with the baseline and current values, the change (positive is better) and a regression flag.
+    """
+    current = pd.DataFrame(records)
+    base = pd.DataFrame(baseline).rename(columns={'value': 'baseline'})
+    keys = ['benchmark', 'case', 'metric']
+    merged = current.merge(base[keys + ['baseline']], on=keys, how='inner')
+    change = merged['value'] / merged['baseline'] - 1.0
+    lower = merged['metric'].map(lowerIsBetter)
+    # Positive is better: a lower time or memory is a negative ratio change
+    merged['change'] = change.where(~lower, -change)
+    merged['regression'] = merged['change'] < -tolerance
+    return merged
+
+
+def runSuite(only=BENCHMARKS, sizes=(10000, 100000, 1000000), indicator_bars=(100000,), cpus=None,
+             scaling_bars=20000, import_runs=5):
+    """
+    Run the selected benchmarks and return their records.
+    """
+    cpus = cpus or os.cpu_count() or 1
+    steps = {
+        'strategies': lambda: strategyThroughput(sizes),
+        'indicators': lambda: indicatorThroughput(indicator_bars),
+        'scaling': lambda: optimizerScaling(cpus, scaling_bars),
+        'memory': lambda: workerMemory(cpus, scaling_bars),
+        'import': lambda: importTimes(import_runs),
+    }
+    records = []
+    for name in only:
+        start = time.perf_counter()
+        found = steps[name]()
+        records += found
+        print(f"{name}: {len(found)} records in {time.perf_counter() - start:.1f}s")
+        for record in found:
+            print(f"  {record['case']:<36} {record['metric']:<28} {record['value']:14.6g}")
+    return records
+
+
+def writeResults(records, path):
+    """
+    Write records and the environment to `path` (JSON) and the records alone next to it as CSV.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as out:
+        json.dump({'environment': environment(), 'records': records}, out, indent=2)
+    pd.DataFrame(records).to_csv(os.path.splitext(path)[0] + '.csv', index=False)
+
+
+def readResults(path):
+    with open(path) as source:
+        return json.load(source)['records']
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--only', nargs='+', choices=BENCHMARKS, default=list(BENCHMARKS))
+    parser.add_argument('--bars', type=int, nargs='+', default=[10000, 100000, 1000000], help='strategy benchmark sizes')
+    parser.add_argument('--indicator-bars', type=int, nargs='+', default=[100000])
+    parser.add_argument('--scaling-bars', type=int, default=20000, help='bars of the scaling and memory benchmarks')
+    parser.add_argument('--cpus', type=int, default=None, help='most worker processes (default: all cores)')
+    parser.add_argument('--import-runs', type=int, default=5)
+    parser.add_argument('--out', default=os.path.join(ROOT, 'Benchmarks', 'results', 'latest.json'))
+    parser.add_argument('--baseline', default=os.path.join(ROOT, 'Benchmarks', 'baseline.json'))
+    parser.add_argument('--save-baseline', action='store_true', help='store these results as the baseline')
+    parser.add_argument('--tolerance', type=float, default=0.15, help='relative slowdown that fails the run')
+    args = parser.parse_args()
+
+    records = runSuite(args.only, args.bars, args.indicator_bars, args.cpus, args.scaling_bars, args.import_runs)
+    writeResults(records, args.out)
+    print(f"Results written to {args.out}")
+
+    if args.save_baseline:
+        writeResults(records, args.baseline)
+        print(f"Baseline saved to {args.baseline}")
+        sys.exit(0)
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to store one")
+        sys.exit(0)
+
+    report = compare(records, readResults(args.baseline), args.tolerance)
+    report.to_csv(os.path.splitext(args.out)[0] + '_comparison.csv', index=False)
+    for row in report.itertuples():
+        flag = 'REGRESSION' if row.regression else ''
+        print(f"  {row.case:<36} {row.metric:<28} {row.baseline:12.6g} -> {row.value:12.6g} {row.change:+7.1%} {flag}")
+    regressions = int(report['regression'].sum())
+    if regressions:
+        print(f"FAIL: {regressions} metrics regressed by more than {args.tolerance:.0%}")
+    sys.exit(1 if regressions else 0)
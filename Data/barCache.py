@@ -0,0 +1,65 @@
+import os
+import numpy as np
+
+
+class BarCache:
+    """
+    A persistent on-disk cache of OHLCV bars.
+
+    Bars are kept exactly as MetaTrader 5 returns them (a NumPy structured array
+    with time, open, high, low, close, tick_volume, spread and real_volume fields),
+    one ``.npy`` file per (symbol, timeframe). Files can be memory-mapped so
+    offline readers only page in the range they actually slice.
+    """
+
+    DEFAULT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache')
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir or os.environ.get('NAMI_CACHE_DIR', self.DEFAULT_DIR)
+
+    def path(self, symbol, timeframe):
+        """
+        Return the file path used for the given symbol and timeframe.
+        """
+        return os.path.join(self.cache_dir, f'{symbol}_{timeframe}.npy')
+
+    def load(self, symbol, timeframe, mmap=False):
+        """
+        Load the cached bars for a symbol and timeframe.
+
+        :param mmap: Memory-map the file read-only instead of reading it into memory.
+        :return: The cached structured array, or None if nothing is cached yet.
+        """
+        file_path = self.path(symbol, timeframe)
+        if not os.path.exists(file_path):
+            return None
+        return np.load(file_path, mmap_mode='r' if mmap else None)
+
+    def store(self, symbol, timeframe, rates):
+        """
+        Write bars to the cache, replacing whatever was stored before.
+
+        The file is written next to the target and swapped in with ``os.replace``
+        so concurrent readers never see a half-written file.
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        file_path = self.path(symbol, timeframe)
+        tmp_path = f'{file_path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.save(f, np.ascontiguousarray(rates))
+        os.replace(tmp_path, file_path)
+
+    @staticmethod
+    def merge(cached, fresh):
+        """
+        Append freshly fetched bars to the cached ones.
+
+        Any cached bar at or after the first fresh timestamp is dropped, so the
+        last (possibly still forming) cached bar is replaced by its final version.
+        """
+        if fresh is None or len(fresh) == 0:
+            return cached
+        if cached is None or len(cached) == 0:
+            return fresh
+        keep = np.searchsorted(cached['time'], fresh['time'][0], side='left')
+        return np.concatenate([cached[:keep], fresh.astype(cached.dtype, copy=False)])
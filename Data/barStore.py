@@ -0,0 +1,90 @@
+"""
+Compact columnar storage of OHLCV bars.
+
+Data.full_data keeps every MT5 field as a DataFrame column, spread and
+real_volume included, which the strategies never read. A BarStore keeps only
+the time, open, high, low, close and volume columns, each in its own contiguous
+array: int64 epoch seconds and float64 or float32 values. Backtests read the
+arrays directly (see BackTesting.storeFeed and BackTesting.vectorized.barArrays)
+instead of going through a DataFrame.
+"""
+import numpy as np
+import pandas as pd
+
+COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+
+class BarStore:
+    """
+    Bars as one contiguous array per column.
+
+    :param time: Bar open times, int64 seconds since the epoch (as MT5 returns them).
+    :param columns: Dict of COLUMNS name -> array, one value per bar.
+    :param dtype: Value dtype. float32 halves the memory of the values; prices then keep about
+                  7 significant digits, so results can differ from float64 runs in the last pip fraction.
+    """
+
+    def __init__(self, time, columns, dtype=np.float64):
+        self.dtype = np.dtype(dtype)
+        self.time = np.ascontiguousarray(time, dtype=np.int64)
+        for col in COLUMNS:
+            values = np.ascontiguousarray(columns[col], dtype=self.dtype)
+            if len(values) != len(self.time):
+                raise ValueError(f"Column {col} has {len(values)} values for {len(self.time)} bars")
+            setattr(self, col, values)
+
+    @classmethod
+    def from_rates(cls, rates, dtype=np.float64):
+        """
+        Build a store from MT5-style rate records, dropping the fields no strategy reads.
+        """
+        columns = {col: rates[col] for col in ('open', 'high', 'low', 'close')}
+        columns['volume'] = rates['tick_volume']
+        return cls(rates['time'], columns, dtype)
+
+    @classmethod
+    def from_frame(cls, df, dtype=np.float64):
+        """
+        Build a store from a time-indexed DataFrame of bars (as Data.full_data).
+
+        Columns already of `dtype` are taken without a copy where pandas allows it.
+        """
+        time = df.index.to_numpy(dtype='datetime64[s]').view(np.int64)
+        columns = {col: df[col].to_numpy() if col in df.columns else np.zeros(len(df)) for col in COLUMNS}
+        return cls(time, columns, dtype)
+
+    def __len__(self):
+        return len(self.time)
+
+    @property
+    def empty(self):
+        return len(self.time) == 0
+
+    @property
+    def nbytes(self):
+        """
+        Memory held by the bar arrays.
+        """
+        return self.time.nbytes + sum(getattr(self, col).nbytes for col in COLUMNS)
+
+    def bytes_per_bar(self):
+        return self.nbytes / len(self) if len(self) else 0.0
+
+    def times(self):
+        """
+        The bar times as a datetime64[s] view of the time array.
+        """
+        return self.time.view('datetime64[s]')
+
+    def slice(self, start, end):
+        """
+        Bars [start:end] as a store of views onto this one.
+        """
+        return BarStore(self.time[start:end], {col: getattr(self, col)[start:end] for col in COLUMNS}, self.dtype)
+
+    def frame(self):
+        """
+        A DataFrame of the bars whose columns are views onto the store's arrays.
+        """
+        index = pd.DatetimeIndex(self.times(), name='time')
+        return pd.DataFrame({col: getattr(self, col) for col in COLUMNS}, index=index, copy=False)
@@ -1,63 +1,200 @@
+import os
+import sys
+import hashlib
+import numpy as np
 import pandas as pd
-import MetaTrader5 as mt5
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 
-mt5.initialize()
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from Data.barCache import BarCache
+from Data.barStore import BarStore, COLUMNS as BAR_COLUMNS
+from Data.dataSources import get_source, RATES_DTYPE
+from Data import timeframes as tf
+from Data.resample import resample_rates, resample_frame
 
 class Data:
     """
-    A class to handle market data retrieval from MetaTrader 5.
+    A class to handle market data retrieval from a configurable data source (MetaTrader 5 by default).
+
+    Data is a lazy handle: it can be created and passed around freely, and only
+    fetches its bars the first time full_data (or a slice of it) is used.
     """
 
-    def __init__(self, numOfCandles=28800, symbol='EURUSD', timeframe=mt5.TIMEFRAME_M15):
+    def __init__(self, numOfCandles=28800, symbol='EURUSD', timeframe=tf.TIMEFRAME_M15, use_cache=True, offline=False, cache_dir=None, source=None, resample_from=None, price_dtype=np.float64):
+        """
+        :param use_cache: Keep bars in the local on-disk cache and only fetch bars newer than the last cached one.
+        :param offline: Serve bars purely from the cache without contacting MT5.
+        :param cache_dir: Directory of the bar cache (default: $NAMI_CACHE_DIR or Data/cache).
+        :param source: Data source backend, a DataSource or one of 'mt5', 'file', 'synthetic', 'replay' (default: $NAMI_DATA_SOURCE or 'mt5').
+        :param resample_from: Build the bars by resampling this lower timeframe (e.g. tf.TIMEFRAME_M1),
+                              so one cached M1 series serves every timeframe without another fetch.
+        :param price_dtype: Value dtype of bar_store(); np.float32 halves the memory of the bars.
+        """
         self.numOfCandles = numOfCandles
         self.symbol = symbol
         self.timeframe = timeframe
-        self.full_data = self.load_data()
+        self.source = get_source(source)
+        self.offline = offline
+        # Only bars from a live backend are worth caching; file and synthetic bars are already local
+        self.use_cache = offline or (use_cache and self.source.cacheable)
+        self.cache = BarCache(cache_dir)
+        self.resample_from = resample_from
+        self._base_kwargs = dict(use_cache=use_cache, offline=offline, cache_dir=cache_dir, source=self.source)
+        self.price_dtype = price_dtype
+        self._full_data = None
+        self._store = None
+        self._fingerprint = None
+
+    @property
+    def full_data(self):
+        """
+        All loaded bars. Bars are fetched on first access, so constructing a Data handle is cheap.
+        """
+        if self._full_data is None:
+            self._full_data = self.load_data()
+        return self._full_data
+
+    @property
+    def is_loaded(self):
+        return self._full_data is not None or self._store is not None
+
+    def bar_store(self):
+        """
+        The bars as a compact BarStore: time and OHLCV columns only, in price_dtype.
+
+        Built from full_data when that is already loaded, otherwise straight from the
+        rate records, so backtests that only need the store never build the DataFrame.
+        """
+        if self._store is None:
+            if self._full_data is not None:
+                self._store = BarStore.from_frame(self._full_data, self.price_dtype)
+            else:
+                rates = self.load_rates()
+                if rates is None or len(rates) == 0:
+                    print(f"Failed to get market data from {self.source.name}")
+                    rates = np.zeros(0, dtype=RATES_DTYPE)
+                self._store = BarStore.from_rates(rates, self.price_dtype)
+        return self._store
+
+    def fingerprint(self):
+        """
+        Content hash of the loaded bars, used to tell whether a stored result was computed on the same data.
+
+        Hashes the BarStore arrays backtests run on, so no DataFrame is built for it.
+        """
+        if self._fingerprint is None:
+            store = self.bar_store()
+            digest = hashlib.sha1(store.time.tobytes())
+            for col in BAR_COLUMNS:
+                digest.update(getattr(store, col).tobytes())
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
 
     def load_data(self):
         """
-        Load market data from MetaTrader 5.
+        Load market data from the bar cache and/or the data source.
         """
-        rates = mt5.copy_rates_from_pos(self.symbol, self.timeframe, 0, self.numOfCandles)
-        if rates is None:
-            print("Failed to get market data from MT5")
+        rates = self.load_rates()
+        if rates is None or len(rates) == 0:
+            print(f"Failed to get market data from {self.source.name}")
             return pd.DataFrame()
         else:
-            df = pd.DataFrame(rates)
-            df['time'] = pd.to_datetime(df['time'], unit='s')
-            df.set_index('time', inplace=True) 
-            # Ensure column names match Backtrader's expectations
-            df = df.rename(columns={'tick_volume': 'volume'})
-            return df
+            return rates_to_frame(rates)
+
+    def load_rates(self):
+        """
+        Return the raw MT5-style rate records for this symbol and timeframe.
+
+        With the cache enabled only the bars from the last cached timestamp onwards
+        are requested from the source and appended to the cache. A full fetch only
+        happens when the cache is empty or holds fewer bars than requested.
+        """
+        if self.resample_from is not None:
+            return self._resampled_rates()
+
+        if not self.use_cache:
+            return self.source.fetch(self.symbol, self.timeframe, self.numOfCandles)
+
+        if self.offline:
+            cached = self.cache.load(self.symbol, self.timeframe, mmap=True)
+            if cached is None:
+                print(f"No cached bars for {self.symbol} ({self.timeframe}) in {self.cache.cache_dir}")
+                return None
+            return cached[-self.numOfCandles:]
+
+        cached = self.cache.load(self.symbol, self.timeframe)
+        if cached is None or len(cached) < self.numOfCandles:
+            rates = self.source.fetch(self.symbol, self.timeframe, self.numOfCandles)
+        else:
+            last_bar = datetime.fromtimestamp(int(cached['time'][-1]), tz=timezone.utc)
+            fresh = self.source.fetch_range(self.symbol, self.timeframe, last_bar, datetime.now(timezone.utc))
+            rates = BarCache.merge(cached, fresh)
+
+        if rates is None or len(rates) == 0:
+            # Source unavailable, fall back to whatever we have cached
+            return cached[-self.numOfCandles:] if cached is not None else None
+
+        self.cache.store(self.symbol, self.timeframe, rates)
+        return rates[-self.numOfCandles:]
+
+    def _resampled_rates(self):
+        # Enough base bars for numOfCandles full bars; a partial first bucket is cut off below
+        ratio = max(1, tf.seconds(self.timeframe) // tf.seconds(self.resample_from))
+        base = Data(numOfCandles=(self.numOfCandles + 1) * ratio, symbol=self.symbol,
+                    timeframe=self.resample_from, **self._base_kwargs)
+        rates = base.load_rates()
+        if rates is None or len(rates) == 0:
+            return None
+        return resample_rates(rates, self.timeframe)[-self.numOfCandles:]
+
+    def resampled(self, timeframe, aligned=True):
+        """
+        Bars of a higher timeframe built from this handle's bars, e.g. H1 bars next to M15 ones.
+
+        :param aligned: Stamp each bar with the time of the last of this handle's bars it spans,
+                        so it can be fed to Backtrader next to full_data and is seen once it has closed.
+        :return: DataFrame of bars like full_data.
+        """
+        if self.full_data.empty:
+            return self.full_data
+        return resample_frame(self.full_data, timeframe, self.timeframe, aligned)
 
     def get_last_2_weeks_data(self):
         """
         Retrieve the last 2 weeks of market data.
         """
-        cutoff_date = datetime.now() - timedelta(weeks=2)
-        return self.full_data[self.full_data.index >= cutoff_date]  # Compare with index
+        return self._trailing(timedelta(weeks=2))
     
     def get_last_month_data(self):
         """
-        Retrieve the last 2 weeks of market data.
+        Retrieve the last month of market data.
         """
-        cutoff_date = datetime.now() - timedelta(weeks=4)
+        return self._trailing(timedelta(weeks=4))
+
+    def _trailing(self, period):
+        # Measured from the last bar rather than the wall clock, so cached and offline data slice the same way
+        if self.full_data.empty:
+            return self.full_data
+        cutoff_date = self.full_data.index[-1] - period
         return self.full_data[self.full_data.index >= cutoff_date]  # Compare with index
 
-    def get_live_data(self, symbol="EURUSD", timeframe=mt5.TIMEFRAME_M1, count=500):
+    def get_live_data(self, symbol="EURUSD", timeframe=tf.TIMEFRAME_M1, count=500):
         """
-        Fetch latest market data from MetaTrader 5.
+        Fetch latest market data from the data source.
         """
-        if not mt5.initialize():
-            print("MT5 Initialization failed!")
+        rates = self.source.fetch(symbol, timeframe, count)
+        if rates is None:
             return pd.DataFrame()
+        return rates_to_frame(rates)
 
-        rates = mt5.copy_rates_from_pos(symbol, timeframe, 0, count)
 
-        df = pd.DataFrame(rates)
-        df['time'] = pd.to_datetime(df['time'], unit='s')
-        df.set_index('time', inplace=True) 
-        # Ensure column names match Backtrader's expectations
-        df = df.rename(columns={'tick_volume': 'volume'})
-        return df
+def rates_to_frame(rates):
+    """
+    Convert MT5-style rate records into a time-indexed DataFrame for Backtrader.
+    """
+    df = pd.DataFrame(rates)
+    df['time'] = pd.to_datetime(df['time'], unit='s')
+    df.set_index('time', inplace=True) 
+    # Ensure column names match Backtrader's expectations
+    df = df.rename(columns={'tick_volume': 'volume'})
+    return df
@@ -0,0 +1,299 @@
+import os
+import sys
+import time
+import zlib
+import numpy as np
+import pandas as pd
+from datetime import datetime, timezone
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from Data import timeframes as tf
+from Data.barCache import BarCache
+
+# Record layout returned by MetaTrader5.copy_rates_*; every source returns bars in this shape
+RATES_DTYPE = np.dtype([
+    ('time', '<i8'),
+    ('open', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('close', '<f8'),
+    ('tick_volume', '<u8'),
+    ('spread', '<i4'),
+    ('real_volume', '<u8'),
+])
+
+
+class DataSource:
+    """
+    Base class for market data backends used by Data.
+
+    A source returns bars as a NumPy structured array with RATES_DTYPE, oldest first.
+    Connecting is deferred until the first fetch.
+    """
+
+    name = 'base'
+    # Whether bars from this source should be kept in the on-disk BarCache
+    cacheable = False
+
+    def connect(self):
+        """
+        Open the connection to the backend. Called lazily on first fetch.
+        """
+        return True
+
+    def fetch(self, symbol, timeframe, count):
+        """
+        Return the latest `count` bars for the symbol and timeframe.
+        """
+        raise NotImplementedError
+
+    def fetch_range(self, symbol, timeframe, date_from, date_to):
+        """
+        Return all bars with a timestamp between date_from and date_to (inclusive).
+        """
+        raise NotImplementedError
+
+
+class MT5Source(DataSource):
+    """
+    Bars pulled from a running MetaTrader 5 terminal.
+    """
+
+    name = 'mt5'
+    cacheable = True
+
+    def __init__(self):
+        self.mt5 = None
+
+    def connect(self):
+        if self.mt5 is None:
+            import MetaTrader5 as mt5
+            if not mt5.initialize():
+                print("MT5 Initialization failed!")
+                return False
+            self.mt5 = mt5
+        return True
+
+    def fetch(self, symbol, timeframe, count):
+        if not self.connect():
+            return None
+        return self.mt5.copy_rates_from_pos(symbol, timeframe, 0, count)
+
+    def fetch_range(self, symbol, timeframe, date_from, date_to):
+        if not self.connect():
+            return None
+        return self.mt5.copy_rates_range(symbol, timeframe, date_from, date_to)
+
+
+class FileSource(DataSource):
+    """
+    Bars read from CSV or Parquet files named <symbol>_<timeframe name>.<ext>, e.g. EURUSD_M15.csv.
+
+    Files need a time column (epoch seconds or a datetime string) and open/high/low/close columns.
+    tick_volume (or volume), spread and real_volume are optional.
+    """
+
+    name = 'file'
+
+    def __init__(self, directory=None):
+        self.directory = directory or os.environ.get('NAMI_DATA_DIR', os.getcwd())
+        self._frames = {}
+
+    def _path(self, symbol, timeframe):
+        stem = os.path.join(self.directory, f'{symbol}_{tf.NAMES.get(timeframe, timeframe)}')
+        for ext in ('.parquet', '.csv'):
+            if os.path.exists(stem + ext):
+                return stem + ext
+        return None
+
+    def _load(self, symbol, timeframe):
+        key = (symbol, timeframe)
+        if key not in self._frames:
+            path = self._path(symbol, timeframe)
+            if path is None:
+                print(f"No data file for {symbol} ({tf.NAMES.get(timeframe, timeframe)}) in {self.directory}")
+                self._frames[key] = None
+            else:
+                df = pd.read_parquet(path) if path.endswith('.parquet') else pd.read_csv(path)
+                self._frames[key] = frame_to_rates(df)
+        return self._frames[key]
+
+    def fetch(self, symbol, timeframe, count):
+        rates = self._load(symbol, timeframe)
+        return None if rates is None else rates[-count:]
+
+    def fetch_range(self, symbol, timeframe, date_from, date_to):
+        rates = self._load(symbol, timeframe)
+        if rates is None:
+            return None
+        lo = np.searchsorted(rates['time'], int(date_from.timestamp()), side='left')
+        hi = np.searchsorted(rates['time'], int(date_to.timestamp()), side='right')
+        return rates[lo:hi]
+
+
+class SyntheticSource(DataSource):
+    """
+    Deterministic random-walk bars for tests and benchmarks.
+
+    The same (seed, symbol, timeframe, end) always produces the same bars, and a
+    longer request is a superset of a shorter one ending at the same time.
+    """
+
+    name = 'synthetic'
+
+    def __init__(self, seed=0, end=datetime(2025, 1, 1, tzinfo=timezone.utc), volatility=0.0004):
+        self.seed = seed
+        self.end = end
+        self.volatility = volatility
+
+    def _generate(self, symbol, timeframe, count, end_ts):
+        step = tf.seconds(timeframe)
+        end_ts = end_ts - end_ts % step
+        # Bars are generated backwards from the end so every request shares the same recent history
+        rng = np.random.default_rng([self.seed, zlib.crc32(symbol.encode()), timeframe])
+        returns = rng.standard_normal(count) * self.volatility * np.sqrt(step / 900)
+        base = 150.0 if symbol.endswith('JPY') else 1.1
+        close = base * np.exp(-np.cumsum(returns))[::-1]
+        wick = np.abs(rng.standard_normal((2, count)))[:, ::-1] * self.volatility * base * 0.5
+
+        rates = np.zeros(count, dtype=RATES_DTYPE)
+        rates['time'] = end_ts - step * np.arange(count - 1, -1, -1, dtype=np.int64)
+        rates['close'] = close
+        rates['open'][1:] = close[:-1]
+        rates['open'][0] = close[0]
+        rates['high'] = np.maximum(rates['open'], close) + wick[0]
+        rates['low'] = np.minimum(rates['open'], close) - wick[1]
+        rates['tick_volume'] = rng.integers(50, 500, count)[::-1]
+        rates['spread'] = 10
+        return rates
+
+    def fetch(self, symbol, timeframe, count):
+        return self._generate(symbol, timeframe, count, int(self.end.timestamp()))
+
+    def fetch_range(self, symbol, timeframe, date_from, date_to):
+        step = tf.seconds(timeframe)
+        end_ts = min(int(date_to.timestamp()), int(self.end.timestamp()))
+        count = max(0, (end_ts - int(date_from.timestamp())) // step + 1)
+        return self._generate(symbol, timeframe, count, end_ts)
+
+
+class ReplaySource(DataSource):
+    """
+    Stored bars served as if they were arriving live, for load-testing live trading code.
+
+    A replay clock starts on the first fetch at the bar `warmup` bars into the
+    first symbol's history and then runs `speed` times faster than the wall
+    clock. fetch() returns the latest bars up to the clock, the last one still
+    forming (it already carries its final values), as MT5's copy_rates_from_pos
+    does, so anything reading Data.get_live_data sees a live market.
+
+    :param bars: Dict of symbol or (symbol, timeframe) -> rates array, DataFrame of bars or Data handle.
+                 Symbols not in it are replayed from the bar cache.
+    :param speed: Replay seconds per wall-clock second (default: $NAMI_REPLAY_SPEED or 1, real time).
+    :param warmup: Bars of history available before the clock starts.
+    :param cache_dir: Bar cache directory for symbols not in `bars`.
+    """
+
+    name = 'replay'
+
+    def __init__(self, bars=None, speed=None, warmup=500, cache_dir=None):
+        self.bars = bars or {}
+        self.speed = float(speed if speed is not None else os.environ.get('NAMI_REPLAY_SPEED', 1.0))
+        if self.speed <= 0:
+            raise ValueError("Replay speed must be positive")
+        self.warmup = warmup
+        self.cache = BarCache(cache_dir)
+        self._rates = {}
+        self._start = None  # (replay epoch seconds, wall-clock seconds) when the clock started
+
+    def _load(self, symbol, timeframe):
+        key = (symbol, timeframe)
+        if key not in self._rates:
+            bars = self.bars.get(key, self.bars.get(symbol))
+            if bars is None:
+                rates = self.cache.load(symbol, timeframe, mmap=True)
+            elif isinstance(bars, np.ndarray):
+                rates = bars
+            else:
+                rates = frame_to_rates(getattr(bars, 'full_data', bars))
+            self._rates[key] = rates
+        return self._rates[key]
+
+    def clock(self):
+        """
+        Current replay time in epoch seconds, or None before the first fetch.
+        """
+        if self._start is None:
+            return None
+        replay_start, wall_start = self._start
+        return replay_start + (time.monotonic() - wall_start) * self.speed
+
+    def _visible(self, symbol, timeframe):
+        rates = self._load(symbol, timeframe)
+        if rates is None or len(rates) == 0:
+            return None
+        if self._start is None:
+            self._start = (int(rates['time'][min(self.warmup, len(rates) - 1)]), time.monotonic())
+        return rates[:np.searchsorted(rates['time'], self.clock(), side='right')]
+
+    def fetch(self, symbol, timeframe, count):
+        rates = self._visible(symbol, timeframe)
+        return None if rates is None else rates[-count:]
+
+    def fetch_range(self, symbol, timeframe, date_from, date_to):
+        rates = self._visible(symbol, timeframe)
+        if rates is None:
+            return None
+        lo = np.searchsorted(rates['time'], int(date_from.timestamp()), side='left')
+        hi = np.searchsorted(rates['time'], int(date_to.timestamp()), side='right')
+        return rates[lo:hi]
+
+
+SOURCES = {
+    MT5Source.name: MT5Source,
+    FileSource.name: FileSource,
+    SyntheticSource.name: SyntheticSource,
+    ReplaySource.name: ReplaySource,
+}
+
+_shared = {}
+
+
+def get_source(source=None):
+    """
+    Resolve a data source.
+
+    :param source: A DataSource instance, a backend name ('mt5', 'file', 'synthetic', 'replay'),
+                   or None to use $NAMI_DATA_SOURCE (default: 'mt5').
+    :return: A DataSource instance. Named sources are shared per process so a backend connects only once.
+    """
+    if isinstance(source, DataSource):
+        return source
+    name = source or os.environ.get('NAMI_DATA_SOURCE', MT5Source.name)
+    if name not in SOURCES:
+        raise ValueError(f"Unknown data source '{name}', expected one of {sorted(SOURCES)}")
+    if name not in _shared:
+        _shared[name] = SOURCES[name]()
+    return _shared[name]
+
+
+def frame_to_rates(df):
+    """
+    Convert a DataFrame of bars into an MT5-style rates array.
+    """
+    if 'time' not in df.columns:
+        df = df.reset_index()
+    time = df['time']
+    if not pd.api.types.is_numeric_dtype(time):
+        time = pd.to_datetime(time).astype('datetime64[s]').astype(np.int64)
+
+    rates = np.zeros(len(df), dtype=RATES_DTYPE)
+    rates['time'] = np.asarray(time, dtype=np.int64)
+    for col in ('open', 'high', 'low', 'close'):
+        rates[col] = df[col].to_numpy()
+    volume = 'tick_volume' if 'tick_volume' in df.columns else 'volume'
+    for src, dst in ((volume, 'tick_volume'), ('spread', 'spread'), ('real_volume', 'real_volume')):
+        if src in df.columns:
+            rates[dst] = df[src].to_numpy()
+    rates.sort(order='time')
+    return rates
@@ -0,0 +1,93 @@
+"""
+Vectorized OHLCV resampling of MT5-style rates into higher timeframes.
+
+One cached M1 series can stand in for every timeframe up to D1: bars are
+bucketed on the same boundaries MT5 uses (time - time % bar length) and each
+bucket is aggregated with one ufunc.reduceat per column, without a Python loop
+over bars.
+"""
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from Data import timeframes as tf
+from Data.dataSources import RATES_DTYPE, frame_to_rates
+
+
+def resample_rates(rates, timeframe, base_timeframe=None):
+    """
+    Aggregate rates into bars of a higher timeframe.
+
+    :param rates: RATES_DTYPE array sorted by time.
+    :param timeframe: Target timeframe, M1 up to D1.
+    :param base_timeframe: Timeframe of `rates`. When given, each bar is stamped with the time
+                           of the last base bar it spans instead of its own start, so a feed of
+                           the base bars completes it at that timestamp (see resample_frame), and
+                           a last bar still missing base bars is dropped.
+    :return: RATES_DTYPE array with one bar per non-empty bucket; without base_timeframe the last bar may be incomplete.
+    """
+    if timeframe in (tf.TIMEFRAME_W1, tf.TIMEFRAME_MN1):
+        raise ValueError(f"Cannot resample to {tf.NAMES[timeframe]}, bars up to D1 are supported")
+    step = tf.seconds(timeframe)
+    out = np.zeros(0, dtype=RATES_DTYPE)
+    if len(rates) == 0:
+        return out
+
+    bucket = rates['time'] - rates['time'] % step
+    starts = np.flatnonzero(np.concatenate([[True], bucket[1:] != bucket[:-1]]))
+    ends = np.concatenate([starts[1:], [len(rates)]]) - 1
+
+    out = np.zeros(len(starts), dtype=RATES_DTYPE)
+    out['time'] = bucket[starts]
+    if base_timeframe is not None:
+        complete = rates['time'][-1] >= bucket[-1] + step - tf.seconds(base_timeframe)
+        out['time'] = rates['time'][ends]
+    out['open'] = rates['open'][starts]
+    out['high'] = np.maximum.reduceat(rates['high'], starts)
+    out['low'] = np.minimum.reduceat(rates['low'], starts)
+    out['close'] = rates['close'][ends]
+    out['tick_volume'] = np.add.reduceat(rates['tick_volume'], starts)
+    out['spread'] = np.maximum.reduceat(rates['spread'], starts)  # widest spread in the bar
+    out['real_volume'] = np.add.reduceat(rates['real_volume'], starts)
+    if base_timeframe is not None and not complete:
+        out = out[:-1]
+    return out
+
+
+def infer_timeframe(df):
+    """
+    Timeframe of a bar DataFrame, from the most common spacing of its timestamps.
+    """
+    if len(df) < 2:
+        raise ValueError("Need at least two bars to infer their timeframe")
+    gaps = np.diff(df.index.to_numpy(dtype='datetime64[s]').astype(np.int64))
+    values, counts = np.unique(gaps, return_counts=True)
+    spacing = int(values[np.argmax(counts)])
+    for timeframe in tf.NAMES:
+        if tf.seconds(timeframe) == spacing:
+            return timeframe
+    raise ValueError(f"Bars {spacing} seconds apart match no timeframe")
+
+
+def resample_frame(df, timeframe, base_timeframe=None, aligned=True):
+    """
+    Resample a bar DataFrame (as Data.full_data) into a higher timeframe.
+
+    With aligned=True the result is meant as an extra Backtrader feed next to `df`:
+    each bar is stamped with the time of the last `df` bar it spans, so Backtrader
+    delivers it together with the bar that completes it. Strategies then see a
+    higher-timeframe bar as soon as it has closed and never before, and every
+    timestamp of the feed is one of `df`'s.
+
+    :param base_timeframe: Timeframe of `df` (default: inferred from its timestamps).
+    """
+    # Imported here: dataLoader imports this module
+    from Data.dataLoader import rates_to_frame
+    if base_timeframe is None:
+        base_timeframe = infer_timeframe(df)
+    rates = resample_rates(frame_to_rates(df), timeframe, base_timeframe if aligned else None)
+    if len(rates) == 0:
+        return pd.DataFrame()
+    return rates_to_frame(rates)
@@ -0,0 +1,39 @@
+"""
+Timeframe constants matching the MetaTrader5 package, so the rest of the project
+can refer to timeframes without importing MetaTrader5.
+"""
+
+TIMEFRAME_M1 = 1
+TIMEFRAME_M5 = 5
+TIMEFRAME_M15 = 15
+TIMEFRAME_M30 = 30
+TIMEFRAME_H1 = 16385
+TIMEFRAME_H4 = 16388
+TIMEFRAME_D1 = 16408
+TIMEFRAME_W1 = 32769
+TIMEFRAME_MN1 = 49153
+
+NAMES = {
+    TIMEFRAME_M1: 'M1',
+    TIMEFRAME_M5: 'M5',
+    TIMEFRAME_M15: 'M15',
+    TIMEFRAME_M30: 'M30',
+    TIMEFRAME_H1: 'H1',
+    TIMEFRAME_H4: 'H4',
+    TIMEFRAME_D1: 'D1',
+    TIMEFRAME_W1: 'W1',
+    TIMEFRAME_MN1: 'MN1',
+}
+
+
+def seconds(timeframe):
+    """
+    Return the length of one bar of the given timeframe in seconds.
+    """
+    if timeframe < 16384:
+        return timeframe * 60
+    if timeframe < 32768:
+        return (timeframe - 16384) * 3600
+    if timeframe == TIMEFRAME_W1:
+        return 7 * 86400
+    return 30 * 86400
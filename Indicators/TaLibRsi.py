@@ -0,0 +1,10 @@
+"""
+TA-Lib backed RSI, kept under its original module name.
+
+See Indicators.fastIndicators.RSI; it falls back to NumPy when TA-Lib is not installed.
+"""
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from Indicators.fastIndicators import RSI as TaLibRsi
@@ -0,0 +1,220 @@
+"""
+NumPy implementations of the indicators used by the strategies.
+
+Every function takes whole series as float64 arrays and returns arrays of the
+same length, NaN-padded until the indicator has enough data. Values and warm-up
+lengths match Backtrader's built-in indicators of the same name.
+"""
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def _nan(n):
+    return np.full(n, np.nan)
+
+
+def recurrence(x, alpha, seed):
+    """
+    Solve y[t] = (1 - alpha) * y[t-1] + alpha * x[t] with y[-1] = seed, without a Python loop.
+
+    The series is processed in blocks short enough that the growth factor
+    (1 - alpha) ** -block cannot overflow.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    if alpha >= 1.0:
+        return x.copy()
+    decay = 1.0 - alpha
+    block = max(1, min(len(x), int(300.0 / -np.log(decay))))
+    powers = decay ** np.arange(block + 1)
+    inverse = 1.0 / powers[:-1]
+
+    out = np.empty_like(x)
+    prev = seed
+    for start in range(0, len(x), block):
+        chunk = x[start:start + block]
+        k = len(chunk)
+        acc = np.cumsum(chunk * inverse[:k])
+        out[start:start + k] = powers[1:k + 1] * prev + alpha * powers[:k] * acc
+        prev = out[start + k - 1]
+    return out
+
+
+def sma(x, period):
+    """
+    Simple moving average.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    out = _nan(len(x))
+    if len(x) < period:
+        return out
+    # Centre the data first so the running sums stay small and precise
+    offset = x[:period].mean()
+    csum = np.cumsum(np.concatenate([[0.0], x - offset]))
+    out[period - 1:] = (csum[period:] - csum[:-period]) / period + offset
+    return out
+
+
+def _seeded(x, period, alpha, first):
+    # Backtrader seeds exponential averages with the SMA of the first `period` values
+    x = np.asarray(x, dtype=np.float64)
+    out = _nan(len(x))
+    seed_end = first + period
+    if len(x) < seed_end:
+        return out
+    out[seed_end - 1] = x[first:seed_end].mean()
+    out[seed_end:] = recurrence(x[seed_end:], alpha, out[seed_end - 1])
+    return out
+
+
+def ema(x, period, first=0):
+    """
+    Exponential moving average, alpha = 2 / (period + 1).
+
+    :param first: Index of the first valid input value (for inputs that are themselves NaN-padded).
+    """
+    return _seeded(x, period, 2.0 / (period + 1), first)
+
+
+def smma(x, period, first=0):
+    """
+    Smoothed (Wilder) moving average, alpha = 1 / period.
+    """
+    return _seeded(x, period, 1.0 / period, first)
+
+
+def trueRange(high, low, close):
+    """
+    True range. The first bar has no previous close and is NaN.
+    """
+    prev_close = np.concatenate([[np.nan], close[:-1]])
+    return np.maximum(high, prev_close) - np.minimum(low, prev_close)
+
+
+def atr(high, low, close, period=14):
+    """
+    Average true range (Wilder smoothing of the true range).
+    """
+    return smma(trueRange(high, low, close), period, first=1)
+
+
+def rsi(close, period=14):
+    """
+    Relative strength index with Wilder smoothing of up and down moves.
+    """
+    change = np.diff(close, prepend=np.nan)
+    up = smma(np.maximum(change, 0.0), period, first=1)
+    down = smma(np.maximum(-change, 0.0), period, first=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return 100.0 - 100.0 / (1.0 + up / down)
+
+
+def rollingExtreme(x, window, ufunc=np.maximum):
+    """
+    Max (or min with ufunc=np.minimum) of every full `window` of x, in O(n) whatever the window.
+
+    Uses the van Herk/Gil-Werman scheme: prefix and suffix extremes within blocks
+    of `window` bars, so each window is the extreme of one suffix and one prefix.
+
+    :return: Array of len(x) - window + 1 values; element i covers x[i:i + window].
+    """
+    n = len(x)
+    if window == 1:
+        return np.array(x, dtype=np.float64)
+    blocks = -(-n // window)
+    fill = -np.inf if ufunc is np.maximum else np.inf
+    padded = np.full(blocks * window, fill)
+    padded[:n] = x
+    padded = padded.reshape(blocks, window)
+    prefix = ufunc.accumulate(padded, axis=1).ravel()
+    suffix = ufunc.accumulate(padded[:, ::-1], axis=1)[:, ::-1].ravel()
+    return ufunc(suffix[:n - window + 1], prefix[window - 1:n])
+
+
+def highest(x, period):
+    """
+    Highest value over the last `period` bars, including the current one.
+    """
+    out = _nan(len(x))
+    if len(x) >= period:
+        out[period - 1:] = rollingExtreme(x, period, np.maximum)
+    return out
+
+
+def lowest(x, period):
+    """
+    Lowest value over the last `period` bars, including the current one.
+    """
+    out = _nan(len(x))
+    if len(x) >= period:
+        out[period - 1:] = rollingExtreme(x, period, np.minimum)
+    return out
+
+
+def stddev(x, period):
+    """
+    Rolling population standard deviation.
+    """
+    out = _nan(len(x))
+    if len(x) >= period:
+        out[period - 1:] = sliding_window_view(x, period).std(axis=1)
+    return out
+
+
+def bollinger(close, period=20, devfactor=2.0):
+    """
+    Bollinger bands.
+
+    :return: (mid, top, bot)
+    """
+    mid = sma(close, period)
+    dev = devfactor * stddev(close, period)
+    return mid, mid + dev, mid - dev
+
+
+def stochastic(high, low, close, period=14, period_dfast=3, period_dslow=3):
+    """
+    Slow stochastic, as bt.indicators.Stochastic.
+
+    :return: (percK, percD)
+    """
+    hh = highest(high, period)
+    ll = lowest(low, period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        k = 100.0 * (close - ll) / (hh - ll)
+    percK = _shiftedSma(k, period_dfast, period - 1)
+    percD = _shiftedSma(percK, period_dslow, period - 1 + period_dfast - 1)
+    return percK, percD
+
+
+def _shiftedSma(x, period, first):
+    # SMA of a NaN-padded input whose first valid value is at `first`
+    out = _nan(len(x))
+    out[first:] = sma(x[first:], period)
+    return out
+
+
+def swingFailure(high, low, close, lookback=10):
+    """
+    Swing failure pattern, as Strategies.SwingFailure.SwingFailurePattern.
+
+    The swing high/low of a bar are the highest high/lowest low of the previous
+    `lookback - 1` bars.
+
+    :return: (sfp_signal, swing_high, swing_low); sfp_signal is 1 for a bearish and -1 for a bullish failure.
+    """
+    n = len(close)
+    signal, swing_high, swing_low = _nan(n), _nan(n), _nan(n)
+    if n <= lookback or lookback < 2:
+        return signal, swing_high, swing_low
+
+    # prev_*[j] covers bars j - lookback + 1 .. j - 1 for j = lookback .. n - 1
+    prev_high = rollingExtreme(high[1:n - 1], lookback - 1, np.maximum)
+    prev_low = rollingExtreme(low[1:n - 1], lookback - 1, np.minimum)
+    h, l, c = high[lookback:], low[lookback:], close[lookback:]
+
+    swing_high[lookback:] = np.where(h < prev_high, prev_high, np.nan)
+    swing_low[lookback:] = np.where(l > prev_low, prev_low, np.nan)
+    bearish = (h > prev_high) & (c < prev_high)
+    bullish = (l < prev_low) & (c > prev_low)
+    signal[lookback:] = np.where(bearish, 1.0, np.where(bullish, -1.0, 0.0))
+    return signal, swing_high, swing_low
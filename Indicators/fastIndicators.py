@@ -0,0 +1,225 @@
+"""
+Drop-in replacements for the Backtrader indicators used by the strategies.
+
+Each indicator computes its whole series in one vectorized call, with TA-Lib
+when it is installed and Indicators.arrayIndicators otherwise, and exposes the
+result as regular Backtrader lines. Line names, parameters and warm-up periods
+match the built-ins, so `fi.EMA(period=200)` can replace `bt.indicators.EMA(period=200)`.
+
+In runonce mode the series of an indicator on a data feed is taken from the
+shared Indicators.indicatorCache, so strategies and optimizer runs over the same
+bars compute each (indicator, parameters) series once.
+
+Set NAMI_TALIB=0 to force the NumPy implementations.
+"""
+import os
+import sys
+from array import array
+
+import backtrader as bt
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from Indicators import arrayIndicators as ai
+from Indicators import indicatorCache
+
+try:
+    import talib
+except ImportError:
+    talib = None
+
+USE_TALIB = talib is not None and os.environ.get('NAMI_TALIB', '1') != '0'
+
+
+def _series(line, first, end):
+    # Copy of one input line's values for bars first .. end - 1
+    return np.frombuffer(line.array, dtype=np.float64, count=end)[first:].copy()
+
+
+def _lineArray(values):
+    # array('d') with the same values, copied as one block rather than element by element
+    out = array('d')
+    out.frombytes(np.ascontiguousarray(values, dtype=np.float64).tobytes())
+    return out
+
+
+class VectorIndicator(bt.Indicator):
+    """
+    Base class of the vectorized indicators.
+
+    Subclasses declare their lines, set their warm-up with addminperiod and
+    implement compute(), which returns one array per line. In runonce mode the
+    series is computed once for the whole feed. In next mode it is computed
+    over every bar loaded so far and recomputed only when the input grows past it:
+    preloaded data is still computed once, but an input that grows bar by bar
+    (a live feed, or another indicator in next mode) is recomputed on every bar.
+    """
+
+    # Name of the series in the indicator cache (the IndicatorSet name in the vectorized engine);
+    # the key also holds the parameter values in declaration order. None disables caching.
+    cacheName = None
+
+    def __init__(self):
+        # Bars before the input's own warm-up are NaN and are not passed to compute()
+        self._first = self.data._minperiod - 1
+        self._cache = None
+
+    def compute(self, first, end):
+        """
+        Return one array per line for bars first .. end - 1.
+        """
+        raise NotImplementedError
+
+    def _computeAll(self, end):
+        if end <= self._first:
+            return [np.full(end, np.nan) for _ in self.lines]
+        pad = np.full(self._first, np.nan)
+        return [np.concatenate([pad, np.asarray(values, dtype=np.float64)])
+                for values in self.compute(self._first, end)]
+
+    def _feedFingerprint(self, end):
+        # Memoised on the feed, so every indicator on it hashes the bars once
+        memo = getattr(self.data, '_namiFingerprint', None)
+        if memo is None or memo[0] != end:
+            prices = [np.frombuffer(getattr(self.data, name).array, dtype=np.float64, count=end)
+                      for name in ('open', 'high', 'low', 'close')]
+            memo = (end, indicatorCache.fingerprint(*prices))
+            self.data._namiFingerprint = memo
+        return memo[1]
+
+    def _cachedAll(self, end):
+        cache = indicatorCache.shared()
+        if cache is None or self.cacheName is None or not isinstance(self.data, bt.AbstractDataBase):
+            return self._computeAll(end)
+
+        def compute():
+            series = self._computeAll(end)
+            return series[0] if len(series) == 1 else tuple(series)
+
+        series = cache.get(self._feedFingerprint(end), self.cacheName, self.p._getvalues(), compute)
+        return series if isinstance(series, tuple) else (series,)
+
+    def once(self, start, end):
+        # Warm-up bars are filled too: like the built-ins, a line may start before the indicator's minperiod
+        for line, values in zip(self.lines, self._cachedAll(end)):
+            line.array[:end] = _lineArray(values)
+
+    def prenext(self):
+        self.next()
+
+    def preonce(self, start, end):
+        pass
+
+    def oncestart(self, start, end):
+        pass  # The once() call that follows fills the warm-up too
+
+    def next(self):
+        i = len(self) - 1
+        if self._cache is None or i >= len(self._cache[0]):
+            self._cache = self._computeAll(self.data.buflen())
+        for line, values in zip(self.lines, self._cache):
+            line[0] = values[i]
+
+
+class EMA(VectorIndicator):
+    """
+    Exponential moving average, as bt.indicators.EMA.
+    """
+    lines = ('ema',)
+    params = (('period', 30),)
+    cacheName = 'ema'
+    plotinfo = dict(subplot=False)
+
+    def __init__(self):
+        super().__init__()
+        self.addminperiod(self.p.period)
+
+    def compute(self, first, end):
+        close = _series(self.data, first, end)
+        if USE_TALIB:
+            return (talib.EMA(close, timeperiod=self.p.period),)
+        return (ai.ema(close, self.p.period),)
+
+
+class ATR(VectorIndicator):
+    """
+    Average true range, as bt.indicators.ATR.
+    """
+    lines = ('atr',)
+    params = (('period', 14),)
+    cacheName = 'atr'
+
+    def __init__(self):
+        super().__init__()
+        self.addminperiod(self.p.period + 1)
+
+    def compute(self, first, end):
+        high = _series(self.data.high, first, end)
+        low = _series(self.data.low, first, end)
+        close = _series(self.data.close, first, end)
+        if USE_TALIB:
+            return (talib.ATR(high, low, close, timeperiod=self.p.period),)
+        return (ai.atr(high, low, close, self.p.period),)
+
+
+class BollingerBands(VectorIndicator):
+    """
+    Bollinger bands, as bt.indicators.BollingerBands.
+    """
+    lines = ('mid', 'top', 'bot')
+    params = (('period', 20), ('devfactor', 2.0))
+    cacheName = 'bollinger'
+    plotinfo = dict(subplot=False)
+
+    def __init__(self):
+        super().__init__()
+        self.addminperiod(self.p.period)
+
+    def compute(self, first, end):
+        close = _series(self.data, first, end)
+        if USE_TALIB:
+            top, mid, bot = talib.BBANDS(close, timeperiod=self.p.period, nbdevup=self.p.devfactor,
+                                         nbdevdn=self.p.devfactor, matype=0)
+            return mid, top, bot
+        return ai.bollinger(close, self.p.period, self.p.devfactor)
+
+
+class Stochastic(VectorIndicator):
+    """
+    Slow stochastic, as bt.indicators.Stochastic.
+    """
+    lines = ('percK', 'percD')
+    params = (('period', 14), ('period_dfast', 3), ('period_dslow', 3))
+    cacheName = 'stochastic'
+
+    def __init__(self):
+        super().__init__()
+        self.addminperiod(self.p.period + self.p.period_dfast - 1 + self.p.period_dslow - 1)
+
+    def compute(self, first, end):
+        high = _series(self.data.high, first, end)
+        low = _series(self.data.low, first, end)
+        close = _series(self.data.close, first, end)
+        if USE_TALIB:
+            return talib.STOCH(high, low, close, fastk_period=self.p.period, slowk_period=self.p.period_dfast,
+                               slowk_matype=0, slowd_period=self.p.period_dslow, slowd_matype=0)
+        return ai.stochastic(high, low, close, self.p.period, self.p.period_dfast, self.p.period_dslow)
+
+
+class RSI(VectorIndicator):
+    """
+    Relative strength index with Wilder smoothing, as bt.indicators.RSI.
+    """
+    lines = ('rsi',)
+    params = (('period', 14),)
+    cacheName = 'rsi'
+
+    def __init__(self):
+        super().__init__()
+        self.addminperiod(self.p.period + 1)
+
+    def compute(self, first, end):
+        close = _series(self.data, first, end)
+        if USE_TALIB:
+            return (talib.RSI(close, timeperiod=self.p.period),)
+        return (ai.rsi(close, self.p.period),)
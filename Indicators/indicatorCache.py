@@ -0,0 +1,148 @@
+"""
+A per-process cache of indicator series shared by strategies, engines and optimizer runs.
+
+Series are keyed by (data fingerprint, indicator name, parameters), so the same
+ATR(14) over the same bars is computed once however many strategies or parameter
+combinations ask for it. Recently used series are kept in memory up to a byte
+budget; with a spill directory every series is also written to disk, where
+later runs and other worker processes find it.
+
+Environment:
+    NAMI_INDICATOR_CACHE=0      disable the shared cache
+    NAMI_INDICATOR_CACHE_MB     in-memory budget in megabytes (default 256)
+    NAMI_INDICATOR_CACHE_DIR    spill directory (default: no disk tier)
+"""
+import os
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+
+ENABLED = os.environ.get('NAMI_INDICATOR_CACHE', '1') != '0'
+
+
+def fingerprint(*arrays):
+    """
+    Content hash of the given price arrays.
+
+    Bar sets are fingerprinted from their open, high, low and close arrays in that
+    order, so a Backtrader feed and vectorized bar arrays over the same bars share keys.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for values in arrays:
+        values = np.ascontiguousarray(values, dtype=np.float64)
+        digest.update(len(values).to_bytes(8, 'little'))
+        digest.update(values.data)
+    return digest.hexdigest()
+
+
+class IndicatorCache:
+    """
+    LRU cache of indicator series with an optional on-disk spill directory.
+
+    :param max_bytes: In-memory budget; least recently used series are dropped beyond it.
+    :param spill_dir: Directory where every computed series is also stored as ``.npz``.
+    """
+
+    def __init__(self, max_bytes=None, spill_dir=None):
+        self.max_bytes = max_bytes if max_bytes is not None else int(os.environ.get('NAMI_INDICATOR_CACHE_MB', 256)) * 2 ** 20
+        self.spill_dir = spill_dir or os.environ.get('NAMI_INDICATOR_CACHE_DIR')
+        self._series = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(data_fingerprint, name, params):
+        """
+        Cache key of one indicator over one data set.
+        """
+        # 2 and 2.0 are the same parameter
+        params = tuple(float(p) if isinstance(p, (int, float)) and not isinstance(p, bool) else p for p in params)
+        return hashlib.blake2b(repr((data_fingerprint, name, params)).encode(), digest_size=16).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.spill_dir, f'{key}.npz')
+
+    def get(self, data_fingerprint, name, params, compute):
+        """
+        Return the cached series of an indicator, calling `compute()` on a miss.
+
+        :param compute: Returns the indicator's lines as an array or a tuple of arrays.
+        :return: The same shape `compute` returns; arrays are read-only because they are shared.
+        """
+        key = self.key(data_fingerprint, name, params)
+        if key in self._series:
+            self._series.move_to_end(key)
+            self.hits += 1
+            return self._series[key]
+
+        value = self._load(key)
+        if value is not None:
+            self.disk_hits += 1
+        else:
+            self.misses += 1
+            value = self._freeze(compute())
+            self._spill(key, value)
+        self._remember(key, value)
+        return value
+
+    def clear(self):
+        self._series.clear()
+        self.nbytes = 0
+
+    @staticmethod
+    def _freeze(value):
+        lines = value if isinstance(value, tuple) else (value,)
+        frozen = []
+        for line in lines:
+            line = np.array(line, dtype=np.float64)
+            line.setflags(write=False)
+            frozen.append(line)
+        return tuple(frozen) if isinstance(value, tuple) else frozen[0]
+
+    @staticmethod
+    def _size(value):
+        return sum(line.nbytes for line in value) if isinstance(value, tuple) else value.nbytes
+
+    def _remember(self, key, value):
+        self._series[key] = value
+        self.nbytes += self._size(value)
+        while self.nbytes > self.max_bytes and len(self._series) > 1:
+            _, dropped = self._series.popitem(last=False)
+            self.nbytes -= self._size(dropped)
+
+    def _load(self, key):
+        if not self.spill_dir or not os.path.exists(self.path(key)):
+            return None
+        with np.load(self.path(key)) as stored:
+            lines = [stored[f'line{i}'] for i in range(len(stored.files) - 1)]
+            value = tuple(lines) if stored['is_tuple'] else lines[0]
+        return self._freeze(value)
+
+    def _spill(self, key, value):
+        if not self.spill_dir:
+            return
+        os.makedirs(self.spill_dir, exist_ok=True)
+        lines = value if isinstance(value, tuple) else (value,)
+        # Written next to the target and swapped in, so concurrent workers never read a partial file
+        tmp_path = f'{self.path(key)}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, is_tuple=isinstance(value, tuple), **{f'line{i}': line for i, line in enumerate(lines)})
+        os.replace(tmp_path, self.path(key))
+
+
+_shared = None
+
+
+def shared():
+    """
+    The process-wide cache, or None when disabled with NAMI_INDICATOR_CACHE=0.
+    """
+    global _shared
+    if not ENABLED:
+        return None
+    if _shared is None:
+        _shared = IndicatorCache()
+    return _shared
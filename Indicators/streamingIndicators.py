@@ -0,0 +1,242 @@
+"""
+Incremental versions of the indicators used by the strategies, for live trading.
+
+Each indicator keeps only the state it needs and is advanced with one update()
+call per closed bar, in constant time whatever the length of the history.
+update() returns the indicator's value(s) at that bar, NaN during warm-up, and
+the values match Indicators.arrayIndicators over the same bars.
+"""
+import math
+from collections import deque
+
+NAN = float('nan')
+
+
+class RollingSum:
+    """
+    Sum of the last `period` values.
+
+    Values are centred on the first one seen so the running sums stay small, and
+    the sums are rebuilt from the window every `period` updates so rounding
+    errors cannot accumulate over a long session.
+    """
+
+    def __init__(self, period, squares=False):
+        self.period = period
+        self.squares = squares
+        self.window = deque(maxlen=period)
+        self.offset = None
+        self.sum = 0.0
+        self.sumsq = 0.0
+        self._sinceRebuild = 0
+
+    @property
+    def full(self):
+        return len(self.window) == self.period
+
+    def update(self, x):
+        if self.offset is None:
+            self.offset = x
+        d = x - self.offset
+        if self.full:
+            old = self.window[0]
+            self.sum -= old
+            if self.squares:
+                self.sumsq -= old * old
+        self.window.append(d)
+        self.sum += d
+        if self.squares:
+            self.sumsq += d * d
+
+        self._sinceRebuild += 1
+        if self._sinceRebuild >= self.period:
+            self.sum = math.fsum(self.window)
+            if self.squares:
+                self.sumsq = math.fsum(v * v for v in self.window)
+            self._sinceRebuild = 0
+
+    def mean(self):
+        return self.sum / self.period + self.offset if self.full else NAN
+
+    def std(self):
+        """
+        Population standard deviation of the window.
+        """
+        if not self.full:
+            return NAN
+        m = self.sum / self.period
+        return math.sqrt(max(self.sumsq / self.period - m * m, 0.0))
+
+
+class RollingExtreme:
+    """
+    Highest (or lowest) of the last `period` values, from a monotonic deque.
+    """
+
+    def __init__(self, period, highest=True):
+        self.period = period
+        self.highest = highest
+        self._window = deque()  # (index, value), values decreasing for highest, increasing for lowest
+        self._count = 0
+
+    def update(self, x):
+        window = self._window
+        if self.highest:
+            while window and window[-1][1] <= x:
+                window.pop()
+        else:
+            while window and window[-1][1] >= x:
+                window.pop()
+        window.append((self._count, x))
+        self._count += 1
+        while window[0][0] <= self._count - 1 - self.period:
+            window.popleft()
+        return window[0][1] if self._count >= self.period else NAN
+
+
+class SMA:
+    """
+    Simple moving average.
+    """
+
+    def __init__(self, period):
+        self.sum = RollingSum(period)
+        self.value = NAN
+
+    def update(self, x):
+        self.sum.update(x)
+        self.value = self.sum.mean()
+        return self.value
+
+
+class _Seeded:
+    # Exponential average seeded with the SMA of its first `period` inputs, as Backtrader does
+    alpha = None
+
+    def __init__(self, period):
+        self.period = period
+        self._seed = 0.0
+        self._count = 0
+        self.value = NAN
+
+    def update(self, x):
+        if self._count < self.period:
+            self._count += 1
+            self._seed += x
+            if self._count == self.period:
+                self.value = self._seed / self.period
+        else:
+            self.value = (1.0 - self.alpha) * self.value + self.alpha * x
+        return self.value
+
+
+class EMA(_Seeded):
+    """
+    Exponential moving average, alpha = 2 / (period + 1).
+    """
+
+    def __init__(self, period):
+        super().__init__(period)
+        self.alpha = 2.0 / (period + 1)
+
+
+class SMMA(_Seeded):
+    """
+    Smoothed (Wilder) moving average, alpha = 1 / period.
+    """
+
+    def __init__(self, period):
+        super().__init__(period)
+        self.alpha = 1.0 / period
+
+
+class ATR:
+    """
+    Average true range. The first bar has no previous close and only starts the series.
+    """
+
+    def __init__(self, period=14):
+        self.smma = SMMA(period)
+        self._prevClose = None
+        self.value = NAN
+
+    def update(self, high, low, close):
+        if self._prevClose is not None:
+            prev = self._prevClose
+            self.value = self.smma.update(max(high, prev) - min(low, prev))
+        self._prevClose = close
+        return self.value
+
+
+class BollingerBands:
+    """
+    Bollinger bands; update() returns (mid, top, bot).
+    """
+
+    def __init__(self, period=20, devfactor=2.0):
+        self.devfactor = devfactor
+        self.sum = RollingSum(period, squares=True)
+        self.value = (NAN, NAN, NAN)
+
+    def update(self, close):
+        self.sum.update(close)
+        mid = self.sum.mean()
+        dev = self.devfactor * self.sum.std()
+        self.value = (mid, mid + dev, mid - dev)
+        return self.value
+
+
+class Stochastic:
+    """
+    Slow stochastic; update() returns (percK, percD).
+    """
+
+    def __init__(self, period=14, period_dfast=3, period_dslow=3):
+        self.highest = RollingExtreme(period, highest=True)
+        self.lowest = RollingExtreme(period, highest=False)
+        self.percK = SMA(period_dfast)
+        self.percD = SMA(period_dslow)
+        self.value = (NAN, NAN)
+
+    def update(self, high, low, close):
+        hh = self.highest.update(high)
+        ll = self.lowest.update(low)
+        if math.isnan(hh):
+            return self.value
+        k = 100.0 * (close - ll) / (hh - ll) if hh != ll else NAN
+        percK = self.percK.update(k)
+        percD = self.percD.update(percK) if not math.isnan(percK) else NAN
+        self.value = (percK, percD)
+        return self.value
+
+
+class SwingFailure:
+    """
+    Swing failure pattern; update() returns (sfp_signal, swing_high, swing_low).
+
+    The swing high/low of a bar are the highest high/lowest low of the previous
+    `lookback - 1` bars; sfp_signal is 1 for a bearish and -1 for a bullish failure.
+    """
+
+    def __init__(self, lookback=10):
+        self.lookback = lookback
+        self.highs = RollingExtreme(lookback - 1, highest=True)
+        self.lows = RollingExtreme(lookback - 1, highest=False)
+        self._count = 0
+        self.value = (NAN, NAN, NAN)
+
+    def update(self, high, low, close):
+        if self._count >= self.lookback:
+            prev_high, prev_low = self._swingHigh, self._swingLow
+            if high > prev_high and close < prev_high:
+                signal = 1.0
+            elif low < prev_low and close > prev_low:
+                signal = -1.0
+            else:
+                signal = 0.0
+            self.value = (signal, prev_high if high < prev_high else NAN, prev_low if low > prev_low else NAN)
+        # The windows used by the next bar
+        self._swingHigh = self.highs.update(high)
+        self._swingLow = self.lows.update(low)
+        self._count += 1
+        return self.value
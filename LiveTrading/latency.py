@@ -0,0 +1,101 @@
+"""
+Latency histograms for the live engine.
+
+Latencies are counted in log-spaced buckets, so recording one is a couple of
+arithmetic operations and the histogram has a fixed size however long the
+session runs. Percentiles are read from the buckets, accurate to the bucket
+width (about 12% at the default 20 buckets per decade).
+"""
+import math
+
+import numpy as np
+import pandas as pd
+
+
+class LatencyHistogram:
+    """
+    Histogram of latencies in seconds.
+
+    :param low: Lower edge of the first bucket; faster samples are counted in an underflow bucket.
+    :param high: Upper edge of the last bucket; slower samples are counted in an overflow bucket.
+    :param perDecade: Buckets per factor of ten.
+    """
+
+    def __init__(self, low=1e-6, high=100.0, perDecade=20):
+        self.low = low
+        self.perDecade = perDecade
+        self.buckets = int(math.ceil(math.log10(high / low) * perDecade))
+        self.counts = [0] * (self.buckets + 2)  # underflow, buckets, overflow
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        if seconds < self.low:
+            i = 0
+        else:
+            i = min(self.buckets + 1, 1 + int(math.log10(seconds / self.low) * self.perDecade))
+        self.counts[i] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def merge(self, other):
+        """
+        Add the samples of another histogram with the same buckets.
+        """
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+        return self
+
+    def edges(self):
+        """
+        Lower edges of every bucket, the underflow bucket (0) and the overflow bucket included.
+        """
+        return np.concatenate([[0.0], self.low * 10.0 ** (np.arange(self.buckets + 1) / self.perDecade)])
+
+    def percentile(self, q):
+        """
+        Upper edge of the bucket holding the q-th percentile (0-100), capped at the largest sample.
+        """
+        if not self.count:
+            return float('nan')
+        rank = q / 100.0 * self.count
+        cumulative = np.cumsum(self.counts)
+        i = int(np.searchsorted(cumulative, rank, side='left'))
+        upper = self.edges()[i + 1] if i + 1 <= self.buckets else self.max
+        return min(upper, self.max)
+
+    def summary(self):
+        """
+        Sample count, mean, 50th/90th/99th/99.9th percentiles and maximum, in seconds.
+        """
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else float('nan'),
+            'p50': self.percentile(50),
+            'p90': self.percentile(90),
+            'p99': self.percentile(99),
+            'p99.9': self.percentile(99.9),
+            'max': self.max if self.count else float('nan'),
+        }
+
+    def frame(self):
+        """
+        The non-empty buckets as a DataFrame with From (us), To (us) and Count columns.
+        """
+        edges = self.edges()
+        upper = np.concatenate([edges[1:], [np.inf]])
+        counts = np.array(self.counts)
+        used = counts > 0
+        return pd.DataFrame({'From (us)': edges[used] * 1e6, 'To (us)': upper[used] * 1e6, 'Count': counts[used]})
+
+    def __str__(self):
+        s = self.summary()
+        if not s['count']:
+            return 'no samples'
+        return (f"n={s['count']}  mean {s['mean'] * 1e6:.0f} us  p50 {s['p50'] * 1e6:.0f} us  "
+                f"p90 {s['p90'] * 1e6:.0f} us  p99 {s['p99'] * 1e6:.0f} us  max {s['max'] * 1e6:.0f} us")
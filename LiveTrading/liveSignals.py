@@ -0,0 +1,160 @@
+"""
+Bar-by-bar entry signals of the bracket-order strategies, for live trading.
+
+Each class is the live counterpart of the strategy's signal function in
+BackTesting.vectorized: it owns streaming indicators, and update() advances
+them by one closed bar and returns the bracket to place on that bar, if any.
+Entries, stops and targets are computed exactly as in the backtests, so a
+replay of historical bars signals on the same bars the backtests do.
+"""
+import os
+import sys
+import math
+from collections import namedtuple
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from Indicators import streamingIndicators as si
+from BackTesting.vectorized import strategyParams
+from Strategies.MeanReversion import MeanReversionStrategy
+from Strategies.SupplyAndDemand import TrendFollowingStrategy
+from Strategies.CrashAndBoom import CrashBoomStrategy
+from Strategies.SwingFailure import SFPStrategy
+
+Bar = namedtuple('Bar', 'time open high low close volume')
+
+# A limit entry at `entry` with a stop-loss and take-profit; side is 1 long, -1 short
+Bracket = namedtuple('Bracket', 'side entry stop target')
+
+NAN = float('nan')
+
+
+class LiveSignals:
+    """
+    Base class of the live signal generators.
+
+    :param params: Strategy parameters overriding the strategy class defaults.
+    """
+
+    strategy = None
+
+    def __init__(self, params=None):
+        self.p = strategyParams(self.strategy, params)
+
+    def update(self, bar):
+        """
+        Advance the indicators by one closed bar and return a Bracket to place, or None.
+        """
+        raise NotImplementedError
+
+
+class MeanReversionSignals(LiveSignals):
+    strategy = MeanReversionStrategy
+
+    def __init__(self, params=None):
+        super().__init__(params)
+        self.bollinger = si.BollingerBands(self.p['bollinger_period'], self.p['devfactor'])
+        self.atr = si.ATR(self.p['atr_period'])
+
+    def update(self, bar):
+        close = bar.close
+        mid, top, bot = self.bollinger.update(close)
+        atr = self.atr.update(bar.high, bar.low, close)
+        if math.isnan(atr):
+            return None
+        if close < bot:
+            return Bracket(1, close, close - self.p['atr_mult'] * atr, close + self.p['profit_mult'] * atr)
+        if close > top:
+            return Bracket(-1, close, close + self.p['atr_mult'] * atr, close - self.p['profit_mult'] * atr)
+        return None
+
+
+class TrendFollowingSignals(LiveSignals):
+    strategy = TrendFollowingStrategy
+
+    def __init__(self, params=None):
+        super().__init__(params)
+        self.ema = si.EMA(self.p['ema_period'])
+        self.stochastic = si.Stochastic(self.p['stoch_k'], self.p['stoch_d'], self.p['stoch_smooth'])
+        self.atr = si.ATR(self.p['atr_period'])
+        self._prevK = NAN
+
+    def update(self, bar):
+        close = bar.close
+        ema = self.ema.update(close)
+        percK, _ = self.stochastic.update(bar.high, bar.low, close)
+        atr = self.atr.update(bar.high, bar.low, close)
+        prevK, self._prevK = self._prevK, percK
+        if math.isnan(atr):
+            return None
+        if close > ema and percK < 20 and prevK < percK:
+            return Bracket(1, close, close - self.p['atr_mult_sl'] * atr, close + self.p['atr_mult_tp'] * atr)
+        if close < ema and percK > 80 and prevK > percK:
+            return Bracket(-1, close, close + self.p['atr_mult_sl'] * atr, close - self.p['atr_mult_tp'] * atr)
+        return None
+
+
+class CrashBoomSignals(LiveSignals):
+    strategy = CrashBoomStrategy
+
+    def __init__(self, params=None):
+        super().__init__(params)
+        self.emaTrend = si.EMA(self.p['ema_trend_period'])
+        self.bollinger = si.BollingerBands(self.p['bollinger_period'], self.p['devfactor'])
+        self.emaSignal = si.EMA(self.p['ema_signal_period'])
+        self.atr = si.ATR(self.p['atr_period'])
+        self._prevSignal = NAN
+
+    def update(self, bar):
+        close = bar.close
+        ema_trend = self.emaTrend.update(close)
+        mid, top, bot = self.bollinger.update(close)
+        ema_signal = self.emaSignal.update(close)
+        atr = self.atr.update(bar.high, bar.low, close)
+        prev_signal, self._prevSignal = self._prevSignal, ema_signal
+        if math.isnan(atr) or math.isnan(ema_trend):
+            return None
+
+        if close > ema_trend and close < top and prev_signal < mid and ema_signal > mid:
+            stop = bot - self.p['atr_mult'] * atr
+            return Bracket(1, close, stop, close + self.p['profit_mult'] * (close - stop))
+        if close < ema_trend and close > bot and prev_signal > mid and ema_signal < mid:
+            stop = top + self.p['atr_mult'] * atr
+            return Bracket(-1, close, stop, close - self.p['profit_mult'] * (stop - close))
+        return None
+
+
+class SFPSignals(LiveSignals):
+    strategy = SFPStrategy
+
+    def __init__(self, params=None):
+        super().__init__(params)
+        self.sfp = si.SwingFailure(self.p.get('lookback', 10))
+        self.ema = si.EMA(200)
+        self.atr = si.ATR(14)
+
+    def update(self, bar):
+        close = bar.close
+        signal, _, _ = self.sfp.update(bar.high, bar.low, close)
+        ema = self.ema.update(close)
+        atr = self.atr.update(bar.high, bar.low, close)
+        if math.isnan(atr) or math.isnan(ema):
+            return None
+        if signal == -1 and close > ema:
+            return Bracket(1, close, close - 1.5 * atr, close + 2 * atr)
+        if signal == 1 and close < ema:
+            return Bracket(-1, close, close + 1.5 * atr, close - 2 * atr)
+        return None
+
+
+# Strategy class name -> live signal class
+LIVE_SIGNALS = {cls.strategy.__name__: cls for cls in (MeanReversionSignals, TrendFollowingSignals, CrashBoomSignals, SFPSignals)}
+
+
+def signalsFor(strategy, params=None):
+    """
+    Return a fresh live signal generator for a strategy class or class name.
+    """
+    name = strategy if isinstance(strategy, str) else strategy.__name__
+    if name not in LIVE_SIGNALS:
+        raise ValueError(f"{name} has no live implementation, expected one of {sorted(LIVE_SIGNALS)}")
+    return LIVE_SIGNALS[name](params)
@@ -0,0 +1,552 @@
+"""
+Event-driven live trading engine.
+
+LiveEngine trades any number of (strategy, symbol) pairs from one asyncio loop.
+A feed streams closed bars for every symbol; for each bar the engine lets the
+broker settle its orders on that bar, then advances the streaming indicators
+of the strategies on the symbol by one bar (LiveTrading.liveSignals) and sends
+the brackets they signal to the broker. No indicator is recomputed over history,
+so the work per bar is constant however long the session runs.
+
+Feeds:
+    PollingFeed    new closed bars from Data.get_live_data (MetaTrader 5 by default;
+                   with Data.dataSources.ReplaySource it replays stored bars on a clock)
+    ReplayFeed     stored bars replayed in time order at real time, N x or full speed
+Brokers:
+    MT5Broker       orders sent to a MetaTrader 5 terminal
+    SimulatedBroker brackets filled against the bars with the backtests' fill rules
+
+Offline, a replay of stored bars through the SimulatedBroker exercises the whole
+loop and takes the same trades as the vectorized backtest of the same bars:
+
+    summary = runReplay([('MeanReversionStrategy', 'EURUSD')], {'EURUSD': frame})
+
+The engine records the latency from each bar becoming available (its close in a
+timed replay, its arrival from a polled source) to the end of the decisions on
+it, per symbol and overall, in LiveTrading.latency histograms.
+"""
+import asyncio
+import heapq
+import os
+import sys
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from Data import dataLoader as dl
+from Data import timeframes as tf
+from BackTesting import metrics
+from LiveTrading.latency import LatencyHistogram
+from LiveTrading.liveSignals import Bar, signalsFor
+from Strategies.namiStrategy import JOURNAL_DTYPE, INFO, DEBUG, WARNING, toLevel
+
+# MetaTrader5 calls block and are not thread-safe, so they all run on one worker thread
+_blockingCalls = ThreadPoolExecutor(max_workers=1, thread_name_prefix='nami-live')
+
+
+async def _blocking(fn, *args):
+    return await asyncio.get_running_loop().run_in_executor(_blockingCalls, fn, *args)
+
+
+def frameToBars(df):
+    """
+    Return the rows of a bar DataFrame as a list of Bars.
+    """
+    volume = df['volume'] if 'volume' in df.columns else np.zeros(len(df))
+    return [Bar(*row) for row in zip(df.index.to_pydatetime(), df['open'].tolist(), df['high'].tolist(),
+                                     df['low'].tolist(), df['close'].tolist(), np.asarray(volume).tolist())]
+
+
+class BarFeed:
+    """
+    Base class of bar feeds.
+
+    stream() yields (symbol, Bar, arrived) for each bar as it closes, oldest first for
+    each symbol, where `arrived` is the time.perf_counter() at which the bar became available.
+    """
+
+    async def history(self, symbol, count):
+        """
+        Return up to `count` closed bars before the stream starts, for warming up indicators.
+        """
+        return []
+
+    async def stream(self, symbols):
+        raise NotImplementedError
+        yield
+
+
+class ReplayFeed(BarFeed):
+    """
+    Replays stored bars of several symbols merged in time order.
+
+    With a speed, each bar is released when it closes on a replay clock running
+    `speed` times faster than the wall clock (1 is real time), and a bar the
+    engine picks up late counts the delay in its latency. Without one, bars are
+    released as fast as the engine consumes them.
+
+    :param bars: Dict of symbol -> DataFrame of bars or Data handle.
+    :param speed: Replay seconds per wall-clock second, or None for full speed.
+    :param timeframe: Bar timeframe, to know when bars close (default: inferred from the bars).
+    """
+
+    # Bars between two yields to the event loop at full speed, so other tasks still run
+    yieldEvery = 256
+
+    def __init__(self, bars, speed=None, timeframe=None):
+        self.bars = bars
+        self.speed = speed
+        self.timeframe = timeframe
+
+    @classmethod
+    def fromData(cls, symbols, timeframe=tf.TIMEFRAME_M1, speed=None, **dataKwargs):
+        """
+        Replay the bars Data loads for each symbol, e.g. cached bars with offline=True.
+        """
+        return cls({symbol: dl.Data(symbol=symbol, timeframe=timeframe, **dataKwargs) for symbol in symbols},
+                   speed, timeframe)
+
+    def _frame(self, symbol):
+        bars = self.bars[symbol]
+        return bars.full_data if isinstance(bars, dl.Data) else bars
+
+    def _barSeconds(self, frames):
+        if self.timeframe is not None:
+            return tf.seconds(self.timeframe)
+        for frame in frames:
+            if len(frame) > 1:
+                return float(np.median(np.diff(frame.index.to_numpy(dtype='datetime64[s]')).astype(np.int64)))
+        return 0.0
+
+    async def stream(self, symbols):
+        frames = [self._frame(symbol) for symbol in symbols]
+        streams = [[(bar.time, i, symbol, bar) for bar in frameToBars(frame)]
+                   for i, (symbol, frame) in enumerate(zip(symbols, frames))]
+        merged = heapq.merge(*streams)
+        if not self.speed:
+            for n, (_, _, symbol, bar) in enumerate(merged, 1):
+                yield symbol, bar, time.perf_counter()
+                if n % self.yieldEvery == 0:
+                    await asyncio.sleep(0)
+            return
+
+        step = self._barSeconds(frames)
+        first = None
+        for bar_time, _, symbol, bar in merged:
+            if first is None:
+                first, wall_start = bar_time, time.perf_counter()
+            due = wall_start + ((bar_time - first).total_seconds() + step) / self.speed
+            delay = due - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                # Timer overshoot is the feed's, not the engine's
+                arrived = time.perf_counter()
+            else:
+                arrived = due
+            yield symbol, bar, arrived
+
+
+class PollingFeed(BarFeed):
+    """
+    Closed bars polled from a data source through Data.get_live_data, one task per symbol.
+
+    Each poll fetches only the last few bars; the newest bar is still forming and
+    is emitted once the next one has started.
+
+    :param timeframe: Bar timeframe (default: M1).
+    :param source: Data source backend (default: $NAMI_DATA_SOURCE or 'mt5').
+    :param poll: Seconds between two polls of a symbol.
+    """
+
+    def __init__(self, timeframe=tf.TIMEFRAME_M1, source=None, poll=1.0):
+        self.timeframe = timeframe
+        self.source = source
+        self.poll = poll
+        self._data = {}
+
+    def _handle(self, symbol):
+        if symbol not in self._data:
+            self._data[symbol] = dl.Data(symbol=symbol, timeframe=self.timeframe, use_cache=False, source=self.source)
+        return self._data[symbol]
+
+    async def _closedBars(self, symbol, count):
+        data = self._handle(symbol)
+        frame = await _blocking(data.get_live_data, symbol, self.timeframe, count + 1)
+        return frameToBars(frame.iloc[:-1]) if len(frame) > 1 else []
+
+    async def history(self, symbol, count):
+        return await self._closedBars(symbol, count)
+
+    async def _poll(self, symbol, queue):
+        last = None
+        while True:
+            for bar in await self._closedBars(symbol, 2):
+                if last is not None and bar.time > last:
+                    await queue.put((symbol, bar, time.perf_counter()))
+                last = bar.time if last is None else max(last, bar.time)
+            await asyncio.sleep(self.poll)
+
+    async def stream(self, symbols):
+        queue = asyncio.Queue()
+        tasks = [asyncio.create_task(self._poll(symbol, queue)) for symbol in symbols]
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+class Broker:
+    """
+    Base class of the brokers the engine sends bracket orders to.
+
+    Orders are identified by a tag, one per (strategy, symbol) pair, and a pair
+    holds at most one bracket at a time.
+    """
+
+    async def onBar(self, symbol, bar):
+        """
+        Called with every closed bar before the strategies see it.
+        """
+
+    async def isFlat(self, tag, symbol):
+        """
+        Whether the pair has neither a position nor a pending entry.
+        """
+        raise NotImplementedError
+
+    async def submit(self, tag, symbol, bracket, size, time):
+        """
+        Place a bracket order; return True if it was accepted.
+        """
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+class SimulatedBroker(Broker):
+    """
+    Fills brackets against the bars the way Backtrader's broker (and the vectorized engine) does.
+
+    The entry limit is tried from the bar after the signal and fills at the open
+    if the bar gaps through it. The stop-loss and take-profit become active on
+    the bar after the fill, and the stop wins when both are hit on the same bar.
+    A bracket that costs more than the free cash is rejected.
+    """
+
+    def __init__(self, starting_balance=100000):
+        self.starting_balance = starting_balance
+        self.cash = starting_balance
+        self._pending = {}   # tag -> (symbol, bracket, size)
+        self._open = {}      # tag -> [symbol, bracket, size, entry price, entry time, bars held]
+        self._bySymbol = {}  # symbol -> tags with a pending entry or an open position
+        self._journals = {}  # tag -> list of closed-trade tuples in JOURNAL_DTYPE order
+        self._opened = {}    # tag -> trades opened
+
+    async def isFlat(self, tag, symbol):
+        return tag not in self._pending and tag not in self._open
+
+    async def submit(self, tag, symbol, bracket, size, time):
+        if size * bracket.entry > self.cash:
+            return False
+        self._pending[tag] = (symbol, bracket, size)
+        self._bySymbol.setdefault(symbol, set()).add(tag)
+        return True
+
+    async def onBar(self, symbol, bar):
+        tags = self._bySymbol.get(symbol)
+        if not tags:
+            return
+        for tag in list(tags):
+            if tag in self._open:
+                self._settle(tag, bar)
+            else:
+                self._fill(tag, bar)
+
+    def _fill(self, tag, bar):
+        symbol, bracket, size = self._pending[tag]
+        limit = bracket.entry
+        if bracket.side == 1:
+            if bar.low > limit:
+                return
+            price = bar.open if bar.open <= limit else limit
+        else:
+            if bar.high < limit:
+                return
+            price = bar.open if bar.open >= limit else limit
+        del self._pending[tag]
+        self._open[tag] = [symbol, bracket, size, price, bar.time, 0]
+        self._opened[tag] = self._opened.get(tag, 0) + 1
+
+    def _settle(self, tag, bar):
+        position = self._open[tag]
+        symbol, bracket, size, entry, entry_time, _ = position
+        position[5] += 1
+        if bracket.side == 1:
+            if bar.low <= bracket.stop:
+                price = bar.open if bar.open <= bracket.stop else bracket.stop
+            elif bar.high >= bracket.target:
+                price = bar.open if bar.open >= bracket.target else bracket.target
+            else:
+                return
+        else:
+            if bar.high >= bracket.stop:
+                price = bar.open if bar.open >= bracket.stop else bracket.stop
+            elif bar.low <= bracket.target:
+                price = bar.open if bar.open <= bracket.target else bracket.target
+            else:
+                return
+        pnl = bracket.side * size * (price - entry)
+        self.cash += pnl
+        del self._open[tag]
+        self._bySymbol[symbol].discard(tag)
+        self._journals.setdefault(tag, []).append(
+            (entry_time, bar.time, entry, price, bracket.side, size, pnl, pnl, position[5]))
+
+    def journal(self, tag):
+        """
+        The closed trades of a pair, as a JOURNAL_DTYPE array.
+        """
+        return np.array(self._journals.get(tag, []), dtype=JOURNAL_DTYPE)
+
+    def summary(self, tags):
+        """
+        One row of trade statistics per tag.
+
+        :param tags: Dict of tag -> (strategy name, symbol).
+        """
+        rows = []
+        for tag, (name, symbol) in tags.items():
+            pnl = self.journal(tag)['pnlcomm']
+            opened = self._opened.get(tag, 0)
+            rows.append({
+                'Strategy': name,
+                'Symbol': symbol,
+                'PnL': float(pnl.sum()),
+                'SQN': metrics.sqn(pnl),
+                'Trades Taken': opened,
+                'Closed Trades': len(pnl),
+                'Win rate': metrics.winRate(pnl, opened),
+            })
+        return pd.DataFrame(rows)
+
+
+class MT5Broker(Broker):
+    """
+    Brackets sent to a MetaTrader 5 terminal as market orders carrying the stop-loss and take-profit.
+
+    Each (strategy, symbol) pair trades under its own magic number, so positions
+    of several strategies on one symbol are told apart.
+
+    :param volume: Order volume in lots.
+    :param deviation: Maximum slippage in points.
+    """
+
+    def __init__(self, volume=0.1, deviation=20):
+        self.volume = volume
+        self.deviation = deviation
+        self.mt5 = None
+
+    def connect(self):
+        if self.mt5 is None:
+            import MetaTrader5 as mt5
+            if not mt5.initialize():
+                raise RuntimeError(f"MT5 initialization failed, error code = {mt5.last_error()}")
+            self.mt5 = mt5
+        return self.mt5
+
+    @staticmethod
+    def magic(tag):
+        return zlib.crc32(tag.encode()) & 0x7fffffff
+
+    def _isFlat(self, tag, symbol):
+        mt5 = self.connect()
+        magic = self.magic(tag)
+        positions = mt5.positions_get(symbol=symbol) or ()
+        orders = mt5.orders_get(symbol=symbol) or ()
+        return not any(item.magic == magic for item in (*positions, *orders))
+
+    def _submit(self, tag, symbol, bracket):
+        mt5 = self.connect()
+        tick = mt5.symbol_info_tick(symbol)
+        buy = bracket.side == 1
+        request = {
+            'action': mt5.TRADE_ACTION_DEAL,
+            'symbol': symbol,
+            'volume': self.volume,
+            'type': mt5.ORDER_TYPE_BUY if buy else mt5.ORDER_TYPE_SELL,
+            'price': tick.ask if buy else tick.bid,
+            'sl': bracket.stop,
+            'tp': bracket.target,
+            'deviation': self.deviation,
+            'magic': self.magic(tag),
+            'comment': tag[:31],
+            'type_time': mt5.ORDER_TIME_GTC,
+            'type_filling': mt5.ORDER_FILLING_IOC,
+        }
+        result = mt5.order_send(request)
+        return result is not None and result.retcode == mt5.TRADE_RETCODE_DONE
+
+    async def isFlat(self, tag, symbol):
+        return await _blocking(self._isFlat, tag, symbol)
+
+    async def submit(self, tag, symbol, bracket, size, time):
+        return await _blocking(self._submit, tag, symbol, bracket)
+
+
+class LiveEngine:
+    """
+    Runs strategies on live (or replayed) bars and routes their orders to a broker.
+
+    :param feed: A BarFeed.
+    :param broker: A Broker.
+    :param stake: Units per order, as the backtests' FixedSize sizer.
+    :param loglevel: 'debug', 'info', 'warning' or 'silent' (default: $NAMI_LOG_LEVEL or 'info').
+    """
+
+    def __init__(self, feed, broker, stake=10000, loglevel=None):
+        self.feed = feed
+        self.broker = broker
+        self.stake = stake
+        self.loglevel = toLevel(loglevel if loglevel is not None else os.environ.get('NAMI_LOG_LEVEL', 'info'))
+        self.tags = {}      # tag -> (strategy name, symbol)
+        self._runners = {}  # symbol -> [(tag, signals)]
+        self.bars = 0
+        self.latency = {}   # symbol -> LatencyHistogram of bar-to-decision seconds
+
+    @property
+    def symbols(self):
+        return list(self._runners)
+
+    def add(self, strategy, symbol, params=None):
+        """
+        Trade a strategy (class or class name) on a symbol.
+        """
+        name = strategy if isinstance(strategy, str) else strategy.__name__
+        tag = f'{name}@{symbol}'
+        if tag in self.tags:
+            raise ValueError(f"{name} already trades {symbol}")
+        self._runners.setdefault(symbol, []).append((tag, signalsFor(name, params)))
+        self.latency.setdefault(symbol, LatencyHistogram())
+        self.tags[tag] = (name, symbol)
+        return tag
+
+    def totalLatency(self):
+        """
+        Bar-to-decision latency over all symbols.
+        """
+        total = LatencyHistogram()
+        for histogram in self.latency.values():
+            total.merge(histogram)
+        return total
+
+    def latencyReport(self):
+        """
+        Latency summary per symbol and overall, in microseconds, as a DataFrame.
+        """
+        rows = {symbol: histogram.summary() for symbol, histogram in self.latency.items()}
+        rows['All'] = self.totalLatency().summary()
+        report = pd.DataFrame.from_dict(rows, orient='index')
+        report[report.columns.drop('count')] *= 1e6
+        return report
+
+    def addRanked(self, ranked, top=None):
+        """
+        Trade the best pairs of a ranking, a DataFrame with Strategy and Symbol columns, best first.
+
+        Strategies without a live implementation are skipped.
+        """
+        added = []
+        for name, symbol in zip(ranked['Strategy'], ranked['Symbol']):
+            if top is not None and len(added) >= top:
+                break
+            try:
+                added.append(self.add(name, symbol))
+            except ValueError as error:
+                self.log('Skipping %s on %s: %s', name, symbol, error, level=WARNING)
+        return added
+
+    def log(self, txt, *args, level=INFO, dt=None):
+        if level < self.loglevel:
+            return
+        if args:
+            txt = txt % args
+        print(f'{dt.isoformat() if dt is not None else "-"}, {txt}')
+
+    async def warmUp(self, count):
+        """
+        Advance every strategy's indicators over the last `count` closed bars, without trading.
+        """
+        for symbol, runners in self._runners.items():
+            for bar in await self.feed.history(symbol, count):
+                for _, signals in runners:
+                    signals.update(bar)
+
+    async def onBar(self, symbol, bar, arrived=None):
+        await self.broker.onBar(symbol, bar)
+        for tag, signals in self._runners.get(symbol, ()):
+            bracket = signals.update(bar)
+            if bracket is None or not await self.broker.isFlat(tag, symbol):
+                continue
+            accepted = await self.broker.submit(tag, symbol, bracket, self.stake, bar.time)
+            self.log('%s %s %s: entry %.5f, SL %.5f, TP %.5f', tag, 'BUY' if bracket.side == 1 else 'SELL',
+                     'placed' if accepted else 'rejected', bracket.entry, bracket.stop, bracket.target,
+                     level=DEBUG if accepted else WARNING, dt=bar.time)
+        self.bars += 1
+        if arrived is not None:
+            self.latency[symbol].record(time.perf_counter() - arrived)
+
+    async def run(self, warmup=0):
+        """
+        Trade until the feed ends (or forever for a live feed).
+
+        :param warmup: Closed bars of history to run the indicators over first.
+        """
+        if warmup:
+            await self.warmUp(warmup)
+        self.log('Trading %d strategies on %d symbols', len(self.tags), len(self._runners))
+        try:
+            async for symbol, bar, arrived in self.feed.stream(self.symbols):
+                await self.onBar(symbol, bar, arrived)
+        finally:
+            await self.broker.close()
+
+
+def runReplay(pairs, bars, starting_balance=100000, stake=10000, loglevel='silent', speed=None):
+    """
+    Replay stored bars through the live engine with a simulated broker.
+
+    :param pairs: (strategy, symbol) pairs to trade; strategies as classes or class names.
+    :param bars: Dict of symbol -> DataFrame of bars or Data handle.
+    :param speed: Replay speed (1 is real time), or None for full speed.
+    :return: The SimulatedBroker's summary, one row per pair.
+    """
+    broker = SimulatedBroker(starting_balance)
+    engine = LiveEngine(ReplayFeed(bars, speed), broker, stake, loglevel)
+    for strategy, symbol in pairs:
+        engine.add(strategy, symbol)
+    asyncio.run(engine.run())
+    return broker.summary(engine.tags)
+
+
+def runLive(ranked=None, top=5, timeframe=tf.TIMEFRAME_M1, volume=0.1, warmup=500):
+    """
+    Trade the top ranked strategies on MetaTrader 5 until interrupted.
+
+    :param ranked: Ranked DataFrame with Strategy and Symbol columns (default: the ranking of backtest_results.csv).
+    """
+    if ranked is None:
+        from Ranking.ranking import readCsvToDf, rankStrategies
+        ranked = rankStrategies(readCsvToDf())
+    engine = LiveEngine(PollingFeed(timeframe), MT5Broker(volume))
+    engine.addRanked(ranked, top)
+    try:
+        asyncio.run(engine.run(warmup))
+    except KeyboardInterrupt:
+        print("Live trading stopped.")
@@ -1,10 +1,21 @@
 import sys
 import os
+import heapq
+import itertools
+import numpy as np
 import pandas as pd
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from BackTesting import backtest
+from Ranking.robustness import addRobustness
+
+# Weights of the Z-scored metrics in a strategy's score
+Z_WEIGHTS = {'Final Balance': 0.40, 'Sharpe Ratio': 0.20, 'SQN': 0.10}
+# Weight of the (negated) max drawdown, which is scored as is
+DRAWDOWN_WEIGHT = 0.30
+# Weight of the (negated) bootstrap probability of ruin, scored as is when a table has it
+RUIN_WEIGHT = 1.0
+# Bootstrap lower bounds (see Ranking.robustness) that stand in for the point estimates when a table has them
+ROBUST_COLUMNS = {'Final Balance': 'Final Balance Low', 'SQN': 'SQN Low'}
 
-# Create an instance of BackTester
 
 def convertDfToCsv(df, filename="backtest_results.csv"):
     """
@@ -45,7 +56,8 @@ def rankStrategies(df):
     """
     Filters and ranks strategies based on performance metrics.
     
-    :param df: The DataFrame containing strategy performance data.
+    :param df: The DataFrame containing strategy performance data. With the bootstrap columns of
+               Ranking.robustness.addRobustness, their lower bounds and probability of ruin are scored.
     :param min_score: The minimum score required to allow trades.
     :return: A ranked DataFrame with the best strategies.
     """
@@ -54,20 +66,27 @@ def rankStrategies(df):
     
     # Filter out strategies with negative Sharpe Ratio
     df = df[df['Sharpe Ratio'] > 0]
+
+    # Bootstrapped results are scored on their lower confidence bounds, not on one lucky run
+    robust = 'Ruin Probability' in df.columns
+    balance = ROBUST_COLUMNS['Final Balance'] if robust else 'Final Balance'
+    sqn = ROBUST_COLUMNS['SQN'] if robust else 'SQN'
     
     # Standardize key metrics using Z-score normalization
-    df['Final Balance Z'] = (df['Final Balance'] - df['Final Balance'].mean()) / df['Final Balance'].std()
+    df['Final Balance Z'] = (df[balance] - df[balance].mean()) / df[balance].std()
     df['Sharpe Ratio Z'] = (df['Sharpe Ratio'] - df['Sharpe Ratio'].mean()) / df['Sharpe Ratio'].std()
-    df['SQN Z'] = (df['SQN'] - df['SQN'].mean()) / df['SQN'].std()
+    df['SQN Z'] = (df[sqn] - df[sqn].mean()) / df[sqn].std()
     df['Max Drawdown Adj'] = -df['Max Drawdown']  # Lower drawdown is better, so we negate it
     
     # Calculate weighted score
     df['Score'] = (
-        0.40 * df['Final Balance Z'] +
-        0.20 * df['Sharpe Ratio Z'] +
-        0.10 * df['SQN Z'] +
-        0.30 * df['Max Drawdown Adj']
+        Z_WEIGHTS['Final Balance'] * df['Final Balance Z'] +
+        Z_WEIGHTS['Sharpe Ratio'] * df['Sharpe Ratio Z'] +
+        Z_WEIGHTS['SQN'] * df['SQN Z'] +
+        DRAWDOWN_WEIGHT * df['Max Drawdown Adj']
     )
+    if robust:
+        df['Score'] -= RUIN_WEIGHT * df['Ruin Probability']
     
     # Round values to two decimal places
     df = df.round({'Score': 2, 'Final Balance Z': 2, 'Sharpe Ratio Z': 2, 'SQN Z': 2, 'Max Drawdown Adj': 2})
@@ -78,7 +97,211 @@ def rankStrategies(df):
     print(df[['Strategy', 'Symbol', 'Score']])
     return df
 
-# Example usage
-df = readCsvToDf()
-if df is not None:
-    ranked_df = rankStrategies(df)
+
+class RunningStats:
+    """
+    Running mean and sample variance of several metrics (Welford's algorithm).
+
+    Values can also be removed again, so a result that is replaced by a re-run stops counting.
+    """
+
+    def __init__(self, width):
+        self.count = 0
+        self.mean = np.zeros(width)
+        self.m2 = np.zeros(width)
+
+    def add(self, values):
+        self.count += 1
+        delta = values - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (values - self.mean)
+
+    def remove(self, values):
+        if self.count <= 1:
+            self.__init__(len(self.mean))
+            return
+        previous = (self.count * self.mean - values) / (self.count - 1)
+        self.m2 -= (values - previous) * (values - self.mean)
+        self.count -= 1
+        self.mean = previous
+
+    def std(self):
+        """
+        Sample standard deviation (ddof=1, as pandas), NaN with fewer than two values.
+        """
+        if self.count < 2:
+            return np.full(len(self.mean), np.nan)
+        return np.sqrt(np.maximum(self.m2, 0.0) / (self.count - 1))
+
+
+class StreamingRanking:
+    """
+    Leaderboard of backtest results that is kept current as results arrive.
+
+    Rows are filtered and scored like rankStrategies: Z-scores of Final Balance,
+    Sharpe Ratio and SQN over the accepted rows, plus the negated Max Drawdown.
+    With robust=True rows are scored like rankStrategies scores bootstrapped
+    results: on their lower confidence bounds and probability of ruin.
+    The means and deviations are kept with Welford updates, so a new row costs
+    O(1) for the statistics and O(log top) to enter the top-K heap, and files are
+    never re-read.
+
+    Because a Z-score moves with every row, the heap ranks rows with the metric
+    weights (Z weight / deviation) as they were when it was last rebuilt. When a
+    weight has since drifted by more than `tolerance` (relative), all rows are
+    re-scored in one vectorized pass and the heap is rebuilt. The deviations
+    settle as results accumulate, so rebuilds become rare; tolerance=0
+    rebuilds on every change and ranks exactly as rankStrategies.
+
+    :param top: Number of pairs on the leaderboard.
+    :param tolerance: Relative drift of the weights that triggers a rebuild.
+    :param keys: Columns identifying a pair; a new row for a known pair replaces its old result.
+    :param robust: Score the bootstrap columns of Ranking.robustness; rows arriving with a
+                   'Trade PnL' column instead are bootstrapped as they come in.
+    """
+
+    def __init__(self, top=10, tolerance=0.01, keys=('Strategy', 'Symbol'), robust=False):
+        self.top = top
+        self.tolerance = tolerance
+        self.keys = tuple(keys)
+        self.robust = robust
+        # Scored columns: the Z-scored ones first, then those weighted as they are
+        self.columns = [ROBUST_COLUMNS.get(col, col) if robust else col for col in Z_WEIGHTS] + ['Max Drawdown']
+        self._fixedWeights = [-DRAWDOWN_WEIGHT]
+        if robust:
+            self.columns.append('Ruin Probability')
+            self._fixedWeights.append(-RUIN_WEIGHT)
+        self.stats = RunningStats(len(Z_WEIGHTS))
+        self.rebuilds = 0
+        self._rows = {}           # key -> row dict
+        self._slots = {}          # key -> row of self._values
+        self._freeSlots = []
+        self._values = np.empty((64, len(self.columns)))
+        self._heap = []           # (score, sequence, key) of the top rows, worst first
+        self._inHeap = set()
+        self._sequence = itertools.count()
+        self._weights = None      # weights the heap was built with
+
+    def __len__(self):
+        return len(self._rows)
+
+    def weights(self):
+        """
+        Current per-metric score weights; Z-scored metrics without a defined deviation weigh 0.
+        """
+        std = self.stats.std()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            scaled = np.array(list(Z_WEIGHTS.values())) / std
+        scaled[~np.isfinite(scaled)] = 0.0
+        return np.append(scaled, self._fixedWeights)
+
+    def scores(self, values):
+        """
+        Current scores of metric rows (in `columns` order), as rankStrategies would compute them.
+        """
+        weights = self.weights()
+        offset = weights[:len(Z_WEIGHTS)] @ self.stats.mean
+        return values @ weights - offset
+
+    def update(self, rows):
+        """
+        Add results: a DataFrame (e.g. a sweep job's result) or an iterable of row dicts.
+
+        :return: self, so a leaderboard can be read right after.
+        """
+        if self.robust and isinstance(rows, pd.DataFrame) and 'Trade PnL' in rows.columns:
+            rows = addRobustness(rows)
+        records = rows.to_dict('records') if isinstance(rows, pd.DataFrame) else rows
+        for row in records:
+            self.add(row)
+        return self
+
+    def add(self, row):
+        """
+        Add one result row; rows that did not trade or have no positive Sharpe Ratio are left out.
+        """
+        key = tuple(row[col] for col in self.keys)
+        accepted = row.get('Trades Taken', 0) > 0 and row.get('Sharpe Ratio') is not None and row['Sharpe Ratio'] > 0
+        if key in self._rows:
+            self._discard(key)
+            if key in self._inHeap:
+                # Its heap entry is stale; rebuild once the new row is in
+                self._weights = None
+        if not accepted:
+            if self._weights is None or self._drifted(self.weights()):
+                self._rebuild()
+            return
+
+        values = np.array([float(row[col]) for col in self.columns])
+        slot = self._freeSlots.pop() if self._freeSlots else len(self._slots)
+        if slot >= len(self._values):
+            self._values = np.concatenate([self._values, np.empty_like(self._values)])
+        self._values[slot] = values
+        self._slots[key] = slot
+        self._rows[key] = dict(row)
+        self.stats.add(values[:len(Z_WEIGHTS)])
+
+        weights = self.weights()
+        if self._weights is None or self._drifted(weights):
+            self._rebuild()
+            return
+        # Ranked with the heap's weights; the offset is the same for every row, so it is left out
+        entry = (float(values @ self._weights), next(self._sequence), key)
+        if len(self._heap) < self.top:
+            heapq.heappush(self._heap, entry)
+            self._inHeap.add(key)
+        elif entry > self._heap[0]:
+            self._inHeap.discard(heapq.heapreplace(self._heap, entry)[2])
+            self._inHeap.add(key)
+
+    def _discard(self, key):
+        row = self._rows.pop(key)
+        slot = self._slots.pop(key)
+        self._freeSlots.append(slot)
+        self.stats.remove(np.array([float(row[col]) for col in self.columns[:len(Z_WEIGHTS)]]))
+
+    def _drifted(self, weights):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            change = np.abs(weights - self._weights) / np.abs(self._weights)
+        return bool(np.any(np.where(self._weights == 0, weights != 0, change > self.tolerance)))
+
+    def _rebuild(self):
+        self.rebuilds += 1
+        self._weights = self.weights()
+        keys = list(self._slots)
+        if keys:
+            scores = self._values[[self._slots[key] for key in keys]] @ self._weights
+            best = heapq.nlargest(self.top, zip(scores.tolist(), keys))
+        else:
+            best = []
+        self._heap = [(score, next(self._sequence), key) for score, key in best]
+        heapq.heapify(self._heap)
+        self._inHeap = {key for _, _, key in self._heap}
+
+    def leaderboard(self):
+        """
+        The top pairs, best first, with their Z-scores and Score at the current statistics.
+
+        :return: DataFrame with the result columns plus Final Balance Z, Sharpe Ratio Z, SQN Z,
+                 Max Drawdown Adj and Score (rounded like rankStrategies).
+        """
+        keys = [key for _, _, key in self._heap]
+        if not keys:
+            return pd.DataFrame()
+        df = pd.DataFrame([self._rows[key] for key in keys])
+        values = self._values[[self._slots[key] for key in keys]]
+        std = self.stats.std()
+        for i, col in enumerate(Z_WEIGHTS):
+            df[f'{col} Z'] = (values[:, i] - self.stats.mean[i]) / std[i]
+        df['Max Drawdown Adj'] = -values[:, len(Z_WEIGHTS)]
+        df['Score'] = self.scores(values)
+        df = df.sort_values(by='Score', ascending=False).reset_index(drop=True)
+        return df.round({'Score': 2, 'Final Balance Z': 2, 'Sharpe Ratio Z': 2, 'SQN Z': 2, 'Max Drawdown Adj': 2})
+
+
+if __name__ == '__main__':
+    # Example usage
+    df = readCsvToDf()
+    if df is not None:
+        ranked_df = rankStrategies(df)
+        print(StreamingRanking(top=5).update(df).leaderboard()[['Strategy', 'Symbol', 'Score']])
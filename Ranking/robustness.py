@@ -0,0 +1,160 @@
+"""
+Bootstrap robustness of backtest runs, from their closed trade PnLs.
+
+A run's final balance, SQN and drawdown are single point estimates: one
+lucky sequence of trades looks as good as a steady edge. Here each run's trades
+are resampled with replacement thousands of times and the resampled equity
+paths give confidence intervals and the probability of ruin.
+
+All runs are resampled together. Their PnLs are packed into a padded matrix
+(runs grouped by trade count so little padding is wasted) and every batch of
+resamples is one set of NumPy operations over (runs, resamples, trades); no
+Python code runs per run or per resample.
+"""
+import numpy as np
+import pandas as pd
+
+# Elements of the (runs, resamples, trades) arrays built per batch, bounds the memory of a batch
+BATCH_ELEMENTS = 4_000_000
+
+
+def packTrades(pnls):
+    """
+    Pack ragged per-run trade PnLs into a zero-padded matrix.
+
+    :return: (runs x longest run matrix, trade count of each run)
+    """
+    pnls = [np.asarray(pnl, dtype=np.float64).ravel() for pnl in pnls]
+    counts = np.array([len(pnl) for pnl in pnls], dtype=np.int64)
+    matrix = np.zeros((len(pnls), int(counts.max()) if len(pnls) else 0))
+    for row, pnl in enumerate(pnls):
+        matrix[row, :len(pnl)] = pnl
+    return matrix, counts
+
+
+def _groups(counts):
+    # Runs sorted by trade count, split where the count doubles, so a group is padded to at most twice its shortest run
+    order = np.argsort(counts, kind='stable')
+    groups, start = [], 0
+    for end in range(1, len(order) + 1):
+        if end == len(order) or counts[order[end]] > 2 * max(counts[order[start]], 1):
+            groups.append(order[start:end])
+            start = end
+    return groups
+
+
+def _resampleGroup(matrix, counts, samples, starting_balance, ruin_level, rng):
+    """
+    Statistics of `samples` resamples of each run in a group, as (runs x samples) arrays.
+
+    Resampled paths are float32: equity keeps about a cent of precision on a
+    100,000 account, with half the memory traffic of float64.
+    """
+    runs, width = matrix.shape
+    final = np.empty((runs, samples))
+    sqn = np.empty((runs, samples))
+    drawdown = np.empty((runs, samples))
+    ruined = np.empty((runs, samples), dtype=bool)
+    flat = matrix.astype(np.float32).ravel()
+    mask = (np.arange(width) < counts[:, None]).astype(np.float32)[:, None, :]     # (runs, 1, trades)
+    scale = counts.astype(np.float32)[:, None, None]
+    last = (counts - 1).astype(np.int32)[:, None, None]
+    offsets = (np.arange(runs, dtype=np.int32) * width)[:, None, None]
+    n = counts[:, None].astype(np.float64)
+    floor = starting_balance * (1.0 - ruin_level)
+    batch = max(1, BATCH_ELEMENTS // max(runs * width, 1))
+
+    for start in range(0, samples, batch):
+        size = min(batch, samples - start)
+        # Trade indices drawn uniformly from each run's own trades; padding positions are zeroed by the mask
+        draws = rng.random((runs, size, width), dtype=np.float32)
+        idx = np.multiply(draws, scale, out=draws).astype(np.int32)
+        np.minimum(idx, last, out=idx)  # float32 rounding can reach the count itself
+        idx += offsets
+        drawn = flat.take(idx)
+        drawn *= mask
+
+        total = drawn.sum(axis=2, dtype=np.float64)
+        mean = total / n
+        variance = np.maximum(np.einsum('ijk,ijk->ij', drawn, drawn, dtype=np.float64) / n - mean * mean, 0.0)
+        deviation = np.sqrt(variance)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            run_sqn = np.where(deviation > 0, np.sqrt(n) * mean / deviation, 0.0)
+
+        # PnL so far and its running peak (never below the start), both relative to the starting balance
+        path = np.cumsum(drawn, axis=2, out=drawn)
+        peaks = np.maximum.accumulate(path, axis=2)
+        np.maximum(peaks, 0.0, out=peaks)
+        lowest = path.min(axis=2)
+        path += starting_balance
+        peaks += starting_balance
+        # Drawdown from the peak in percent, 100 * (1 - equity / peak)
+        worst = np.divide(path, peaks, out=peaks).min(axis=2)
+
+        window = slice(start, start + size)
+        final[:, window] = starting_balance + total
+        sqn[:, window] = np.where(counts[:, None] >= 2, run_sqn, 0.0)
+        drawdown[:, window] = 100.0 * (1.0 - worst)
+        ruined[:, window] = starting_balance + lowest <= floor
+    return final, sqn, drawdown, ruined
+
+
+def bootstrap(pnls, starting_balance=100000, samples=2000, confidence=0.90, ruin_level=0.5, seed=None):
+    """
+    Bootstrap every run's trades and summarise the resampled outcomes.
+
+    :param pnls: One sequence of closed trade PnLs per run.
+    :param starting_balance: Account value before the first trade.
+    :param samples: Resamples per run.
+    :param confidence: Width of the confidence intervals (0.90: 5th to 95th percentile).
+    :param ruin_level: Fraction of the starting balance whose loss at any point counts as ruin.
+    :param seed: Seed of the random generator, for repeatable results.
+    :return: DataFrame with one row per run: Bootstrap Trades, Final Balance Low/Median/High,
+             SQN Low/High, Max Drawdown Median/High (in percent), Loss Probability and Ruin Probability.
+             Runs without trades get NaN intervals and zero probabilities.
+    """
+    matrix, counts = packTrades(pnls)
+    rng = np.random.default_rng(seed)
+    tail = (1.0 - confidence) / 2.0
+    quantiles = [tail, 0.5, 1.0 - tail]
+
+    columns = ['Final Balance Low', 'Final Balance Median', 'Final Balance High', 'SQN Low', 'SQN High',
+               'Max Drawdown Median', 'Max Drawdown High', 'Loss Probability', 'Ruin Probability']
+    out = pd.DataFrame(np.nan, index=range(len(counts)), columns=columns)
+    out.insert(0, 'Bootstrap Trades', counts)
+    out[['Loss Probability', 'Ruin Probability']] = 0.0
+
+    for group in _groups(counts):
+        group = group[counts[group] > 0]
+        if len(group) == 0:
+            continue
+        width = int(counts[group].max())
+        final, sqn, drawdown, ruined = _resampleGroup(matrix[group, :width], counts[group], samples,
+                                                      starting_balance, ruin_level, rng)
+        balance = np.quantile(final, quantiles, axis=1)
+        out.loc[group, ['Final Balance Low', 'Final Balance Median', 'Final Balance High']] = balance.T
+        out.loc[group, ['SQN Low', 'SQN High']] = np.quantile(sqn, [tail, 1.0 - tail], axis=1).T
+        out.loc[group, ['Max Drawdown Median', 'Max Drawdown High']] = np.quantile(drawdown, [0.5, 1.0 - tail], axis=1).T
+        out.loc[group, 'Loss Probability'] = (final < starting_balance).mean(axis=1)
+        out.loc[group, 'Ruin Probability'] = ruined.mean(axis=1)
+    return out
+
+
+def addRobustness(df, pnl_column='Trade PnL', **kwargs):
+    """
+    Add bootstrap columns to a results table whose rows carry their trade PnLs.
+
+    :param df: Results, e.g. of runSweep(..., keepTrades=True), with one PnL sequence per row in `pnl_column`.
+    :param kwargs: Passed to bootstrap; starting_balance defaults to each table's Starting Balance.
+    :return: A copy of `df` without the trade columns and with the bootstrap columns, ready for rankStrategies.
+    """
+    if 'starting_balance' not in kwargs and 'Starting Balance' in df.columns and len(df):
+        balances = df['Starting Balance'].unique()
+        if len(balances) > 1:
+            raise ValueError("Runs with different starting balances need separate bootstraps")
+        kwargs['starting_balance'] = float(balances[0])
+    pnls = [pnl if isinstance(pnl, (list, tuple, np.ndarray)) else [] for pnl in df[pnl_column]]
+    stats = bootstrap(pnls, **kwargs)
+    stats.index = df.index
+    trade_columns = [col for col in (pnl_column, 'Trade Entry') if col in df.columns]
+    return pd.concat([df.drop(columns=trade_columns), stats], axis=1)
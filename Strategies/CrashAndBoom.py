@@ -1,18 +1,17 @@
 import os
 import sys
+
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from Data import dataLoader as dl
-import pandas as pd
-import backtrader as bt
-import MetaTrader5 as mt5
+from Indicators import fastIndicators as fi
+from Strategies.namiStrategy import NamiStrategy
 
-class CrashBoomStrategy(bt.Strategy):
+class CrashBoomStrategy(NamiStrategy):
     params = (
         ('name', 'CrashBoomStrategy'),
-        ('printlog', True),
         ('bollinger_period', 20),  
         ('devfactor', 2),          
         ('ema_trend_period', 100), 
+        ('trend_timeframe', None),  # e.g. tf.TIMEFRAME_H1: trend EMA on real higher-timeframe bars
         ('ema_signal_period', 20),  
         ('atr_period', 7),        
         ('atr_mult', 1.5),         
@@ -22,57 +21,25 @@ class CrashBoomStrategy(bt.Strategy):
         ('lots', 0.01),            
     )
 
-    def log(self, txt, dt=None, doprint=False):
-        ''' Logging function for this strategy '''
-        if self.params.printlog or doprint:
-            dt = dt or self.datas[0].datetime.date(0)
-            print('%s, %s' % (dt.isoformat(), txt))
-
     def __init__(self):
         self.dataclose = self.datas[0].close
         self.order = None
-        self.trade_count = 0  
         self.entry_price = None  # Initialize entry_price
         self.trailing_stop = None  
 
         # Higher timeframe indicators (Trend)
-        self.ema400 = bt.indicators.EMA(period=self.params.ema_trend_period)
-        self.bollinger = bt.indicators.BollingerBands(period=self.params.bollinger_period, devfactor=self.params.devfactor)
+        self.ema400 = fi.EMA(self.timeframeData(self.params.trend_timeframe), period=self.params.ema_trend_period)
+        self.bollinger = fi.BollingerBands(period=self.params.bollinger_period, devfactor=self.params.devfactor)
 
         # Lower timeframe indicators (Entry)
-        self.ema5 = bt.indicators.EMA(period=self.params.ema_signal_period)
-        self.atr = bt.indicators.ATR(period=self.params.atr_period)
-
-    def stop(self):
-        """Print strategy summary when backtest ends."""
-        self.log("=" * 50, doprint=True)
-        self.log(" STRATEGY SUMMARY ", doprint=True)
-        self.log("=" * 50, doprint=True)
-        self.log(f"Final Account Value : {self.broker.get_cash():,.2f}", doprint=True)
-        self.log(f"Total Trades Executed: {self.trade_count}", doprint=True)
-        self.log("-" * 50, doprint=True)
-        self.log(" Strategy Parameters ", doprint=True)
-        self.log("-" * 50, doprint=True)
-
-        for param in self.params._getkeys():
-            self.log(f"{param.replace('_', ' ').title():<20}: {getattr(self.params, param)}", doprint=True)
-
-        self.log("=" * 50, doprint=True)
+        self.ema5 = fi.EMA(period=self.params.ema_signal_period)
+        self.atr = fi.ATR(period=self.params.atr_period)
 
     def notify_order(self, order):
         """Handle order execution updates."""
-        if order.status in [order.Submitted, order.Accepted]:
-            return
         if order.status in [order.Completed]:
-            if order.isbuy():
-                self.log(f'BUY EXECUTED, Price: {order.executed.price:.5f}')
-                self.entry_price = order.executed.price  # Store entry price on buy execution
-            elif order.issell():
-                self.log(f'SELL EXECUTED, Price: {order.executed.price:.5f}')
-                self.entry_price = order.executed.price  # Store entry price on sell execution
-        elif order.status in [order.Canceled, order.Margin, order.Rejected]:
-            self.log('Order Canceled/Margin/Rejected')
-        self.order = None
+            self.entry_price = order.executed.price  # Store entry price on execution
+        super().notify_order(order)
 
     def next(self):
         """Define trade logic on each new candle."""
@@ -105,7 +72,7 @@ class CrashBoomStrategy(bt.Strategy):
                 )
                 self.trade_count += 1
                 self.trailing_stop = stop_loss  # Set initial SL
-                self.log(f'Trade {self.trade_count}: BUY at {price}, SL: {stop_loss}, TP: {take_profit}')
+                self.debug('Trade %d: BUY at %s, SL: %s, TP: %s', self.trade_count, price, stop_loss, take_profit)
 
             elif trend == "DOWN_TREND" and self.ema5[-1] > mid_band and self.ema5[0] < mid_band:
                 stop_loss = upper_band + (self.params.atr_mult * atr_value)
@@ -117,7 +84,7 @@ class CrashBoomStrategy(bt.Strategy):
                 )
                 self.trade_count += 1
                 self.trailing_stop = stop_loss  # Set initial SL
-                self.log(f'Trade {self.trade_count}: SELL at {price}, SL: {stop_loss}, TP: {take_profit}')
+                self.debug('Trade %d: SELL at %s, SL: %s, TP: %s', self.trade_count, price, stop_loss, take_profit)
         
         # **Implement Trailing Stop**
         # elif self.position:
@@ -128,7 +95,7 @@ class CrashBoomStrategy(bt.Strategy):
         #             new_sl = max(new_sl, price - (self.params.trail_atr_mult * atr_value))  # Trail by ATR
         #             if new_sl > self.trailing_stop:  # Only update if it's moving in favor
         #                 self.trailing_stop = new_sl
-        #                 self.log(f'Trailing SL moved to {new_sl:.5f}')
+        #                 self.debug('Trailing SL moved to %.5f', new_sl)
         #                 self.sell(exectype=bt.Order.Stop, price=self.trailing_stop)  
 
         #     elif self.position.size < 0:  # Short Position
@@ -138,5 +105,5 @@ class CrashBoomStrategy(bt.Strategy):
         #             new_sl = min(new_sl, price + (self.params.trail_atr_mult * atr_value))  
         #             if new_sl < self.trailing_stop:  
         #                 self.trailing_stop = new_sl
-        #                 self.log(f'Trailing SL moved to {new_sl:.5f}')
+        #                 self.debug('Trailing SL moved to %.5f', new_sl)
         #                 self.buy(exectype=bt.Order.Stop, price=self.trailing_stop)  
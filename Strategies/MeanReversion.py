@@ -1,16 +1,14 @@
 import os
 import sys
+
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from Data import dataLoader as dl
-import pandas as pd
-import backtrader as bt
-import MetaTrader5 as mt5
+from Indicators import fastIndicators as fi
+from Strategies.namiStrategy import NamiStrategy
 
 
-class MeanReversionStrategy(bt.Strategy):
+class MeanReversionStrategy(NamiStrategy):
     params = (
         ('name', 'MeanReversionStrategy'),
-        ('printlog', False),
         ('bollinger_period', 20),  # Bollinger Bands period
         ('devfactor', 2),          # Standard deviation factor
         ('atr_period', 14),        # ATR period
@@ -18,49 +16,11 @@ class MeanReversionStrategy(bt.Strategy):
         ('profit_mult', 2),      # Profit target multiplier
     )
 
-    def log(self, txt, dt=None, doprint=False):
-        ''' Logging function for this strategy '''
-        if self.params.printlog or doprint:
-            dt = dt or self.datas[0].datetime.date(0)
-            print('%s, %s' % (dt.isoformat(), txt))
-
     def __init__(self):
         self.dataclose = self.datas[0].close
         self.order = None
-        self.bollinger = bt.indicators.BollingerBands(period=self.params.bollinger_period, devfactor=self.params.devfactor)
-        self.atr = bt.indicators.ATR(period=self.params.atr_period)
-        self.trade_count = 0  # Initialize trade counter
-
-    def stop(self):
-        self.log("=" * 50, doprint=True)
-        self.log(" STRATEGY SUMMARY ", doprint=True)
-        self.log("=" * 50, doprint=True)
-        
-        self.log(f"Final Account Value : {self.broker.get_cash():,.2f}", doprint=True)
-        self.log(f"Total Trades Executed: {self.trade_count}", doprint=True)
-        
-        self.log("-" * 50, doprint=True)
-        self.log(" Strategy Parameters ", doprint=True)
-        self.log("-" * 50, doprint=True)
-
-        for param in self.params._getkeys():
-            self.log(f"{param.replace('_', ' ').title():<20}: {getattr(self.params, param)}", doprint=True)
-
-        self.log("=" * 50, doprint=True)
-
-
-
-    def notify_order(self, order):
-        if order.status in [order.Submitted, order.Accepted]:
-            return
-        if order.status in [order.Completed]:
-            if order.isbuy():
-                self.log(f'BUY EXECUTED, Price: {order.executed.price:.5f}')
-            elif order.issell():
-                self.log(f'SELL EXECUTED, Price: {order.executed.price:.5f}')
-        elif order.status in [order.Canceled, order.Margin, order.Rejected]:
-            self.log('Order Canceled/Margin/Rejected')
-        self.order = None
+        self.bollinger = fi.BollingerBands(period=self.params.bollinger_period, devfactor=self.params.devfactor)
+        self.atr = fi.ATR(period=self.params.atr_period)
 
     def next(self):
 
@@ -86,7 +46,7 @@ class MeanReversionStrategy(bt.Strategy):
                     limitprice=take_profit  # Take-profit
                 )
                 self.trade_count += 1
-                self.log(f'BUY ORDER PLACED: Entry={close:.5f}, SL={stop_loss:.5f}, TP={take_profit:.5f}')
+                self.debug('BUY ORDER PLACED: Entry=%.5f, SL=%.5f, TP=%.5f', close, stop_loss, take_profit)
 
             elif close > upper_band:  # Sell Signal
                 stop_loss = close + (self.params.atr_mult * atr_value)
@@ -98,4 +58,4 @@ class MeanReversionStrategy(bt.Strategy):
                     limitprice=take_profit  # Take-profit
                 )
                 self.trade_count += 1
-                self.log(f'SELL ORDER PLACED: Entry={close:.5f}, SL={stop_loss:.5f}, TP={take_profit:.5f}')
\ No newline at end of file
+                self.debug('SELL ORDER PLACED: Entry=%.5f, SL=%.5f, TP=%.5f', close, stop_loss, take_profit)
\ No newline at end of file
@@ -1,8 +1,14 @@
-import backtrader as bt
+import os
+import sys
 
-class TrendFollowingStrategy(bt.Strategy):
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from Indicators import fastIndicators as fi
+from Strategies.namiStrategy import NamiStrategy
+
+class TrendFollowingStrategy(NamiStrategy):
     params = (
         ('ema_period', 80),     # Approximate 1-hour EMA for trend detection
+        ('ema_timeframe', None),  # e.g. tf.TIMEFRAME_H1 to compute the trend EMA on real H1 bars
         ('stoch_k', 14),        # Stochastic K period
         ('stoch_d', 3),         # Stochastic D period
         ('stoch_smooth', 3),    # Smoothing factor for stochastic
@@ -12,22 +18,11 @@ class TrendFollowingStrategy(bt.Strategy):
     )
 
     def __init__(self):
-        self.ema = bt.indicators.EMA(period=self.params.ema_period)
-        self.stoch = bt.indicators.Stochastic(
+        self.ema = fi.EMA(self.timeframeData(self.params.ema_timeframe), period=self.params.ema_period)
+        self.stoch = fi.Stochastic(
             period=self.params.stoch_k, period_dfast=self.params.stoch_d, period_dslow=self.params.stoch_smooth
         )
-        self.atr = bt.indicators.ATR(period=self.params.atr_period)
-        self.order = None
-        self.trade_count = 0
-
-    def notify_order(self, order):
-        if order.status in [order.Completed]:
-            if order.isbuy():
-                self.log(f'BUY EXECUTED, Price: {order.executed.price:.5f}')
-            elif order.issell():
-                self.log(f'SELL EXECUTED, Price: {order.executed.price:.5f}')
-        elif order.status in [order.Canceled, order.Margin, order.Rejected]:
-            self.log('Order Canceled/Margin/Rejected')
+        self.atr = fi.ATR(period=self.params.atr_period)
         self.order = None
 
     def next(self):
@@ -52,12 +47,3 @@ class TrendFollowingStrategy(bt.Strategy):
             take_profit = price - (self.params.atr_mult_tp * atr_value)
             self.order = self.sell_bracket(stopprice=stop_loss, limitprice=take_profit)
             self.trade_count += 1
-    
-    def log(self, txt, dt=None, doprint=False):
-        if doprint:
-            dt = dt or self.datas[0].datetime.date(0)
-            print(f'{dt.isoformat()}, {txt}')
-    
-    def stop(self):
-        self.log(f'Final Account Value: {self.broker.get_cash():,.2f}', doprint=True)
-        self.log(f'Total Trades Executed: {self.trade_count}', doprint=True)
@@ -1,82 +1,89 @@
-import backtrader as bt
-import sys
 import os
-import datetime
-import MetaTrader5 as mt5
+import sys
+from collections import deque
+
+import numpy as np
+
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from Data import dataLoader as dl
+from Indicators import arrayIndicators as ai
+from Indicators import fastIndicators as fi
+from Strategies.namiStrategy import NamiStrategy
 
-class SwingFailurePattern(bt.Indicator):
+
+class SwingFailurePattern(fi.VectorIndicator):
     params = (('lookback', 10),)  # Number of bars to check for swing points
 
     lines = ('sfp_signal', 'swing_high', 'swing_low')  # Indicator lines
+    cacheName = 'sfp'
 
     def __init__(self):
+        super().__init__()
         self.addminperiod(self.p.lookback + 1)  # Ensure enough data
+        # Monotonic deques of (bar, value) over the previous lookback - 1 bars:
+        # highs decreasing and lows increasing, so the front is the window max/min
+        self._highs = deque()
+        self._lows = deque()
+        self._bar = 0
+
+    def _push(self):
+        # Add the current bar to the windows used by the next bar
+        high, low = self.data.high[0], self.data.low[0]
+        while self._highs and self._highs[-1][1] <= high:
+            self._highs.pop()
+        self._highs.append((self._bar, high))
+        while self._lows and self._lows[-1][1] >= low:
+            self._lows.pop()
+        self._lows.append((self._bar, low))
+        self._bar += 1
+
+        oldest = self._bar - self.p.lookback + 1
+        while self._highs and self._highs[0][0] < oldest:
+            self._highs.popleft()
+        while self._lows and self._lows[0][0] < oldest:
+            self._lows.popleft()
+
+    def prenext(self):
+        self._push()
 
     def next(self):
-        lookback = self.p.lookback
-        high_window = self.data.high.get(size=lookback)
-        low_window = self.data.low.get(size=lookback)
-
-        if len(high_window) < lookback:
-            return  # Not enough data
+        swing_high = self._highs[0][1]  # Highest high of the previous lookback - 1 bars
+        swing_low = self._lows[0][1]  # Lowest low of the previous lookback - 1 bars
+        high, low, close = self.data.high[0], self.data.low[0], self.data.close[0]
 
-        # Identify Swing High
-        if self.data.high[0] < max(high_window[:-1]):
-            self.lines.swing_high[0] = max(high_window[:-1])
-        else:
-            self.lines.swing_high[0] = float('nan')
-
-        # Identify Swing Low
-        if self.data.low[0] > min(low_window[:-1]):
-            self.lines.swing_low[0] = min(low_window[:-1])
-        else:
-            self.lines.swing_low[0] = float('nan')
+        # Identify Swing High / Swing Low
+        self.lines.swing_high[0] = swing_high if high < swing_high else float('nan')
+        self.lines.swing_low[0] = swing_low if low > swing_low else float('nan')
 
         # Detect Bearish Swing Failure (New high but closes below previous swing high)
-        if self.data.high[0] > max(high_window[:-1]) and self.data.close[0] < max(high_window[:-1]):
+        if high > swing_high and close < swing_high:
             self.lines.sfp_signal[0] = 1  # Bearish SFP Signal
         # Detect Bullish Swing Failure (New low but closes above previous swing low)
-        elif self.data.low[0] < min(low_window[:-1]) and self.data.close[0] > min(low_window[:-1]):
+        elif low < swing_low and close > swing_low:
             self.lines.sfp_signal[0] = -1  # Bullish SFP Signal
         else:
             self.lines.sfp_signal[0] = 0  # No Signal
 
-class SFPStrategy(bt.Strategy):
+        self._push()
+
+    def compute(self, first, end):
+        # Whole series at once (runonce mode), in a few NumPy passes
+        high = np.frombuffer(self.data.high.array, dtype=np.float64, count=end)[first:]
+        low = np.frombuffer(self.data.low.array, dtype=np.float64, count=end)[first:]
+        close = np.frombuffer(self.data.close.array, dtype=np.float64, count=end)[first:]
+        return ai.swingFailure(high, low, close, self.p.lookback)
+
+
+class SFPStrategy(NamiStrategy):
     def __init__(self):
         self.sfp = SwingFailurePattern(self.data)
         self.order = None
-        self.trade_count = 0  
         self.dataclose = self.datas[0].close
 
         # Higher timeframe indicators (Trend)
-        self.ema200 = bt.indicators.EMA(period=200)
+        self.ema200 = fi.EMA(period=200)
         
         # Add ATR indicator (you can change the period if necessary)
-        self.atr = bt.indicators.ATR(self.data, period=14)  # ATR with a period of 14
-
-    def stop(self):
-        self.log(f'Final Value: {self.broker.get_cash():.2f}', doprint=True)
-        self.log(f'Trade Count: {self.trade_count}')
-
-    def log(self, txt, dt=None, doprint=True):
-        ''' Logging function for this strategy '''
-        if doprint:
-            dt = dt or self.datas[0].datetime.date(0)
-            print('%s, %s' % (dt.isoformat(), txt))
-
-    def notify_order(self, order):
-        if order.status in [order.Submitted, order.Accepted]:
-            return
-        if order.status in [order.Completed]:
-            if order.isbuy():
-                self.log(f'BUY EXECUTED, Price: {order.executed.price:.5f}')
-            elif order.issell():
-                self.log(f'SELL EXECUTED, Price: {order.executed.price:.5f}')
-        elif order.status in [order.Canceled, order.Margin, order.Rejected]:
-            self.log('Order Canceled/Margin/Rejected')
-        self.order = None
+        self.atr = fi.ATR(self.data, period=14)  # ATR with a period of 14
 
     def next(self):
         """Define trade logic on each new candle."""
@@ -0,0 +1,286 @@
+"""
+Base class of the Nami strategies.
+
+NamiStrategy keeps a journal of closed trades in a preallocated NumPy structured
+array and the account value at every bar, and computes the run's Sharpe ratio,
+drawdown, SQN and win rate from them in one pass at stop(). The outcome,
+`self.result`, is a small dict that is cheap to send back from optimizer workers
+and matches what Backtrader's SharpeRatio, DrawDown, SQN and TradeAnalyzer report.
+
+Strategies log through levelled calls with %-style arguments:
+
+    self.debug('BUY EXECUTED, Price: %.5f', order.executed.price)
+
+A message below the run's level returns before anything is formatted, so
+order-by-order logging costs one comparison in batch runs. Output goes to stdout,
+or with a log directory to one buffered file per run.
+
+The level and directory default to $NAMI_LOG_LEVEL ('debug', 'info', 'warning'
+or 'silent'; default 'info') and $NAMI_LOG_DIR. Batch and optimizer runs wrap
+their backtests in runLogging(), which is silent unless told otherwise.
+"""
+import os
+import sys
+import itertools
+from contextlib import contextmanager
+
+import backtrader as bt
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from BackTesting import metrics
+from BackTesting.storeFeed import storeFeed
+from Data import timeframes as tf
+from Data.barStore import BarStore
+from Data.resample import resample_frame
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+SILENT = 100
+
+LEVELS = {'debug': DEBUG, 'info': INFO, 'warning': WARNING, 'silent': SILENT}
+
+
+def toLevel(level):
+    """
+    Numeric level of a level name or number.
+    """
+    return LEVELS[level.lower()] if isinstance(level, str) else int(level)
+
+
+# Process-wide defaults for strategies that do not set the loglevel param
+_settings = {
+    'level': toLevel(os.environ.get('NAMI_LOG_LEVEL', 'info')),
+    'logdir': os.environ.get('NAMI_LOG_DIR') or None,
+}
+_runIds = itertools.count()
+
+JOURNAL_DTYPE = np.dtype([
+    ('entry_time', 'datetime64[s]'),
+    ('exit_time', 'datetime64[s]'),
+    ('entry_price', np.float64),
+    ('exit_price', np.float64),
+    ('side', np.int8),          # 1 long, -1 short
+    ('size', np.float64),
+    ('pnl', np.float64),
+    ('pnlcomm', np.float64),
+    ('bars_held', np.int64),
+])
+
+# Backtrader stores datetimes as proleptic Gregorian ordinals; this is 1970-01-01
+_EPOCH_ORDINAL = 719163.0
+
+
+def numToDatetime64(num):
+    """
+    Convert Backtrader date numbers (scalar or array) to datetime64[s].
+    """
+    seconds = np.round((np.asarray(num, dtype=np.float64) - _EPOCH_ORDINAL) * 86400.0)
+    return seconds.astype(np.int64).astype('datetime64[s]')
+
+
+def configure(level=None, logdir=None):
+    """
+    Set the default log level and/or log directory of strategies run by this process.
+    """
+    if level is not None:
+        _settings['level'] = toLevel(level)
+    if logdir is not None:
+        _settings['logdir'] = logdir or None
+
+
+def addTimeframeFeeds(cerebro, strategy, frame, params=None, timeframe=None):
+    """
+    Add the higher-timeframe feeds a strategy reads, resampled from its bars.
+
+    Call after adding `frame` (a DataFrame of bars or a BarStore) itself as the first data. Each feed is named after
+    its timeframe ('H1', 'H4', ...) and aligned so a bar is seen once it has closed.
+
+    :param timeframe: Timeframe of `frame` (default: inferred from its timestamps).
+    """
+    higher_timeframes = strategy.higherTimeframes(params) if issubclass(strategy, NamiStrategy) else ()
+    if higher_timeframes and isinstance(frame, BarStore):
+        frame = frame.frame()
+    for higher in higher_timeframes:
+        cerebro.adddata(storeFeed(resample_frame(frame, higher, timeframe)), name=tf.NAMES[higher])
+
+
+@contextmanager
+def runLogging(level=SILENT, logdir=None):
+    """
+    Log strategies run inside the block at `level`, to per-run files in `logdir` if given.
+    """
+    previous = dict(_settings)
+    _settings.update(level=toLevel(level), logdir=logdir)
+    try:
+        yield
+    finally:
+        _settings.update(previous)
+
+
+class NamiStrategy(bt.Strategy):
+    params = (
+        ('loglevel', None),  # None: the process default (see configure and runLogging)
+    )
+
+    # Until start() opens the run's log nothing is written
+    _loglevel = SILENT
+    _logout = None
+
+    order = None
+    trade_count = 0
+    result = None
+
+    def start(self):
+        # Sized for preloaded data; grown by doubling when bars arrive live
+        self._equity = np.empty(max(self.data.buflen(), 16))
+        self._journal = np.zeros(64, dtype=JOURNAL_DTYPE)
+        self._closed = 0
+        self._opened = 0
+        self._openSizes = {}
+
+        level = self.p.loglevel if self.p.loglevel is not None else _settings['level']
+        self._loglevel = toLevel(level)
+        self._logout = sys.stdout
+        if self._loglevel < SILENT and _settings['logdir']:
+            os.makedirs(_settings['logdir'], exist_ok=True)
+            path = os.path.join(_settings['logdir'], f'{type(self).__name__}_{os.getpid()}_{next(_runIds)}.log')
+            self._logout = open(path, 'w', buffering=1 << 16)
+
+    def stop(self):
+        self.result = self.summarize()
+        self.logSummary()
+        if self._logout is not None and self._logout is not sys.stdout:
+            self._logout.close()
+        self._logout = None
+
+    @classmethod
+    def higherTimeframes(cls, params=None):
+        """
+        Timeframes the strategy reads from extra feeds: the values of its *_timeframe parameters.
+        """
+        values = dict(cls.params._getitems())
+        values.update(params or {})
+        return sorted({value for name, value in values.items() if name.endswith('_timeframe') and value is not None})
+
+    def timeframeData(self, timeframe):
+        """
+        The feed of a higher timeframe (see addTimeframeFeeds), or the strategy's own data for None.
+        """
+        return self.data if timeframe is None else self.getdatabyname(tf.NAMES[timeframe])
+
+    def logSummary(self):
+        """
+        Log the final account value, trade count and parameters at INFO level.
+        """
+        if not self.logEnabled(INFO):
+            return
+        self.info("=" * 50)
+        self.info(" STRATEGY SUMMARY ")
+        self.info("=" * 50)
+        self.info("Final Account Value : %s", f"{self.broker.get_cash():,.2f}")
+        self.info("Total Trades Executed: %d", self.trade_count)
+        self.info("-" * 50)
+        self.info(" Strategy Parameters ")
+        self.info("-" * 50)
+        for param in self.params._getkeys():
+            if param == 'loglevel':
+                continue
+            self.info("%-20s: %s", param.replace('_', ' ').title(), getattr(self.params, param))
+        self.info("=" * 50)
+
+    def notify_cashvalue(self, cash, value):
+        i = len(self) - 1
+        if i >= len(self._equity):
+            self._equity = np.concatenate([self._equity, np.empty(len(self._equity))])
+        self._equity[i] = value
+
+    def notify_trade(self, trade):
+        if trade.justopened:
+            self._opened += 1
+            self._openSizes[trade.ref] = trade.size
+        elif trade.isclosed:
+            size = self._openSizes.pop(trade.ref, 0.0)
+            if self._closed == len(self._journal):
+                self._journal = np.concatenate([self._journal, np.zeros(len(self._journal), dtype=JOURNAL_DTYPE)])
+            row = self._journal[self._closed]
+            row['entry_time'] = numToDatetime64(trade.dtopen)
+            row['exit_time'] = numToDatetime64(trade.dtclose)
+            row['entry_price'] = trade.price
+            row['exit_price'] = trade.price + trade.pnl / size if size else trade.price
+            row['side'] = 1 if size > 0 else -1
+            row['size'] = abs(size)
+            row['pnl'] = trade.pnl
+            row['pnlcomm'] = trade.pnlcomm
+            row['bars_held'] = trade.barlen
+            self._closed += 1
+
+    def notify_order(self, order):
+        if order.status in [order.Submitted, order.Accepted]:
+            return
+        if order.status in [order.Completed]:
+            if order.isbuy():
+                self.debug('BUY EXECUTED, Price: %.5f', order.executed.price)
+            elif order.issell():
+                self.debug('SELL EXECUTED, Price: %.5f', order.executed.price)
+        elif order.status in [order.Canceled, order.Margin, order.Rejected]:
+            self.debug('Order Canceled/Margin/Rejected')
+        self.order = None
+
+    @property
+    def journal(self):
+        """
+        The closed trades so far, as a JOURNAL_DTYPE array.
+        """
+        return self._journal[:self._closed]
+
+    @property
+    def equity(self):
+        """
+        Account value at every bar so far.
+        """
+        return self._equity[:len(self)]
+
+    def summarize(self):
+        """
+        Metrics of the run from the journal and equity curve, as runBackTestForStrategy reports them.
+
+        'Trades Taken' counts every trade opened (an open trade at the end included),
+        'Closed Trades' only those in the journal.
+        """
+        equity = self.equity
+        pnl = self.journal['pnlcomm']
+        starting_balance = self.broker.startingcash
+        times = numToDatetime64(np.frombuffer(self.data.datetime.array, dtype=np.float64, count=len(equity)))
+        return {
+            'Starting Balance': starting_balance,
+            'Final Balance': self.broker.getvalue(),
+            'Sharpe Ratio': metrics.sharpeRatio(times, equity, starting_balance),
+            'Max Drawdown': metrics.drawdown(equity),
+            'SQN': metrics.sqn(pnl),
+            'Trades Taken': self._opened,
+            'Closed Trades': self._closed,
+            'Win rate': metrics.winRate(pnl, self._opened),
+        }
+
+    def logEnabled(self, level):
+        return level >= self._loglevel
+
+    def log(self, txt, *args, level=INFO, dt=None):
+        ''' Logging function for this strategy; args are %-formatted into txt only if the level is enabled '''
+        if level < self._loglevel:
+            return
+        if args:
+            txt = txt % args
+        dt = dt or self.datas[0].datetime.date(0)
+        self._logout.write(f'{dt.isoformat()}, {txt}\n')
+
+    def debug(self, txt, *args):
+        self.log(txt, *args, level=DEBUG)
+
+    def info(self, txt, *args):
+        self.log(txt, *args, level=INFO)
+
+    def warning(self, txt, *args):
+        self.log(txt, *args, level=WARNING)
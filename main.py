@@ -1,6 +1,6 @@
 import MetaTrader5 as mt5
-import time
 from BackTesting import backtest
+from LiveTrading import liveTrading
 
 
 def initialize_mt5():
@@ -12,15 +12,14 @@ def initialize_mt5():
 
 initialize_mt5()
 
-user_input = input("Press 1 to run the backtester: ")
+user_input = input("Press 1 to run the backtester, 2 to start live trading: ")
 
 if user_input == "1":
     backtester = backtest.Backtester()
     backtester.runBackTestForStrategy(plot=True)  
     print("Backtester has finished running.")
+elif user_input == "2":
+    # Trades the top ranked strategies of backtest_results.csv until interrupted
+    liveTrading.runLive()
 else:
     print("Invalid input. Exiting...")
-
-while True:
-    # Function for live trading will go here when ready
-    time.sleep(1)